@@ -0,0 +1,104 @@
+"""
+Benchmark da inicialização a frio do editor (importações e primeira renderização)
+
+Uso:
+    python benchmarks/bench_inicializacao.py
+    python benchmarks/bench_inicializacao.py --repeticoes 10 --alvo-ms 600
+
+Cada repetição roda em um processo novo, como um contêiner recém-iniciado:
+  - importação: `python -X importtime` de editor_dag.interface.app, com os
+    módulos que mais pesam na importação;
+  - primeira renderização: a primeira execução do main.py pelo AppTest do
+    Streamlit (inclui importar o app), com a lista das dependências pesadas
+    que já foram carregadas nesse momento.
+
+Sai com código 1 se a mediana da primeira renderização passar de --alvo-ms ou
+se algum módulo de --proibidos for carregado antes da primeira renderização.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from dados_sinteticos import RAIZ_REPOSITORIO
+
+MODULOS_PESADOS = ['pandas', 'numpy', 'pyarrow', 'multiprocessing', 'sqlite3']
+
+_PRIMEIRA_RENDERIZACAO = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+inicio = time.perf_counter()
+at = AppTest.from_file({app!r}, default_timeout=120)
+at.run()
+ms = (time.perf_counter() - inicio) * 1000
+print(json.dumps({{'ms': ms, 'excecoes': len(at.exception), 'modulos': [m for m in {pesados!r} if m in sys.modules]}}))
+"""
+
+
+def executar(argumentos):
+    ambiente = dict(os.environ, PYTHONPATH=RAIZ_REPOSITORIO)
+    return subprocess.run([sys.executable, *argumentos], cwd=RAIZ_REPOSITORIO, env=ambiente,
+                          capture_output=True, text=True, check=True)
+
+
+def medir_importacao():
+    """Retorna (tempo total em ms, [(módulo, ms próprios)] ordenados do mais pesado)"""
+    saida = executar(['-X', 'importtime', '-c', 'import editor_dag.interface.app']).stderr
+    total = 0.0
+    proprios = []
+    for linha in saida.splitlines():
+        if not linha.startswith('import time:') or 'self [us]' in linha:
+            continue
+        proprio, acumulado, modulo = linha[len('import time:'):].split('|')
+        proprios.append((modulo.strip(), int(proprio) / 1000))
+        if modulo.strip() == 'editor_dag.interface.app':
+            total = int(acumulado) / 1000
+    return total, sorted(proprios, key=lambda item: -item[1])
+
+
+def medir_primeira_renderizacao():
+    codigo = _PRIMEIRA_RENDERIZACAO.format(app=os.path.join(RAIZ_REPOSITORIO, 'main.py'), pesados=MODULOS_PESADOS)
+    return json.loads(executar(['-c', codigo]).stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--alvo-ms', type=float, default=600.0,
+                        help="limite para a mediana da primeira renderização")
+    parser.add_argument('--proibidos', nargs='*', default=['pandas'],
+                        help="módulos que não podem ser carregados na primeira renderização")
+    parser.add_argument('--top', type=int, default=8, help="módulos mais pesados exibidos na importação")
+    args = parser.parse_args()
+
+    importacoes = [medir_importacao() for _ in range(args.repeticoes)]
+    total_importacao = statistics.median(total for total, _ in importacoes)
+    print(f"Importação do app (mediana de {args.repeticoes}): {total_importacao:.1f} ms")
+    print("Módulos mais pesados (tempo próprio, última repetição):")
+    for modulo, ms in importacoes[-1][1][:args.top]:
+        print(f"  {ms:>8.1f} ms  {modulo}")
+
+    renderizacoes = [medir_primeira_renderizacao() for _ in range(args.repeticoes)]
+    primeira = statistics.median(r['ms'] for r in renderizacoes)
+    carregados = sorted({m for r in renderizacoes for m in r['modulos']})
+    print(f"\nPrimeira renderização (mediana de {args.repeticoes}): {primeira:.1f} ms (alvo {args.alvo_ms:.0f} ms)")
+    print(f"Dependências pesadas já carregadas: {', '.join(carregados) or 'nenhuma'}")
+
+    falhas = []
+    if any(r['excecoes'] for r in renderizacoes):
+        falhas.append("a primeira execução do app gerou exceção")
+    if primeira > args.alvo_ms:
+        falhas.append(f"primeira renderização acima do alvo ({primeira:.1f} ms > {args.alvo_ms:.0f} ms)")
+    proibidos = sorted(set(carregados) & set(args.proibidos))
+    if proibidos:
+        falhas.append(f"módulos carregados antes do necessário: {', '.join(proibidos)}")
+    if falhas:
+        print("\n" + "\n".join(f"!! {falha}" for falha in falhas))
+        sys.exit(1)
+    print("\nInicialização dentro do alvo")
+
+
+if __name__ == '__main__':
+    main()
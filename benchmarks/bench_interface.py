@@ -0,0 +1,292 @@
+"""
+Benchmark da interface: tempo de cada execução (rerun) do main.py em modo headless
+
+Uso:
+    python benchmarks/bench_interface.py
+    python benchmarks/bench_interface.py --tamanhos 10 1000 --repeticoes 5
+    python benchmarks/bench_interface.py --atualizar-baseline
+
+Para cada tamanho de DAG sintética, executa o app com o AppTest do Streamlit e
+mede o tempo de parede dos fluxos mais comuns: rerun sem interação, criar,
+editar, inserir abaixo, desfazer e remover uma task. Um fluxo que termina com
+exceção no app interrompe o benchmark com código 1.
+
+Tempos absolutos variam muito entre máquinas; antes de medir, o script executa
+um app mínimo de calibração (mesmo AppTest, sem o editor) e cada fluxo é
+expresso como múltiplo desse tempo. benchmarks/baseline_interface.json guarda
+esses múltiplos, e o script sai com código 1 se algum fluxo ficar mais lento
+que o baseline além da tolerância relativa e da folga absoluta (convertida para
+a máquina atual).
+
+O fluxo de remoção usa a "Lista detalhada", que desenha todas as linhas; ele só
+é medido até LIMITE_LISTA tasks. Com --secoes, o app grava o perfil de cada
+execução (ver editor_dag/perfil.py) e as seções mais lentas do rerun são exibidas.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from dados_sinteticos import RAIZ_REPOSITORIO, gerar_dag
+
+from editor_dag import dag as dag_ops
+
+TAMANHOS_PADRAO = [10, 100, 1000, 10000]
+FLUXOS = ['rerun', 'criar', 'editar', 'inserir', 'desfazer', 'remover']
+LIMITE_LISTA = 1000
+ARQUIVO_APP = os.path.join(RAIZ_REPOSITORIO, 'main.py')
+ARQUIVO_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline_interface.json')
+
+# App de calibração: mesmo custo fixo do AppTest e de alguns widgets, sem o editor
+APP_CALIBRACAO = """
+import streamlit as st
+st.title("calibração")
+for i in range(20):
+    st.text_input(f"campo {i}", key=f"campo_{i}")
+st.dataframe([{'a': i, 'b': str(i)} for i in range(200)])
+"""
+
+
+class ErroFluxo(RuntimeError):
+    """O app terminou a execução de um fluxo com exceção"""
+
+
+def executar(at, contexto=''):
+    """at.run() que falha se o app mostrar uma exceção (um fluxo quebrado não conta como rápido)"""
+    at.run()
+    if at.exception:
+        mensagens = '; '.join(str(e.value).splitlines()[0] if e.value else str(e.message) for e in at.exception)
+        raise ErroFluxo(f"{contexto or 'execução'}: {mensagens}")
+
+
+def nova_task(numero):
+    return {
+        'identificador_task': f'bench_{numero:05d}',
+        'ativo': 1,
+        'conexao_id': 'qliksensecloud',
+        'mini_operador': 'app',
+        'id_mini_operador': 'c36213a0-8322-11ee-b566-537f0445863c',
+        'extra_info': '',
+    }
+
+
+def botao(at, rotulo=None, chave=None):
+    for b in at.button:
+        if (rotulo is not None and b.label == rotulo) or (chave is not None and b.key == chave):
+            return b
+    raise LookupError(f"botão não encontrado: {rotulo or chave}")
+
+
+def abrir_app(tamanho, timeout):
+    """AppTest com a DAG sintética já em edição e uma execução de aquecimento"""
+    from streamlit.testing.v1 import AppTest
+
+    # O app lê o config.json do diretório atual
+    os.chdir(RAIZ_REPOSITORIO)
+    at = AppTest.from_file(ARQUIVO_APP, default_timeout=timeout)
+    executar(at, "abertura")
+    at.session_state.dag_data = dag_ops.preparar_para_edicao(gerar_dag(tamanho))
+    at.session_state.grade_versao += 1
+    at.session_state.cabecalho_versao += 1
+    executar(at, f"abertura com {tamanho} tasks")
+    return at
+
+
+def calibrar(timeout, repeticoes=15):
+    """Mediana (ms) de um rerun do app de calibração nesta máquina"""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_string(APP_CALIBRACAO, default_timeout=timeout)
+    executar(at, "calibração")
+    return statistics.median(cronometrar(at, "calibração") for _ in range(repeticoes))
+
+
+def cronometrar(at, contexto=''):
+    inicio = time.perf_counter()
+    at.run()
+    tempo = (time.perf_counter() - inicio) * 1000
+    if at.exception:
+        executar(at, contexto)
+    return tempo
+
+
+def primeiro_id(at):
+    return next(iter(at.session_state.dag_data['tasks'].itens()))[0]
+
+
+def preencher_formulario(at, task, task_id=None):
+    """Mesmo efeito de estado.preencher_formulario: os campos do formulário são recriados com a task"""
+    at.session_state.current_task = task
+    at.session_state.editing_task_id = task_id
+    at.session_state.formulario_versao += 1
+
+
+def medir_fluxo(at, fluxo, repeticao):
+    """Prepara o estado do fluxo e retorna o tempo (ms) da execução que o conclui"""
+    if fluxo == 'rerun':
+        return cronometrar(at, fluxo)
+
+    if fluxo == 'criar':
+        preencher_formulario(at, nova_task(repeticao))
+        executar(at, fluxo)
+        botao(at, "✅ Adicionar Task").click()
+        return cronometrar(at, fluxo)
+
+    if fluxo in ('editar', 'inserir'):
+        task_id = primeiro_id(at)
+        if fluxo == 'inserir':
+            at.session_state.inserir_abaixo = True
+            preencher_formulario(at, nova_task(10000 + repeticao), task_id)
+        else:
+            task = dict(at.session_state.dag_data['tasks'].task(task_id))
+            task['extra_info'] = f'editada {repeticao}'
+            preencher_formulario(at, task, task_id)
+        executar(at, fluxo)
+        botao(at, "💾 Atualizar Task").click()
+        return cronometrar(at, fluxo)
+
+    if fluxo == 'desfazer':
+        botao(at, "↩️ Desfazer").click()
+        return cronometrar(at, fluxo)
+
+    if fluxo == 'remover':
+        at.radio(key='modo_tabela').set_value("Lista detalhada")
+        executar(at, fluxo)
+        botao(at, chave=f"delete_{primeiro_id(at)}").click()
+        tempo = cronometrar(at, fluxo)
+        at.radio(key='modo_tabela').set_value("Grade")
+        executar(at, fluxo)
+        return tempo
+
+    raise ValueError(f"fluxo desconhecido: {fluxo}")
+
+
+def secoes_mais_lentas(arquivo, quantidade=3):
+    """Seções mais lentas da última execução gravada no arquivo de perfil"""
+    try:
+        with open(arquivo, encoding='utf-8') as f:
+            linhas = f.read().splitlines()
+    except OSError:
+        return []
+    if not linhas:
+        return []
+    secoes = json.loads(linhas[-1])['secoes']
+    return sorted(((nome, s['ms']) for nome, s in secoes.items()), key=lambda x: -x[1])[:quantidade]
+
+
+def comparar(resultados, baseline, calibracao_ms, tolerancia, folga_ms):
+    """
+    Lista de (tamanho, fluxo, atual, baseline) em ms desta máquina dos fluxos que ficaram
+    mais lentos; o baseline guarda múltiplos do tempo de calibração
+    """
+    regressoes = []
+    for tamanho, fluxos in resultados.items():
+        for fluxo, atual in fluxos.items():
+            razao = baseline['razoes'].get(str(tamanho), {}).get(fluxo)
+            if razao is None:
+                continue
+            referencia = razao * calibracao_ms
+            if atual > referencia * (1 + tolerancia) and atual - referencia > folga_ms:
+                regressoes.append((tamanho, fluxo, atual, referencia))
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=TAMANHOS_PADRAO)
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--fluxos', nargs='+', choices=FLUXOS, default=FLUXOS)
+    parser.add_argument('--baseline', default=ARQUIVO_BASELINE)
+    parser.add_argument('--tolerancia', type=float, default=1.0,
+                        help="aumento relativo aceito sobre o baseline, já normalizado pela calibração "
+                             "(padrão: 1.0 = 100%%)")
+    parser.add_argument('--folga-ms', type=float, default=20.0,
+                        help="aumento absoluto aceito sobre o baseline, para fluxos muito rápidos")
+    parser.add_argument('--timeout', type=float, default=120.0, help="limite de cada execução do app (s)")
+    parser.add_argument('--secoes', action='store_true', help="mostra as seções mais lentas do rerun")
+    parser.add_argument('--atualizar-baseline', action='store_true')
+    args = parser.parse_args()
+
+    arquivo_perfil = None
+    if args.secoes:
+        arquivo_perfil = tempfile.NamedTemporaryFile(suffix='.jsonl', delete=False).name
+        os.environ['EDITOR_DAG_PERFIL'] = '1'
+        os.environ['EDITOR_DAG_PERFIL_ARQUIVO'] = arquivo_perfil
+
+    resultados = {}
+    try:
+        calibracao_ms = calibrar(args.timeout)
+        print(f"Calibração: {calibracao_ms:.1f} ms por rerun do app mínimo\n")
+        print(f"{'tasks':>7} " + ' '.join(f"{fluxo + ' ms':>12}" for fluxo in args.fluxos))
+        for tamanho in args.tamanhos:
+            at = abrir_app(tamanho, args.timeout)
+            resultados[tamanho] = {}
+            colunas = []
+            for fluxo in args.fluxos:
+                if fluxo == 'remover' and tamanho > LIMITE_LISTA:
+                    colunas.append(f"{'-':>12}")
+                    continue
+                tempos = [medir_fluxo(at, fluxo, r) for r in range(args.repeticoes)]
+                resultados[tamanho][fluxo] = round(statistics.median(tempos), 1)
+                colunas.append(f"{resultados[tamanho][fluxo]:>12.1f}")
+                if fluxo == 'rerun' and arquivo_perfil:
+                    lentas = secoes_mais_lentas(arquivo_perfil)
+            print(f"{tamanho:>7} " + ' '.join(colunas))
+            if arquivo_perfil and 'rerun' in args.fluxos:
+                print("        seções mais lentas do rerun: " +
+                      ', '.join(f"{nome} {ms:.1f} ms" for nome, ms in lentas))
+    except ErroFluxo as e:
+        print(f"\nO app falhou durante o benchmark ({e})")
+        sys.exit(1)
+    finally:
+        if arquivo_perfil:
+            os.unlink(arquivo_perfil)
+
+    if any(tamanho > LIMITE_LISTA for tamanho in args.tamanhos) and 'remover' in args.fluxos:
+        print(f"\n('-': remoção pela Lista detalhada medida só até {LIMITE_LISTA} tasks)")
+
+    razoes = {tamanho: {fluxo: round(ms / calibracao_ms, 2) for fluxo, ms in fluxos.items()}
+              for tamanho, fluxos in resultados.items()}
+    if args.atualizar_baseline:
+        baseline = {'razoes': {}}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding='utf-8') as f:
+                baseline = json.load(f)
+        if 'razoes' not in baseline:
+            # Baseline antigo, em ms absolutos: não é comparável com os múltiplos
+            baseline = {'razoes': {}}
+        for tamanho, fluxos in razoes.items():
+            baseline['razoes'].setdefault(str(tamanho), {}).update(fluxos)
+        baseline['calibracao_ms_referencia'] = round(calibracao_ms, 1)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"\nBaseline atualizado em {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"\nSem baseline em {args.baseline}; use --atualizar-baseline para criá-lo")
+        return
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    if 'razoes' not in baseline:
+        print(f"\nO baseline em {args.baseline} é do formato antigo (ms absolutos); "
+              "use --atualizar-baseline para recriá-lo")
+        return
+    # A folga absoluta vale para a máquina do baseline; em máquinas mais lentas ela cresce junto
+    folga_ms = args.folga_ms * calibracao_ms / baseline.get('calibracao_ms_referencia', calibracao_ms)
+    regressoes = comparar(resultados, baseline, calibracao_ms, args.tolerancia, max(args.folga_ms, folga_ms))
+    if regressoes:
+        print("\nRegressões em relação ao baseline:")
+        for tamanho, fluxo, atual, referencia in regressoes:
+            print(f"  {tamanho:>7} tasks {fluxo:>9}: {atual:.1f} ms (baseline {referencia:.1f} ms)")
+        sys.exit(1)
+    print(f"\nSem regressões em relação ao baseline (tolerância {args.tolerancia:.0%}, "
+          f"folga {max(args.folga_ms, folga_ms):.0f} ms, tempos em múltiplos da calibração)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark de leitura/escrita do YAML das DAGs com os backends libyaml e Python
+
+Uso:
+    python benchmarks/bench_serializacao.py
+    python benchmarks/bench_serializacao.py --tamanhos 10 1000 50000 --repeticoes 5
+
+Para cada tamanho, mede o tempo de load/dump e o pico de memória alocada por
+objetos Python (tracemalloc) e confere se os dois backends geram o mesmo texto
+e os mesmos dados. Sai com código 1 se houver divergência.
+"""
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+
+from dados_sinteticos import gerar_dag
+
+from editor_dag.serializacao import LIBYAML_DISPONIVEL, carregar_yaml, gerar_yaml
+
+TAMANHOS_PADRAO = [10, 100, 1000, 10000, 50000]
+
+
+def medir(funcao, repeticoes):
+    """Retorna (melhor tempo em ms, pico de memória em MiB, resultado)"""
+    melhor = float('inf')
+    resultado = None
+    for _ in range(repeticoes):
+        gc.collect()
+        inicio = time.perf_counter()
+        resultado = funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+
+    gc.collect()
+    tracemalloc.start()
+    funcao()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return melhor * 1000, pico / (1024 * 1024), resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=TAMANHOS_PADRAO)
+    parser.add_argument('--repeticoes', type=int, default=3)
+    args = parser.parse_args()
+
+    backends = ['python'] + (['c'] if LIBYAML_DISPONIVEL else [])
+    if not LIBYAML_DISPONIVEL:
+        print("libyaml indisponível: apenas o backend Python será medido\n")
+
+    print(f"{'tasks':>7} {'backend':>8} {'dump ms':>10} {'dump MiB':>9} {'load ms':>10} {'load MiB':>9}")
+    divergencias = 0
+    for tamanho in args.tamanhos:
+        dag = gerar_dag(tamanho)
+        textos = {}
+        for backend in backends:
+            repeticoes = args.repeticoes if tamanho <= 10000 else 1
+            dump_ms, dump_mib, texto = medir(lambda: gerar_yaml(dag, backend=backend), repeticoes)
+            load_ms, load_mib, dados = medir(lambda: carregar_yaml(texto, backend=backend), repeticoes)
+            textos[backend] = (texto, dados)
+            print(f"{tamanho:>7} {backend:>8} {dump_ms:>10.1f} {dump_mib:>9.1f} {load_ms:>10.1f} {load_mib:>9.1f}")
+
+        if 'c' in textos and textos['c'] != textos['python']:
+            divergencias += 1
+            print(f"  !! saída divergente entre os backends com {tamanho} tasks")
+
+    if divergencias:
+        sys.exit(1)
+    print("\nParidade: os backends geraram o mesmo YAML e os mesmos dados em todos os tamanhos")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""Geração de DAGs sintéticas para os benchmarks"""
+import os
+import random
+import sys
+import uuid
+
+# Permite executar os scripts a partir de qualquer diretório
+RAIZ_REPOSITORIO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ_REPOSITORIO not in sys.path:
+    sys.path.insert(0, RAIZ_REPOSITORIO)
+
+CONEXOES = ['qliksensecloud', 'telegram_airflow', 'rodrigo_trial_snowflake', 'teams_webhook_apikey', 'smtp_default']
+MINI_OPERADORES = ['automation', 'app', 'report_com_status', 'report', 'espera', 'snowflake',
+                   'verifica_app_d0', 'verifica_app_d1', 'enviar_telegram', 'enviar_email']
+
+
+def gerar_dag(quantidade_tasks, semente=42):
+    """Gera uma DAG no mesmo formato produzido pelo editor"""
+    aleatorio = random.Random(semente)
+    tasks = []
+    for i in range(quantidade_tasks):
+        operador = aleatorio.choice(MINI_OPERADORES)
+        task = {
+            'identificador_task': f'{operador}_{i:05d}',
+            'ativo': 1 if aleatorio.random() > 0.1 else 0,
+            'conexao_id': aleatorio.choice(CONEXOES),
+            'mini_operador': operador,
+            'id_mini_operador': str(uuid.UUID(int=aleatorio.getrandbits(128), version=1)),
+            'extra_info': aleatorio.choice(['', 'reload parcial', 'aguardar app D-1 concluído']),
+            'task_num': i,
+        }
+        tasks.append(task)
+
+    identificadores = [task['identificador_task'] for task in tasks]
+    return {
+        'dag': {
+            'descricao': f'DAG sintética com {quantidade_tasks} tasks',
+            'dono': 'Equipe de Dados',
+            'email_em_falha': 'dados@exemplo.com',
+            'data_inicial': '2024-01-01',
+            'agendamento_cron': '0 6 * * 1-5',
+            'tags': 'QLIK,SINTETICA',
+            'quantidade_tentativas': 2,
+            'tempo_para_tentativa': 1,
+            'ordem_execução': ' >> '.join(identificadores[:50]),
+        },
+        'tasks': tasks,
+    }
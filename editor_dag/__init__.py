@@ -0,0 +1 @@
+"""Biblioteca de apoio ao Editor YAML para DAGs do Airflow"""
@@ -0,0 +1,5 @@
+import sys
+
+from editor_dag.cli import main
+
+sys.exit(main())
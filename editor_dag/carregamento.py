@@ -0,0 +1,138 @@
+"""
+Carregamento de várias DAGs de uma vez (vários arquivos ou um .zip)
+
+As entradas do .zip são lidas direto do arquivo em memória, sem extrair para o
+disco, e interpretadas em um pool de processos. Só uma janela limitada de
+entradas fica em trânsito ao mesmo tempo, então o pico de memória não cresce
+com o tamanho do pacote.
+"""
+import os
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+
+import yaml
+
+from editor_dag.dag import ErroEstruturaDag, carregar_dag
+from editor_dag.lote import EXTENSOES_DAG
+
+# Abaixo desta quantidade de arquivos a leitura é feita no próprio processo
+MINIMO_PARA_PARALELO = 64
+
+# Limite por entrada do .zip, para não descompactar arquivos desproporcionais
+TAMANHO_MAXIMO_ENTRADA = 20 * 1024 * 1024
+
+
+@dataclass
+class ResultadoCarga:
+    nome: str
+    dag_data: Optional[dict] = None
+    erro: Optional[str] = None
+
+    @property
+    def ok(self):
+        return self.erro is None
+
+
+def _entrada_dag(nome):
+    partes = nome.replace('\\', '/').split('/')
+    if any(p.startswith('.') or p == '__MACOSX' for p in partes if p):
+        return False
+    return nome.lower().endswith(EXTENSOES_DAG)
+
+
+def iterar_zip(fluxo):
+    """
+    Gera (nome, conteúdo | exceção) de cada arquivo de DAG do .zip, lendo uma entrada por vez
+    Entradas inválidas geram a exceção no lugar do conteúdo, sem interromper as demais
+    """
+    with zipfile.ZipFile(fluxo) as pacote:
+        for info in pacote.infolist():
+            if info.is_dir() or not _entrada_dag(info.filename):
+                continue
+            if info.file_size > TAMANHO_MAXIMO_ENTRADA:
+                yield info.filename, ValueError(f"Arquivo maior que {TAMANHO_MAXIMO_ENTRADA // 2**20} MB")
+                continue
+            try:
+                with pacote.open(info) as entrada:
+                    yield info.filename, entrada.read()
+            except (zipfile.BadZipFile, RuntimeError, NotImplementedError) as e:
+                yield info.filename, e
+
+
+def iterar_arquivos(arquivos):
+    """
+    Expande os arquivos enviados (objetos com .name e .read/.seek, como os do
+    st.file_uploader) em (nome, conteúdo | exceção), abrindo os .zip
+    """
+    for arquivo in arquivos:
+        nome = arquivo.name
+        if nome.lower().endswith('.zip'):
+            try:
+                for nome_entrada, conteudo in iterar_zip(arquivo):
+                    yield f"{nome}/{nome_entrada}", conteudo
+            except zipfile.BadZipFile as e:
+                yield nome, e
+        elif _entrada_dag(os.path.basename(nome)):
+            yield nome, arquivo.read()
+
+
+def interpretar_entrada(nome, conteudo):
+    """Lê e valida uma DAG; erros viram o status do arquivo em vez de exceção"""
+    if isinstance(conteudo, Exception):
+        return ResultadoCarga(nome, erro=str(conteudo))
+    try:
+        return ResultadoCarga(nome, dag_data=carregar_dag(conteudo))
+    except UnicodeDecodeError:
+        return ResultadoCarga(nome, erro="O arquivo não está em UTF-8")
+    except yaml.YAMLError as e:
+        return ResultadoCarga(nome, erro=f"Erro ao ler arquivo YAML: {e}")
+    except ErroEstruturaDag as e:
+        return ResultadoCarga(nome, erro=str(e))
+    except Exception as e:
+        # Ex.: data inválida (2024-13-45) no construtor de datas do YAML; um arquivo não interrompe os demais
+        return ResultadoCarga(nome, erro=f"Erro ao processar arquivo: {e}")
+
+
+def _interpretar_args(args):
+    return interpretar_entrada(*args)
+
+
+def carregar_entradas(entradas, processos=None, quantidade=None):
+    """
+    Interpreta as entradas (nome, conteúdo) preservando a ordem. Com `quantidade`
+    abaixo de MINIMO_PARA_PARALELO (ou processos=1) tudo roda no processo atual.
+    """
+    if processos == 1 or (quantidade is not None and quantidade < MINIMO_PARA_PARALELO):
+        return [interpretar_entrada(nome, conteudo) for nome, conteudo in entradas]
+
+    processos = processos or os.cpu_count() or 1
+    resultados = []
+    pendentes = deque()
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        for entrada in entradas:
+            pendentes.append(executor.submit(_interpretar_args, entrada))
+            # Janela limitada: não lê o próximo arquivo enquanto houver muitos em trânsito
+            if len(pendentes) >= processos * 4:
+                resultados.append(pendentes.popleft().result())
+        while pendentes:
+            resultados.append(pendentes.popleft().result())
+    return resultados
+
+
+def contar_entradas(arquivos):
+    """Quantidade de arquivos de DAG (contando as entradas dos .zip) sem ler o conteúdo"""
+    total = 0
+    for arquivo in arquivos:
+        if arquivo.name.lower().endswith('.zip'):
+            try:
+                with zipfile.ZipFile(arquivo) as pacote:
+                    total += sum(1 for i in pacote.infolist() if not i.is_dir() and _entrada_dag(i.filename))
+            except zipfile.BadZipFile:
+                total += 1
+            arquivo.seek(0)
+        else:
+            total += 1
+    return total
@@ -0,0 +1,258 @@
+"""
+Catálogo local de objetos do Qlik (apps, automations e reports)
+
+O catálogo é lido de exportações JSON do qlik-cli, em um arquivo ou em um
+diretório com um arquivo por comando, por exemplo:
+
+    qlik app ls --json > qlik_catalogo/apps.json
+    qlik automation ls --json > qlik_catalogo/automations.json
+
+Cada objeto exportado vira um ObjetoQlik (id, nome, tipo). O tipo vem do
+resourceType do objeto, da seção do JSON ({"apps": [...]}) ou do nome do
+arquivo. Cada arquivo tem um índice ordenado de chaves em minúsculas (o id, o
+nome e cada palavra do nome), então a busca por prefixo é uma busca binária
+seguida da leitura das chaves seguintes.
+
+obter_catalogo_qlik() confere o mtime/tamanho dos arquivos a cada chamada e
+relê apenas os que mudaram; os índices dos demais são reaproveitados. Cada
+CatalogoQlik é imutável: um catálogo novo só é montado quando algum conteúdo
+mudou, então ele pode ser usado como chave de caches (ver validacao).
+"""
+import bisect
+import hashlib
+import heapq
+import json
+import os
+import re
+import threading
+from typing import NamedTuple, Optional
+
+# Tipos de objeto do Qlik esperados no id_mini_operador de cada mini operador
+TIPOS_POR_OPERADOR = {
+    'app': ('app',),
+    'verifica_app_d0': ('app',),
+    'verifica_app_d1': ('app',),
+    'automation': ('automation',),
+    'report': ('report',),
+    'report_com_status': ('report',),
+}
+
+# Nomes de tipo usados nas exportações (resourceType, seções, nomes de arquivo)
+_SINONIMOS_TIPO = {
+    'app': 'app', 'apps': 'app', 'qvapp': 'app',
+    'automation': 'automation', 'automations': 'automation',
+    'report': 'report', 'reports': 'report', 'reporttemplate': 'report', 'templates': 'report',
+    'sharingservicetask': 'report', 'sharing-task': 'report', 'sharing-tasks': 'report',
+}
+
+_SEPARADORES = re.compile(r"[^0-9a-zà-ÿ]+")
+
+
+class ObjetoQlik(NamedTuple):
+    id: str
+    nome: str
+    tipo: Optional[str]
+
+
+def _tipo(valor):
+    return _SINONIMOS_TIPO.get(str(valor or '').strip().lower())
+
+
+def _objetos_exportados(dados, tipo_padrao):
+    """Percorre a exportação (lista, {"data": [...]} ou {"apps": [...], ...}) e gera os objetos"""
+    if isinstance(dados, dict):
+        if isinstance(dados.get('data'), list):
+            yield from _objetos_exportados(dados['data'], tipo_padrao)
+            return
+        for secao, itens in dados.items():
+            if isinstance(itens, list):
+                yield from _objetos_exportados(itens, _tipo(secao) or tipo_padrao)
+        return
+    if not isinstance(dados, list):
+        return
+    for item in dados:
+        if not isinstance(item, dict):
+            continue
+        # Nos itens do hub (qlik app ls), o id do objeto é o resourceId; o id é o do item
+        identificador = item.get('resourceId') or item.get('id')
+        if not identificador:
+            continue
+        nome = item.get('name') or item.get('nome') or ''
+        tipo = _tipo(item.get('tipo') or item.get('resourceType')) or tipo_padrao
+        yield ObjetoQlik(str(identificador).strip(), str(nome), tipo)
+
+
+class _IndiceArquivo:
+    """Objetos de um arquivo exportado com o índice ordenado de chaves de busca"""
+
+    def __init__(self, objetos, hash_conteudo):
+        self.hash_conteudo = hash_conteudo
+        self.objetos = tuple(objetos)
+        self.por_id = {objeto.id.lower(): objeto for objeto in self.objetos}
+        self.tipos = frozenset(objeto.tipo for objeto in self.objetos if objeto.tipo)
+        entradas = set()
+        for i, objeto in enumerate(self.objetos):
+            entradas.add((objeto.id.lower(), i))
+            nome = objeto.nome.lower().strip()
+            if nome:
+                entradas.add((nome, i))
+                entradas.update((palavra, i) for palavra in _SEPARADORES.split(nome) if palavra)
+        entradas = sorted(entradas)
+        self.chaves = [chave for chave, _ in entradas]
+        self.posicoes = [i for _, i in entradas]
+
+    def buscar(self, prefixo, tipos):
+        """Gera (chave, objeto) em ordem de chave para as chaves que começam com o prefixo"""
+        inicio = bisect.bisect_left(self.chaves, prefixo)
+        for j in range(inicio, len(self.chaves)):
+            chave = self.chaves[j]
+            if not chave.startswith(prefixo):
+                return
+            objeto = self.objetos[self.posicoes[j]]
+            if tipos is None or objeto.tipo in tipos:
+                yield chave, objeto
+
+
+def _ler_arquivo(caminho, hash_conteudo, conteudo):
+    tipo_padrao = _tipo(os.path.splitext(os.path.basename(caminho))[0])
+    dados = json.loads(conteudo.decode('utf-8-sig'))
+    return _IndiceArquivo(_objetos_exportados(dados, tipo_padrao), hash_conteudo)
+
+
+class CatalogoQlik:
+    """Versão imutável do catálogo montada a partir dos índices de cada arquivo"""
+
+    def __init__(self, caminho, indices=(), erros=()):
+        self.caminho = caminho
+        self._indices = tuple(indices)
+        # (arquivo, mensagem) dos arquivos que não puderam ser lidos
+        self.erros = tuple(erros)
+        self.tipos = frozenset().union(*(indice.tipos for indice in self._indices))
+
+    def __len__(self):
+        return sum(len(indice.objetos) for indice in self._indices)
+
+    def obter(self, identificador):
+        chave = str(identificador or '').strip().lower()
+        for indice in self._indices:
+            objeto = indice.por_id.get(chave)
+            if objeto is not None:
+                return objeto
+        return None
+
+    def buscar(self, texto, tipos=None, limite=20):
+        """Objetos cujo id, nome ou palavra do nome começam com o texto (sem diferenciar maiúsculas)"""
+        prefixo = str(texto or '').strip().lower()
+        if not prefixo:
+            return []
+        tipos = frozenset(tipos) if tipos is not None else None
+        resultados = {}
+        exato = self.obter(prefixo)
+        if exato is not None and (tipos is None or exato.tipo in tipos):
+            resultados[exato.id] = exato
+        for _, objeto in heapq.merge(*(indice.buscar(prefixo, tipos) for indice in self._indices),
+                                  key=lambda par: par[0]):
+            if len(resultados) >= limite:
+                break
+            resultados.setdefault(objeto.id, objeto)
+        return list(resultados.values())
+
+    def tipos_do_operador(self, mini_operador):
+        """Tipos esperados para o mini operador que o catálogo conhece (vazio: não há o que conferir)"""
+        return tuple(tipo for tipo in TIPOS_POR_OPERADOR.get(mini_operador, ()) if tipo in self.tipos)
+
+    def verificar(self, mini_operador, identificador):
+        """Mensagem de erro se o id não é um objeto do tipo esperado no catálogo (ou None)"""
+        tipos = self.tipos_do_operador(mini_operador)
+        if not tipos or not identificador:
+            return None
+        objeto = self.obter(identificador)
+        if objeto is None:
+            return f"não encontrado no catálogo do Qlik ({', '.join(tipos)})"
+        if objeto.tipo and objeto.tipo not in tipos:
+            return f"'{objeto.nome}' é um(a) {objeto.tipo} no catálogo do Qlik, esperado {', '.join(tipos)}"
+        return None
+
+
+class _FonteCatalogo:
+    """Arquivos de uma exportação, relidos individualmente quando mtime/tamanho mudam"""
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._lock = threading.Lock()
+        self._arquivos = {}  # arquivo -> (assinatura, _IndiceArquivo)
+        self._assinaturas = None
+        self.catalogo = CatalogoQlik(caminho)
+
+    def _listar(self):
+        if os.path.isdir(self.caminho):
+            return sorted(
+                os.path.join(self.caminho, nome) for nome in os.listdir(self.caminho)
+                if nome.lower().endswith('.json')
+            )
+        return [self.caminho]
+
+    def atualizar(self):
+        try:
+            arquivos = self._listar()
+            assinaturas = {}
+            for arquivo in arquivos:
+                stat = os.stat(arquivo)
+                assinaturas[arquivo] = (stat.st_mtime_ns, stat.st_size)
+        except OSError as e:
+            erros = ((self.caminho, str(e)),)
+            with self._lock:
+                self._arquivos = {}
+                self._assinaturas = None
+                if len(self.catalogo) or self.catalogo.erros != erros:
+                    self.catalogo = CatalogoQlik(self.caminho, erros=erros)
+            return self.catalogo
+
+        if assinaturas == self._assinaturas:
+            return self.catalogo
+
+        with self._lock:
+            if assinaturas == self._assinaturas:
+                return self.catalogo
+            anteriores = self._arquivos
+            atuais, erros, mudou = {}, [], False
+            for arquivo, assinatura in assinaturas.items():
+                entrada = anteriores.get(arquivo)
+                if entrada is not None and entrada[0] == assinatura:
+                    atuais[arquivo] = entrada
+                    continue
+                try:
+                    with open(arquivo, 'rb') as f:
+                        conteudo = f.read()
+                    hash_conteudo = hashlib.sha256(conteudo).hexdigest()
+                    # Arquivo "tocado" sem alteração real: mantém o mesmo índice
+                    if entrada is not None and entrada[1].hash_conteudo == hash_conteudo:
+                        indice = entrada[1]
+                    else:
+                        indice = _ler_arquivo(arquivo, hash_conteudo, conteudo)
+                        mudou = True
+                except (OSError, ValueError) as e:
+                    erros.append((arquivo, str(e)))
+                    continue
+                atuais[arquivo] = (assinatura, indice)
+
+            self._arquivos = atuais
+            self._assinaturas = assinaturas if not erros else None
+            mudou = mudou or atuais.keys() != anteriores.keys()
+            if mudou or tuple(erros) != self.catalogo.erros:
+                self.catalogo = CatalogoQlik(self.caminho, (indice for _, indice in atuais.values()), erros)
+            return self.catalogo
+
+
+_fontes = {}
+_lock_fontes = threading.Lock()
+
+
+def obter_catalogo_qlik(caminho):
+    """Catálogo atual da exportação (arquivo ou diretório), relendo só os arquivos que mudaram"""
+    caminho = os.path.abspath(caminho)
+    fonte = _fontes.get(caminho)
+    if fonte is None:
+        with _lock_fontes:
+            fonte = _fontes.setdefault(caminho, _FonteCatalogo(caminho))
+    return fonte.atualizar()
@@ -0,0 +1,193 @@
+"""
+Linha de comando para edição de DAGs sem a interface do Streamlit
+
+Exemplos:
+    python -m editor_dag editar dags/ --operacoes operacoes.yml --simular
+    python -m editor_dag editar dags/ --op '{"operacao": "definir_task", "onde": {"mini_operador": "app"}, "valores": {"ativo": 0}}'
+    python -m editor_dag cron dags/ --conexao qliksensecloud
+    python -m editor_dag sidecar dags/ --formato json
+    python -m editor_dag gerar recarga_apps --matriz matriz.yml --saida dags.zip --nome 'recarga_{{app}}_{{unidade}}'
+"""
+import argparse
+import json
+import sys
+
+import yaml
+
+from editor_dag.cron import analisar_agendamentos, validar_cron
+from editor_dag.dag import ErroEstruturaDag
+from editor_dag.lote import (ErroOperacao, carregar_operacoes, permissoes_arquivo_novo, processar_diretorio,
+                             validar_operacoes)
+from editor_dag.modelos import ErroModelo
+
+
+def _comando_editar(args):
+    operacoes = []
+    if args.operacoes:
+        operacoes.extend(carregar_operacoes(args.operacoes))
+    for op in args.op or []:
+        operacoes.append(json.loads(op))
+    if not operacoes:
+        raise ErroOperacao("Informe --operacoes ou ao menos um --op")
+    validar_operacoes(operacoes)
+
+    resultados = processar_diretorio(args.diretorio, operacoes, simular=args.simular, processos=args.processos)
+
+    contagem = {'alterado': 0, 'inalterado': 0, 'erro': 0}
+    for resultado in resultados:
+        contagem[resultado.status] += 1
+        if resultado.status == 'erro':
+            print(f"ERRO {resultado.caminho}: {resultado.erro}", file=sys.stderr)
+        elif resultado.status == 'alterado':
+            if args.simular:
+                sys.stdout.write(resultado.diff)
+            else:
+                print(f"alterado {resultado.caminho}")
+
+    acao = "seriam alterados" if args.simular else "alterados"
+    print(f"\n{len(resultados)} arquivos: {contagem['alterado']} {acao}, "
+          f"{contagem['inalterado']} sem alterações, {contagem['erro']} com erro", file=sys.stderr)
+    return 1 if contagem['erro'] else 0
+
+
+def _comando_cron(args):
+    from editor_dag.workspace import IndiceWorkspace
+
+    indice = IndiceWorkspace(args.diretorio)
+    indice.reindexar(processos=args.processos)
+    agendamentos = indice.agendamentos(args.conexao)
+    if args.conexao:
+        agendamentos = [a for a in agendamentos if a[2]]
+
+    invalidos = 0
+    for caminho, expressao, _ in agendamentos:
+        erro = validar_cron(expressao)
+        if erro:
+            invalidos += 1
+            print(f"ERRO {caminho}: agendamento '{expressao}': {erro}", file=sys.stderr)
+
+    analise = analisar_agendamentos([(expressao, peso) for _, expressao, peso in agendamentos], args.top)
+    alvo = f" da conexão {args.conexao}" if args.conexao else ""
+    print(f"{len(agendamentos)} DAGs; pico projetado de {analise.pico_tasks:g} tasks ativas{alvo} no mesmo minuto")
+    if not analise.pontos_quentes:
+        print("Nenhuma colisão entre DAGs")
+    for ponto in analise.pontos_quentes:
+        print(f"{ponto.rotulo}  {ponto.dags:4d} DAGs  {ponto.tasks:6g} tasks")
+    return 1 if invalidos else 0
+
+
+def _comando_gerar(args):
+    import os
+    import tempfile
+
+    from editor_dag.configuracoes import obter_configuracoes
+    from editor_dag.dag import carregar_dag_arquivo
+    from editor_dag.modelos import RegistroModelos, contar_combinacoes, escrever_zip, gerar_dags
+    from editor_dag.serializacao import carregar_yaml
+
+    if os.path.isfile(args.modelo):
+        modelo = carregar_dag_arquivo(args.modelo)
+    else:
+        diretorio = obter_configuracoes().modelos_dag
+        if not diretorio:
+            raise ErroOperacao(f"'{args.modelo}' não é um arquivo e não há modelos_dag no config.json")
+        modelo = RegistroModelos(diretorio).carregar(args.modelo)
+    with open(args.matriz, 'r', encoding='utf-8') as f:
+        matriz = carregar_yaml(f.read())
+
+    dags = gerar_dags(modelo, matriz, args.nome)
+    print(f"Gerando {contar_combinacoes(matriz)} DAGs em {args.saida}...", file=sys.stderr)
+    # O zip só substitui a saída depois de completo: um erro no meio não deixa um arquivo truncado
+    fd, temporario = tempfile.mkstemp(prefix='.tmp_', suffix='.zip', dir=os.path.dirname(os.path.abspath(args.saida)))
+    try:
+        with os.fdopen(fd, 'wb') as arquivo:
+            quantidade = escrever_zip(dags, arquivo)
+        # mkstemp cria com 0o600; a saída fica com as permissões usuais de um arquivo novo
+        os.chmod(temporario, permissoes_arquivo_novo())
+        os.replace(temporario, args.saida)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+    print(f"{quantidade} DAGs gravadas em {args.saida}", file=sys.stderr)
+    return 0
+
+
+def _comando_sidecar(args):
+    import yaml
+
+    from editor_dag.configuracoes import obter_configuracoes
+    from editor_dag.lote import listar_arquivos_dag
+    from editor_dag.sidecar import ErroSidecar, escrever_sidecar, estado_sidecar
+    from editor_dag.validacao import obter_validador
+
+    arquivos = listar_arquivos_dag(args.diretorio)
+    if args.verificar:
+        pendentes = 0
+        for caminho in arquivos:
+            estado = estado_sidecar(caminho, args.formato)
+            if estado != 'atualizado':
+                pendentes += 1
+                print(f"{estado} {caminho}")
+        print(f"\n{len(arquivos)} arquivos: {pendentes} sem sidecar {args.formato} em dia", file=sys.stderr)
+        return 1 if pendentes else 0
+
+    validador = obter_validador(obter_configuracoes(args.config))
+    erros = 0
+    for caminho in arquivos:
+        try:
+            escrever_sidecar(caminho, args.formato, validador)
+        except (ErroSidecar, yaml.YAMLError, UnicodeDecodeError) as e:
+            erros += 1
+            print(f"ERRO {caminho}: {e}", file=sys.stderr)
+    print(f"\n{len(arquivos)} arquivos: {len(arquivos) - erros} sidecars {args.formato} gravados, "
+          f"{erros} com erro", file=sys.stderr)
+    return 1 if erros else 0
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(prog='python -m editor_dag', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    editar = subparsers.add_parser('editar', help="Aplica operações declarativas em um diretório de DAGs")
+    editar.add_argument('diretorio', help="Diretório com os arquivos .yml/.yaml (busca recursiva)")
+    editar.add_argument('--operacoes', help="Arquivo JSON/YAML com a lista de operações")
+    editar.add_argument('--op', action='append', help="Operação em JSON (pode ser repetido)")
+    editar.add_argument('--simular', action='store_true', help="Não grava nada, apenas mostra o diff")
+    editar.add_argument('--processos', type=int, default=None, help="Quantidade de processos (padrão: CPUs)")
+    editar.set_defaults(funcao=_comando_editar)
+
+    cron = subparsers.add_parser('cron', help="Mostra colisões de agendamento e picos de tasks simultâneas")
+    cron.add_argument('diretorio', help="Diretório com os arquivos .yml/.yaml (busca recursiva)")
+    cron.add_argument('--conexao', help="Considera apenas as tasks desta conexao_id (ex.: qliksensecloud)")
+    cron.add_argument('--top', type=int, default=10, help="Quantidade de pontos de colisão exibidos")
+    cron.add_argument('--processos', type=int, default=None, help="Quantidade de processos (padrão: CPUs)")
+    cron.set_defaults(funcao=_comando_cron)
+
+    sidecar = subparsers.add_parser('sidecar', help="Grava ao lado de cada YAML o sidecar JSON/msgpack lido pela fábrica de DAGs")
+    sidecar.add_argument('diretorio', help="Diretório com os arquivos .yml/.yaml (busca recursiva)")
+    sidecar.add_argument('--formato', choices=('json', 'msgpack'), default='json',
+                         help="Formato do sidecar (msgpack requer o pacote msgpack)")
+    sidecar.add_argument('--config', default='config.json', help="config.json usado na conferência de esquema")
+    sidecar.add_argument('--verificar', action='store_true',
+                         help="Não grava nada, lista os YAMLs sem sidecar ou com sidecar desatualizado")
+    sidecar.set_defaults(funcao=_comando_sidecar)
+
+    gerar = subparsers.add_parser('gerar', help="Gera um zip de DAGs a partir de um modelo e de uma matriz de parâmetros")
+    gerar.add_argument('modelo', help="Arquivo do modelo ou nome de um modelo do diretório modelos_dag")
+    gerar.add_argument('--matriz', required=True, help="Arquivo JSON/YAML com os valores de cada dimensão")
+    gerar.add_argument('--saida', required=True, help="Arquivo .zip gerado")
+    gerar.add_argument('--nome', help="Padrão do nome dos arquivos com marcadores (padrão: dag_{{...}}.yml)")
+    gerar.set_defaults(funcao=_comando_gerar)
+
+    return parser
+
+
+def main(argv=None):
+    args = criar_parser().parse_args(argv)
+    try:
+        return args.funcao(args)
+    except (ErroOperacao, ErroModelo, ErroEstruturaDag, json.JSONDecodeError, yaml.YAMLError, OSError) as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return 2
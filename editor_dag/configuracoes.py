@@ -0,0 +1,131 @@
+"""Cache das configurações do config.json compartilhado por todo o processo"""
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping, Optional, Tuple
+
+CAMINHO_PADRAO = 'config.json'
+
+
+@dataclass(frozen=True)
+class Configuracoes:
+    """Configurações imutáveis com índices valor -> posição pré-calculados"""
+    conexoes: Tuple[str, ...]
+    mini_operadores: Tuple[str, ...]
+    indice_conexoes: Mapping[str, int]
+    indice_mini_operadores: Mapping[str, int]
+    hash_conteudo: str
+    # Exportação JSON do qlik-cli (arquivo ou diretório) usada como catálogo, ou None
+    catalogo_qlik: Optional[str] = None
+    # Diretório dos modelos de DAG com marcadores (ver editor_dag.modelos), ou None
+    modelos_dag: Optional[str] = None
+    # Formato do sidecar gravado ao salvar no workspace ('json' ou 'msgpack', ver editor_dag.sidecar), ou None
+    formato_sidecar: Optional[str] = None
+
+    def __getitem__(self, chave):
+        # Mantém o acesso no formato CONFIG['conexoes'] usado pelo app
+        return getattr(self, chave)
+
+
+def _indexar(valores):
+    """Monta o mapa valor -> primeira posição da lista"""
+    indice = {}
+    for i, valor in enumerate(valores):
+        indice.setdefault(valor, i)
+    return MappingProxyType(indice)
+
+
+def _montar_configuracoes(conteudo, hash_conteudo, diretorio=''):
+    """Converte o JSON lido em uma instância imutável de Configuracoes"""
+    dados = json.loads(conteudo)
+    conexoes = tuple(dados.get('conexoes', []))
+    mini_operadores = tuple(dados.get('mini_operadores', []))
+    # Caminhos do catálogo e dos modelos relativos ao diretório do config.json
+    catalogo_qlik = dados.get('catalogo_qlik') or None
+    if catalogo_qlik:
+        catalogo_qlik = os.path.join(diretorio, catalogo_qlik)
+    modelos_dag = dados.get('modelos_dag') or None
+    if modelos_dag:
+        modelos_dag = os.path.join(diretorio, modelos_dag)
+    return Configuracoes(
+        conexoes=conexoes,
+        mini_operadores=mini_operadores,
+        indice_conexoes=_indexar(conexoes),
+        indice_mini_operadores=_indexar(mini_operadores),
+        hash_conteudo=hash_conteudo,
+        catalogo_qlik=catalogo_qlik,
+        modelos_dag=modelos_dag,
+        formato_sidecar=dados.get('formato_sidecar') or None,
+    )
+
+
+class _CacheConfiguracoes:
+    """Guarda a última leitura de cada arquivo e só relê quando mtime/tamanho mudam"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entradas = {}
+
+    def obter(self, caminho):
+        caminho = os.path.abspath(caminho)
+        stat = os.stat(caminho)
+        assinatura = (stat.st_mtime_ns, stat.st_size)
+
+        entrada = self._entradas.get(caminho)
+        if entrada is not None and entrada[0] == assinatura:
+            return entrada[1]
+
+        with self._lock:
+            entrada = self._entradas.get(caminho)
+            if entrada is not None and entrada[0] == assinatura:
+                return entrada[1]
+
+            with open(caminho, 'rb') as f:
+                conteudo = f.read()
+            hash_conteudo = hashlib.sha256(conteudo).hexdigest()
+
+            # Arquivo "tocado" sem alteração real: mantém o mesmo objeto
+            if entrada is not None and entrada[1].hash_conteudo == hash_conteudo:
+                config = entrada[1]
+            else:
+                config = _montar_configuracoes(conteudo.decode('utf-8'), hash_conteudo, os.path.dirname(caminho))
+
+            self._entradas[caminho] = (assinatura, config)
+            return config
+
+    def limpar(self):
+        with self._lock:
+            self._entradas.clear()
+
+
+_cache = _CacheConfiguracoes()
+
+
+def obter_configuracoes(caminho: str = CAMINHO_PADRAO) -> Configuracoes:
+    """Retorna as configurações do arquivo, relendo apenas se ele mudou em disco"""
+    return _cache.obter(caminho)
+
+
+def limpar_cache():
+    """Descarta as configurações em cache (usado ao trocar de arquivo ou em testes)"""
+    _cache.limpar()
+
+
+def opcoes_com_extras(valores: Tuple[str, ...], indice: Mapping[str, int],
+                      extras: Tuple[str, ...], atual: Optional[str]):
+    """
+    Retorna (opções, índice selecionado) para um selectbox, acrescentando
+    valores desconhecidos da sessão sem alterar o objeto compartilhado
+    """
+    opcoes = valores + extras if extras else valores
+    if not atual:
+        return opcoes, 0
+    posicao = indice.get(atual)
+    if posicao is not None:
+        return opcoes, posicao
+    if atual in extras:
+        return opcoes, len(valores) + extras.index(atual)
+    return opcoes, 0
@@ -0,0 +1,327 @@
+"""
+Análise de colisões de agendamento (cron) entre várias DAGs
+
+Cada expressão cron é convertida em máscaras booleanas de minuto (60), hora (24)
+e dia da semana (7). A ocupação da semana (7 x 24 x 60 minutos) de um conjunto de
+DAGs é calculada de uma vez, com um produto de matrizes ponderado pela
+quantidade de tasks ativas de cada DAG.
+
+A projeção é de pior caso: restrições de dia do mês/mês não reduzem a
+ocupação (um agendamento mensal conta em todos os dias da semana em que pode
+cair), pois o objetivo é encontrar os picos possíveis.
+
+A validação das expressões é feita em Python puro; o numpy só é importado
+quando uma análise de ocupação é pedida, para não pesar na abertura do editor.
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, FrozenSet, List, Optional, Sequence, Tuple
+
+MINUTOS_DIA = 24 * 60
+MINUTOS_SEMANA = 7 * MINUTOS_DIA
+DIAS_SEMANA = ('Dom', 'Seg', 'Ter', 'Qua', 'Qui', 'Sex', 'Sáb')
+
+_MACROS = {
+    '@yearly': '0 0 1 1 *',
+    '@annually': '0 0 1 1 *',
+    '@monthly': '0 0 1 * *',
+    '@weekly': '0 0 * * 0',
+    '@daily': '0 0 * * *',
+    '@midnight': '0 0 * * *',
+    '@hourly': '0 * * * *',
+}
+_NOMES_MESES = {nome: i for i, nome in enumerate(
+    ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'], start=1)}
+_NOMES_DIAS = {nome: i for i, nome in enumerate(['sun', 'mon', 'tue', 'wed', 'thu', 'fri', 'sat'])}
+
+# (mínimo, máximo, nomes) de cada campo
+_CAMPOS = (
+    (0, 59, {}),
+    (0, 23, {}),
+    (1, 31, {}),
+    (1, 12, _NOMES_MESES),
+    (0, 7, _NOMES_DIAS),
+)
+
+
+class ErroCron(ValueError):
+    """Expressão cron inválida"""
+
+
+def _valor(texto, minimo, maximo, nomes):
+    texto = texto.strip().lower()
+    if texto in nomes:
+        return nomes[texto]
+    try:
+        valor = int(texto)
+    except ValueError:
+        raise ErroCron(f"valor inválido '{texto}'")
+    if not minimo <= valor <= maximo:
+        raise ErroCron(f"valor {valor} fora do intervalo {minimo}-{maximo}")
+    return valor
+
+
+def _expandir_campo(texto, minimo, maximo, nomes):
+    """Valores permitidos de um campo cron (sem contar '*' como restrição)"""
+    valores = set()
+    for parte in texto.split(','):
+        passo = 1
+        if '/' in parte:
+            parte, passo_texto = parte.split('/', 1)
+            try:
+                passo = int(passo_texto)
+            except ValueError:
+                raise ErroCron(f"passo inválido '{passo_texto}'")
+            if passo <= 0:
+                raise ErroCron("o passo deve ser positivo")
+        if parte in ('*', '?'):
+            inicio, fim = minimo, maximo
+        elif '-' in parte:
+            inicio_texto, fim_texto = parte.split('-', 1)
+            inicio = _valor(inicio_texto, minimo, maximo, nomes)
+            fim = _valor(fim_texto, minimo, maximo, nomes)
+            if fim < inicio:
+                raise ErroCron(f"intervalo invertido '{parte}'")
+        else:
+            inicio = _valor(parte, minimo, maximo, nomes)
+            fim = maximo if passo > 1 else inicio
+        valores.update(range(inicio, fim + 1, passo))
+    return valores
+
+
+@dataclass(frozen=True)
+class MascarasCron:
+    minutos: Any  # np.ndarray de 60 posições
+    horas: Any  # np.ndarray de 24 posições
+    dias_semana: Any  # np.ndarray de 7 posições
+
+
+def _exigir_texto(expressao):
+    # Valores lidos do YAML podem ser números ou listas (que nem entram nos caches)
+    if expressao is not None and not isinstance(expressao, str):
+        raise ErroCron(f"a expressão deve ser um texto (recebido {type(expressao).__name__}: {expressao!r})")
+
+
+def _conjuntos_cron(expressao) -> Optional[Tuple[FrozenSet[int], FrozenSet[int], FrozenSet[int]]]:
+    """
+    Minutos, horas e dias da semana em que a expressão dispara
+    Retorna None para agendamentos sem horário fixo (@once, None, vazio)
+    """
+    _exigir_texto(expressao)
+    return _conjuntos_cron_texto(expressao)
+
+
+@lru_cache(maxsize=4096)
+def _conjuntos_cron_texto(expressao):
+    expressao = (expressao or '').strip()
+    if expressao.lower() in ('', '@once', 'none', 'null'):
+        return None
+    expressao = _MACROS.get(expressao.lower(), expressao)
+    campos = expressao.split()
+    if len(campos) != 5:
+        raise ErroCron("a expressão deve ter 5 campos: minuto hora dia mês dia-da-semana")
+
+    conjuntos = [_expandir_campo(campo, *_CAMPOS[i]) for i, campo in enumerate(campos)]
+    minutos, horas, dias_mes, meses, dias_semana = conjuntos
+    if 7 in dias_semana:
+        dias_semana = (dias_semana - {7}) | {0}
+
+    # Com dia do mês restrito a DAG pode disparar em qualquer dia da semana
+    # (se os dois campos forem restritos, o cron dispara quando qualquer um corresponde)
+    if campos[2] not in ('*', '?'):
+        dias_semana = set(range(7))
+    return frozenset(minutos), frozenset(horas), frozenset(dias_semana)
+
+
+def interpretar_cron(expressao) -> Optional[MascarasCron]:
+    """
+    Converte a expressão em máscaras de minuto/hora/dia da semana
+    Retorna None para agendamentos sem horário fixo (@once, None, vazio)
+    """
+    _exigir_texto(expressao)
+    return _mascaras_cron(expressao)
+
+
+@lru_cache(maxsize=4096)
+def _mascaras_cron(expressao):
+    conjuntos = _conjuntos_cron_texto(expressao)
+    if conjuntos is None:
+        return None
+    import numpy as np
+
+    minutos, horas, dias_semana = conjuntos
+    mascara_minutos = np.zeros(60, dtype=bool)
+    mascara_minutos[sorted(minutos)] = True
+    mascara_horas = np.zeros(24, dtype=bool)
+    mascara_horas[sorted(horas)] = True
+    mascara_dias = np.zeros(7, dtype=bool)
+    mascara_dias[sorted(dias_semana)] = True
+    for mascara in (mascara_minutos, mascara_horas, mascara_dias):
+        mascara.setflags(write=False)
+    return MascarasCron(mascara_minutos, mascara_horas, mascara_dias)
+
+
+def validar_cron(expressao):
+    """Mensagem de erro da expressão, ou None se ela for válida"""
+    try:
+        _conjuntos_cron(expressao)
+    except ErroCron as e:
+        return str(e)
+    return None
+
+
+def ocupacao_semanal(agendamentos: Sequence[Tuple[str, float]]):
+    """
+    Ocupação de cada minuto da semana (vetor de 10080 posições) para uma lista de
+    (expressão cron, peso). Expressões inválidas ou sem horário são ignoradas.
+    """
+    import numpy as np
+
+    mascaras, pesos = [], []
+    for expressao, peso in agendamentos:
+        try:
+            mascara = interpretar_cron(expressao)
+        except ErroCron:
+            continue
+        if mascara is not None:
+            mascaras.append(mascara)
+            pesos.append(peso)
+    if not mascaras:
+        return np.zeros(MINUTOS_SEMANA, dtype=np.float64)
+
+    minutos = np.stack([m.minutos for m in mascaras]).astype(np.float64)
+    horas = np.stack([m.horas for m in mascaras]).astype(np.float64)
+    dias = np.stack([m.dias_semana for m in mascaras]).astype(np.float64)
+    pesos = np.asarray(pesos, dtype=np.float64)
+
+    # (N, 7, 24) -> (N, 168) ponderado; (168 x N) @ (N x 60) -> ocupação (dia, hora) x minuto
+    dia_hora = (dias[:, :, None] * horas[:, None, :]).reshape(len(pesos), 7 * 24) * pesos[:, None]
+    return (dia_hora.T @ minutos).reshape(MINUTOS_SEMANA)
+
+
+def formatar_minuto_semana(minuto):
+    dia, resto = divmod(int(minuto), MINUTOS_DIA)
+    return f"{DIAS_SEMANA[dia]} {resto // 60:02d}:{resto % 60:02d}"
+
+
+@dataclass
+class PontoQuente:
+    minuto_semana: int
+    tasks: float
+    dags: int
+
+    @property
+    def rotulo(self):
+        return formatar_minuto_semana(self.minuto_semana)
+
+
+@dataclass
+class AnaliseAgendamentos:
+    ocupacao_tasks: Any  # np.ndarray de MINUTOS_SEMANA posições
+    ocupacao_dags: Any
+    pico_tasks: float
+    pontos_quentes: List[PontoQuente]
+
+
+def analisar_agendamentos(agendamentos: Sequence[Tuple[str, float]], limite_pontos=10):
+    """
+    Colisões entre DAGs: minutos em que duas ou mais DAGs disparam, ordenados pela
+    quantidade de tasks ativas que começam juntas
+    """
+    import numpy as np
+
+    ocupacao_tasks = ocupacao_semanal(agendamentos)
+    ocupacao_dags = ocupacao_semanal([(expressao, 1.0) for expressao, _ in agendamentos])
+
+    colisoes = np.flatnonzero(ocupacao_dags >= 2)
+    ordem = colisoes[np.argsort(-ocupacao_tasks[colisoes], kind='stable')][:limite_pontos]
+    pontos = [PontoQuente(int(m), float(ocupacao_tasks[m]), int(ocupacao_dags[m])) for m in ordem]
+    return AnaliseAgendamentos(
+        ocupacao_tasks=ocupacao_tasks,
+        ocupacao_dags=ocupacao_dags,
+        pico_tasks=float(ocupacao_tasks.max(initial=0)),
+        pontos_quentes=pontos,
+    )
+
+
+def _formatar_campo(valores, minimo, maximo):
+    valores = sorted(valores)
+    if len(valores) == maximo - minimo + 1:
+        return '*'
+    if len(valores) == 1:
+        return str(valores[0])
+    passo = valores[1] - valores[0]
+    if all(b - a == passo for a, b in zip(valores, valores[1:])):
+        if passo == 1:
+            return f"{valores[0]}-{valores[-1]}"
+        if valores[-1] + passo > maximo:
+            return f"{valores[0]}-{maximo}/{passo}" if valores[0] else f"*/{passo}"
+    return ','.join(map(str, valores))
+
+
+def _campos_cron(expressao):
+    expressao = expressao.strip()
+    return (_MACROS[expressao.lower()] if expressao.startswith('@') else expressao).split()
+
+
+def _deslocar(campos, minutos, horas, dh, dm):
+    novos_minutos = {(int(m) + dm) % 60 for m in minutos}
+    novas_horas = {(int(h) + dh) % 24 for h in horas}
+    return ' '.join([_formatar_campo(novos_minutos, 0, 59), _formatar_campo(novas_horas, 0, 23), *campos[2:]])
+
+
+@dataclass
+class Sugestao:
+    expressao: str
+    carga: float
+
+
+def sugerir_horarios(expressao, ocupacao_outras, peso=1.0, quantidade=5):
+    """
+    Sugere deslocamentos de hora/minuto da expressão para os horários de menor carga,
+    considerando a ocupação das demais DAGs (vetor de ocupacao_semanal)
+    """
+    import numpy as np
+
+    mascara = interpretar_cron(expressao)
+    if mascara is None:
+        return []
+
+    ocupacao = np.asarray(ocupacao_outras, dtype=np.float64).reshape(7, 24, 60)
+    # Pior dia entre os dias em que a DAG dispara: (24 x 60)
+    pior_dia = ocupacao[mascara.dias_semana].max(axis=0)
+
+    # carga[dh, dm] = maior ocupação em qualquer disparo deslocado de (dh, dm)
+    horas = np.flatnonzero(mascara.horas)
+    minutos = np.flatnonzero(mascara.minutos)
+    carga = np.full((24, 60), -np.inf)
+    for hora in horas:
+        deslocado_h = np.roll(pior_dia, -hora, axis=0)
+        for minuto in minutos:
+            np.maximum(carga, np.roll(deslocado_h, -minuto, axis=1), out=carga)
+    carga += peso
+
+    campos = _campos_cron(expressao)
+    # Empate na carga: prefere o menor deslocamento em relação ao horário atual
+    distancia = np.minimum(np.arange(24), 24 - np.arange(24))[:, None] * 60 + \
+        np.minimum(np.arange(60), 60 - np.arange(60))[None, :]
+    ordem = np.lexsort((distancia.ravel(), carga.ravel()))[:quantidade]
+
+    sugestoes = []
+    for indice in ordem:
+        dh, dm = divmod(int(indice), 60)
+        sugestoes.append(Sugestao(_deslocar(campos, minutos, horas, dh, dm), float(carga.flat[indice])))
+    return sugestoes
+
+
+def deslocar_cron(expressao, minutos):
+    """
+    Expressão com hora e minuto deslocados (ex.: '0 3 * * *' + 75 -> '15 4 * * *')
+    Como nas sugestões de horário, minuto e hora de cada disparo são deslocados em
+    separado (sem passar o dia). Expressões sem horário fixo são mantidas.
+    """
+    conjuntos = _conjuntos_cron(expressao)
+    if conjuntos is None:
+        return expressao
+    dh, dm = divmod(int(minutos) % MINUTOS_DIA, 60)
+    return _deslocar(_campos_cron(expressao), conjuntos[0], conjuntos[1], dh, dm)
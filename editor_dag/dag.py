@@ -0,0 +1,124 @@
+"""Regras de leitura, validação e alteração de DAGs, independentes do Streamlit"""
+from datetime import date
+
+from editor_dag.ordem import ListaTasks
+from editor_dag.serializacao import carregar_yaml, gerar_yaml
+
+
+class ErroEstruturaDag(ValueError):
+    """O conteúdo lido não tem a estrutura esperada de uma DAG"""
+
+
+EMAIL_FALHA_PADRAO = 'rodrigo.silva@ext.saint-gobain.com'
+
+
+def nova_dag():
+    """DAG vazia com o cabeçalho padrão; a data inicial é a do dia em que a DAG é criada"""
+    return {
+        'dag': {
+            'descricao': '',
+            'dono': '',
+            'email_em_falha': EMAIL_FALHA_PADRAO,
+            'data_inicial': date.today().strftime('%Y-%m-%d'),
+            'agendamento_cron': '0 0 * * *',
+            'tags': '',
+            'quantidade_tentativas': 2,
+            'tempo_para_tentativa': 1,
+            'ordem_execução': ''
+        },
+        'tasks': []
+    }
+
+
+def validar_estrutura(dag_data):
+    """Confere se os dados têm as seções 'dag' (dicionário) e 'tasks' (lista de dicionários, pode ser vazia)"""
+    if not isinstance(dag_data, dict):
+        raise ErroEstruturaDag("O arquivo YAML deve ser um dicionário")
+    if 'dag' not in dag_data or 'tasks' not in dag_data:
+        raise ErroEstruturaDag("O arquivo YAML deve conter as seções 'dag' e 'tasks'")
+    if not isinstance(dag_data['dag'], dict):
+        raise ErroEstruturaDag("A seção 'dag' deve ser um dicionário de configurações")
+    tasks = dag_data['tasks']
+    if isinstance(tasks, ListaTasks) or tasks is None:
+        return dag_data
+    if not isinstance(tasks, list):
+        raise ErroEstruturaDag("A seção 'tasks' deve ser uma lista de tasks")
+    for i, task in enumerate(tasks):
+        if not isinstance(task, dict):
+            raise ErroEstruturaDag(f"A task {i} deve ser um dicionário de campos")
+    return dag_data
+
+
+def carregar_dag(conteudo):
+    """
+    Lê o YAML (texto ou bytes) e valida a estrutura da DAG
+    Lança yaml.YAMLError para YAML inválido e ErroEstruturaDag para estrutura inválida
+    """
+    if isinstance(conteudo, bytes):
+        conteudo = conteudo.decode('utf-8')
+    return validar_estrutura(carregar_yaml(conteudo))
+
+
+def carregar_dag_arquivo(caminho):
+    """Lê e valida a DAG de um arquivo em disco"""
+    with open(caminho, 'r', encoding='utf-8') as f:
+        return carregar_dag(f.read())
+
+
+def renumerar_tasks(tasks, inicio=0):
+    """Atualiza o task_num das tasks a partir da posição informada"""
+    for i in range(inicio, len(tasks)):
+        tasks[i]['task_num'] = i
+
+
+def adicionar_task(dag_data, task, posicao=None):
+    """Adiciona a task no final ou na posição informada, renumerando as seguintes"""
+    tasks = dag_data['tasks']
+    if posicao is None or posicao >= len(tasks):
+        task['task_num'] = len(tasks)
+        tasks.append(task)
+        return task
+    tasks.insert(posicao, task)
+    renumerar_tasks(tasks, posicao)
+    return task
+
+
+def atualizar_task(dag_data, posicao, task):
+    """Substitui a task da posição informada"""
+    dag_data['tasks'][posicao] = task
+    return task
+
+
+def remover_tasks(dag_data, posicoes):
+    """Remove várias tasks (por posição) em uma única passada e renumera as restantes"""
+    remover = set(posicoes)
+    dag_data['tasks'] = [task for i, task in enumerate(dag_data['tasks']) if i not in remover]
+    renumerar_tasks(dag_data['tasks'])
+    return dag_data['tasks']
+
+
+def remover_task(dag_data, task_num):
+    """Remove as tasks com o task_num informado"""
+    posicoes = [i for i, task in enumerate(dag_data['tasks']) if task.get('task_num') == task_num]
+    return remover_tasks(dag_data, posicoes)
+
+
+def preparar_para_edicao(dag_data):
+    """Troca a lista de tasks por uma ListaTasks (ids estáveis) para uso no editor"""
+    if not isinstance(dag_data['tasks'], ListaTasks):
+        dag_data['tasks'] = ListaTasks(dag_data['tasks'] or [])
+    return dag_data
+
+
+def dag_para_dict(dag_data):
+    """Versão da DAG só com tipos simples, com o task_num definido pela posição"""
+    tasks = dag_data['tasks']
+    if isinstance(tasks, ListaTasks):
+        return {**dag_data, 'tasks': tasks.para_lista()}
+    return dag_data
+
+
+def gerar_yaml_dag(dag_data, stream=None):
+    """Serializa a DAG no formato de download do editor"""
+    return gerar_yaml(dag_para_dict(dag_data), stream)
+
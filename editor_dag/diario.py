@@ -0,0 +1,350 @@
+"""
+Gravação automática da DAG em edição em um diário local (write-ahead)
+
+A DAG em edição só existe no estado da sessão: um refresh do navegador ou um
+reinício do servidor perdem tudo o que não foi baixado ou salvo. Cada
+documento aberto (DAG nova, enviada ou do workspace) tem um diário em
+EDITOR_DAG_AUTOSAVE_DIR (padrão: ~/.cache/editor_dag/autosave, ou no
+XDG_CACHE_HOME) com três arquivos:
+
+    <hash>.original   documento como foi carregado (para a comparação e o patch)
+    <hash>.snapshot   linha JSON {chave, nome, dono, versao, ...} e a DAG completa
+    <hash>.diario     registros acrescentados a cada alteração
+
+A DAG e os registros são lidos com pickle: o diretório precisa ser do usuário
+do servidor e fechado aos demais (ver ociosidade.diretorio_privado), senão
+nada é lido nem gravado. Listar os documentos pendentes lê só a linha JSON
+dos snapshots e os cabeçalhos dos registros, sem pickle.
+
+O dono identifica quem editou (usuário logado ou navegador, ver
+interface.estado.dono_sessao): cada um só vê na lista de pendentes os seus
+documentos. Um Diario privado (o de um arquivo enviado) ignora o diário em disco
+de outro dono: ele não é oferecido para restauração nem restaurado, e iniciar()
+grava por cima.
+
+Cada registro é a Alteracao do histórico (só as entradas tocadas, ver
+editor_dag.historico) com um cabeçalho de 16 bytes: tamanho, crc32 e a versão
+do documento, que cresce um a cada registro. Gravar uma alteração custa o
+tamanho dela, não o da DAG; a cada EDITOR_DAG_AUTOSAVE_REGISTROS registros
+(padrão: 200) o diário é compactado: a DAG inteira vai para o snapshot e o
+diário recomeça vazio. O snapshot é gravado antes de o diário ser trocado e
+guarda a versão até onde vai, então uma queda entre os dois passos só faz a
+restauração pular os registros já incluídos nele; um registro pela metade no
+fim do diário (queda durante a gravação) é descartado.
+
+Várias abas podem abrir o mesmo documento. Cada Diario guarda a assinatura
+(inode, tamanho e data) do arquivo do diário da última gravação que fez; se
+outra aba gravou depois, sincronizado é False, acrescentar() não grava e a
+interface pergunta qual versão manter: restaurar() traz a do disco e
+iniciar() grava a desta aba por cima. Diários sem alterações (versão 0) e os
+parados há mais de EDITOR_DAG_AUTOSAVE_DIAS (padrão: 7) não são oferecidos para
+restauração; os antigos são apagados por listar_pendentes().
+
+Este módulo não depende do Streamlit. EDITOR_DAG_AUTOSAVE=0 desativa a gravação.
+"""
+import glob
+import hashlib
+import json
+import os
+import pickle
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Optional
+
+from editor_dag.ociosidade import DIRETORIO_CACHE, diretorio_privado
+
+ATIVO = os.environ.get('EDITOR_DAG_AUTOSAVE', '1') != '0'
+DIRETORIO_PADRAO = os.environ.get('EDITOR_DAG_AUTOSAVE_DIR') or os.path.join(DIRETORIO_CACHE, 'autosave')
+REGISTROS_PADRAO = int(os.environ.get('EDITOR_DAG_AUTOSAVE_REGISTROS', 200))
+DIAS_PADRAO = float(os.environ.get('EDITOR_DAG_AUTOSAVE_DIAS', 7))
+
+# tamanho do registro, crc32 do registro, versão do documento
+_CABECALHO_REGISTRO = struct.Struct('>IIQ')
+_EXTENSOES = ('.snapshot', '.diario', '.original')
+
+# Uma trava por documento, compartilhada pelas sessões do processo (o Diario
+# fica no estado da sessão e precisa ser serializável)
+_travas = {}
+_trava_travas = threading.Lock()
+
+
+def _trava(chave):
+    with _trava_travas:
+        return _travas.setdefault(chave, threading.Lock())
+
+
+@dataclass
+class SituacaoDiario:
+    """Documento com diário em disco, lido sem carregar a DAG"""
+    chave: str
+    nome: str
+    versao: int
+    hora: float
+    workspace_arquivo: Optional[str] = None
+    dono: Optional[str] = None
+
+
+def _gravar_atomico(caminho, *partes):
+    """Grava as partes (bytes como estão, demais objetos em pickle) via arquivo temporário + os.replace"""
+    diretorio = os.path.dirname(caminho)
+    fd, temporario = tempfile.mkstemp(prefix='.tmp_', dir=diretorio)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            for parte in partes:
+                if isinstance(parte, bytes):
+                    f.write(parte)
+                else:
+                    pickle.dump(parte, f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporario, caminho)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+
+
+def _ler_meta(arquivo):
+    """Cabeçalho JSON do snapshot aberto, ou None se ele está corrompido"""
+    try:
+        meta = json.loads(arquivo.readline())
+    except ValueError:
+        return None
+    return meta if isinstance(meta, dict) and 'chave' in meta and 'versao' in meta else None
+
+
+def _ler_registros(caminho_diario, carregar=True):
+    """
+    (versão, registro) de cada registro íntegro do diário, em ordem; para no primeiro
+    registro incompleto ou corrompido. Sem carregar, o registro é None e só os
+    cabeçalhos são lidos
+    """
+    try:
+        f = open(caminho_diario, 'rb')
+    except FileNotFoundError:
+        return
+    with f:
+        fim = os.fstat(f.fileno()).st_size
+        while True:
+            cabecalho = f.read(_CABECALHO_REGISTRO.size)
+            if len(cabecalho) < _CABECALHO_REGISTRO.size:
+                return
+            tamanho, crc, versao = _CABECALHO_REGISTRO.unpack(cabecalho)
+            if not carregar:
+                if f.tell() + tamanho > fim:
+                    return
+                f.seek(tamanho, os.SEEK_CUR)
+                yield versao, None
+                continue
+            dados = f.read(tamanho)
+            if len(dados) < tamanho or zlib.crc32(dados) != crc:
+                return
+            try:
+                registro = pickle.loads(dados)
+            except (pickle.UnpicklingError, EOFError, AttributeError, ImportError, ValueError):
+                return
+            yield versao, registro
+
+
+def _situacao(base):
+    try:
+        with open(base + '.snapshot', 'rb') as f:
+            meta = _ler_meta(f)
+    except OSError:
+        return None
+    if meta is None:
+        return None
+    versao = meta['versao']
+    for versao_registro, _ in _ler_registros(base + '.diario', carregar=False):
+        versao = max(versao, versao_registro)
+    hora = meta['hora']
+    try:
+        hora = max(hora, os.path.getmtime(base + '.diario'))
+    except OSError:
+        pass
+    return SituacaoDiario(meta['chave'], meta['nome'], versao, hora, meta.get('workspace_arquivo'), meta.get('dono'))
+
+
+class Diario:
+    """Diário em disco de um documento (chave: identifica o documento entre sessões)"""
+
+    def __init__(self, chave, nome, workspace_arquivo=None, dono=None, diretorio=DIRETORIO_PADRAO,
+                 limite_registros=REGISTROS_PADRAO, privado=False):
+        self.chave = chave
+        self.nome = nome
+        self.workspace_arquivo = workspace_arquivo
+        self.dono = dono
+        # Só o diário do mesmo dono conta (documentos que não são compartilhados entre usuários)
+        self.privado = privado
+        self.diretorio = diretorio
+        self.limite_registros = limite_registros
+        self.versao = 0
+        # Registros acrescentados desde o último snapshot
+        self.registros = 0
+        self._assinatura = None
+        self._base = os.path.join(diretorio, hashlib.sha1(chave.encode('utf-8')).hexdigest()[:24])
+
+    def _caminho(self, extensao):
+        return self._base + extensao
+
+    def _assinar(self):
+        try:
+            estado = os.stat(self._caminho('.diario'))
+        except FileNotFoundError:
+            return None
+        return estado.st_ino, estado.st_size, estado.st_mtime_ns
+
+    @property
+    def iniciado(self):
+        """Esta sessão já gravou o diário (iniciar ou restaurar)"""
+        return self._assinatura is not None
+
+    @property
+    def sincronizado(self):
+        """False se o diário em disco não é o que esta sessão gravou por último (outra aba ou nunca iniciado)"""
+        return self._assinatura is not None and self._assinatura == self._assinar()
+
+    def _snapshot(self, dag_data):
+        meta = {
+            'chave': self.chave,
+            'nome': self.nome,
+            'versao': self.versao,
+            'workspace_arquivo': self.workspace_arquivo,
+            'dono': self.dono,
+            'hora': time.time(),
+        }
+        cabecalho = json.dumps(meta, ensure_ascii=False).encode('utf-8') + b'\n'
+        _gravar_atomico(self._caminho('.snapshot'), cabecalho, dag_data)
+        # Um diário novo (outro inode) também faz as outras abas perceberem a troca
+        _gravar_atomico(self._caminho('.diario'))
+        self.registros = 0
+        self._assinatura = self._assinar()
+
+    def iniciar(self, dag_data, original=None, versao=0):
+        """Grava o documento inteiro como ponto de partida, substituindo o diário de outras abas"""
+        with _trava(self.chave):
+            diretorio_privado(self.diretorio)
+            _gravar_atomico(self._caminho('.original'), original)
+            self.versao = versao
+            self._snapshot(dag_data)
+
+    def acrescentar(self, alteracoes, dag_data):
+        """
+        Acrescenta as alterações (Alteracao do histórico) ao diário e compacta quando ele
+        chega ao limite; retorna False, sem gravar, se outra aba gravou o diário antes
+        """
+        if not alteracoes:
+            return True
+        with _trava(self.chave):
+            if not self.sincronizado:
+                return False
+            diretorio_privado(self.diretorio)
+            proximo_id = dag_data['tasks'].proximo_id
+            partes = []
+            for alteracao in alteracoes:
+                self.versao += 1
+                dados = pickle.dumps({'alteracao': alteracao, 'proximo_id': proximo_id, 'hora': time.time()},
+                                     protocol=pickle.HIGHEST_PROTOCOL)
+                partes.append(_CABECALHO_REGISTRO.pack(len(dados), zlib.crc32(dados), self.versao))
+                partes.append(dados)
+            fd = os.open(self._caminho('.diario'), os.O_WRONLY | os.O_APPEND)
+            try:
+                os.write(fd, b''.join(partes))
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            self.registros += len(alteracoes)
+            self._assinatura = self._assinar()
+            if self.registros >= self.limite_registros:
+                self._snapshot(dag_data)
+        return True
+
+    def _alheio(self, dono):
+        return self.privado and dono != self.dono
+
+    def situacao_disco(self):
+        """SituacaoDiario do documento em disco, ou None se não há diário dele (ou é de outro dono)"""
+        situacao = _situacao(self._base)
+        if situacao is not None and self._alheio(situacao.dono):
+            return None
+        return situacao
+
+    def restaurar(self):
+        """
+        (dag_data, original) reconstruídos do snapshot e do diário; esta sessão passa a ser a
+        dona do diário. Lança OSError (DiretorioInseguro se o diretório não for privado) ou
+        pickle.UnpicklingError se o snapshot não puder ser lido
+        """
+        with _trava(self.chave):
+            diretorio_privado(self.diretorio)
+            with open(self._caminho('.snapshot'), 'rb') as f:
+                meta = _ler_meta(f)
+                if meta is None:
+                    raise pickle.UnpicklingError(f"Snapshot corrompido: {self._caminho('.snapshot')}")
+                if self._alheio(meta.get('dono')):
+                    raise PermissionError(f"O diário de '{self.nome}' é de outro usuário")
+                dag_data = pickle.load(f)
+            try:
+                with open(self._caminho('.original'), 'rb') as f:
+                    original = pickle.load(f)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                original = None
+
+            versao = meta['versao']
+            for versao_registro, registro in _ler_registros(self._caminho('.diario')):
+                # Registros já incluídos no snapshot (queda durante a compactação)
+                if versao_registro <= meta['versao']:
+                    continue
+                registro['alteracao'].aplicar(dag_data)
+                dag_data['tasks'].reservar_ids(registro['proximo_id'])
+                versao = versao_registro
+
+            # O restaurado vira o novo ponto de partida (descarta um registro pela metade no fim)
+            self.versao = versao
+            self._snapshot(dag_data)
+        return dag_data, original
+
+    def descartar(self):
+        """Apaga os arquivos do diário"""
+        with _trava(self.chave):
+            for extensao in _EXTENSOES:
+                try:
+                    os.remove(self._caminho(extensao))
+                except FileNotFoundError:
+                    pass
+            self._assinatura = None
+
+
+def listar_pendentes(dono, diretorio=DIRETORIO_PADRAO, dias=DIAS_PADRAO):
+    """
+    Documentos do dono com alterações gravadas (versão > 0), do mais recente ao mais
+    antigo; apaga os diários (de qualquer dono) parados há mais de `dias`. Sem dono,
+    só apaga os antigos. Lança DiretorioInseguro se o diretório não for privado
+    """
+    if not os.path.isdir(diretorio):
+        return []
+    diretorio_privado(diretorio)
+    limite = time.time() - dias * 86400
+    pendentes = []
+    for caminho in glob.glob(os.path.join(glob.escape(diretorio), '*.snapshot')):
+        base = caminho[:-len('.snapshot')]
+        situacao = _situacao(base)
+        if situacao is not None and situacao.hora >= limite:
+            if dono is not None and situacao.dono == dono and situacao.versao > 0:
+                pendentes.append(situacao)
+            continue
+        try:
+            antigo = os.path.getmtime(caminho) < limite
+        except OSError:
+            continue
+        if antigo:
+            for extensao in _EXTENSOES:
+                try:
+                    os.remove(base + extensao)
+                except OSError:
+                    pass
+    return sorted(pendentes, key=lambda situacao: -situacao.hora)
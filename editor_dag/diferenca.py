@@ -0,0 +1,275 @@
+"""
+Diferença estrutural entre a DAG carregada e a DAG editada
+
+As tasks são casadas pelo identificador_task (a k-ésima ocorrência de um
+identificador repetido casa com a k-ésima ocorrência do outro lado), então a
+comparação é linear mesmo quando as tasks mudaram de lugar. O conteúdo só é
+comparado campo a campo quando o hash da task muda; como as tasks da ListaTasks
+são substituídas e nunca alteradas no lugar, uma task que ainda é o mesmo
+objeto do original nem precisa ser hasheada.
+
+Uma task só conta como movida se saiu da ordem relativa das demais (fica fora
+da maior subsequência de tasks que manteve a ordem original); inserir ou
+remover uma task não faz as seguintes aparecerem como movidas.
+
+A diferença pode ser exportada como um patch JSON compacto:
+
+    {"formato": "editor_dag/patch", "versao": 1,
+     "dag": {"definir": {campo: valor}, "remover": [campo]},
+     "tasks": {"remover": [chave],
+               "alterar": {chave: {"definir": {...}, "remover": [...]}},
+               "adicionar": {chave: task},
+               "posicionar": [[chave, chave_anterior ou null], ...]}}
+
+A chave de uma task é o identificador_task (com "#k" a partir da segunda
+ocorrência de um identificador repetido). "posicionar" lista as tasks
+adicionadas e movidas na ordem final, cada uma com a task que deve ficar
+imediatamente antes dela.
+"""
+import bisect
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+FORMATO_PATCH = 'editor_dag/patch'
+VERSAO_PATCH = 1
+
+# Campo que não existe de um dos lados da comparação
+AUSENTE = object()
+
+# Campos derivados da posição, ignorados na comparação
+_CAMPOS_IGNORADOS = ('task_num',)
+
+
+class ErroPatch(ValueError):
+    """Patch JSON inválido"""
+
+
+def hash_task(task):
+    """Hash estável do conteúdo da task (sem o task_num, que depende da posição)"""
+    conteudo = {campo: valor for campo, valor in task.items() if campo not in _CAMPOS_IGNORADOS}
+    texto = json.dumps(conteudo, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.blake2b(texto.encode('utf-8'), digest_size=16).digest()
+
+
+def chaves_tasks(tasks):
+    """Chave de cada task, na ordem: o identificador, com '#k' nas repetições"""
+    vistos = {}
+    chaves = []
+    for task in tasks:
+        identificador = str(task.get('identificador_task') or '')
+        ocorrencia = vistos.get(identificador, 0)
+        vistos[identificador] = ocorrencia + 1
+        chaves.append(identificador if ocorrencia == 0 else f"{identificador}#{ocorrencia}")
+    return chaves
+
+
+def diferenca_campos(antes, depois, ignorar=()):
+    """{campo: (antes, depois)} dos campos que mudaram (AUSENTE onde o campo não existe)"""
+    return {
+        campo: (antes.get(campo, AUSENTE), depois.get(campo, AUSENTE))
+        for campo in antes.keys() | depois.keys()
+        if campo not in ignorar and antes.get(campo, AUSENTE) != depois.get(campo, AUSENTE)
+    }
+
+
+def _estaveis(posicoes):
+    """Índices (em `posicoes`) da maior subsequência crescente, em O(n log n)"""
+    finais = []      # menor posição final de uma subsequência de cada tamanho
+    indices = []     # índice em `posicoes` desse final
+    anteriores = [-1] * len(posicoes)
+    for i, posicao in enumerate(posicoes):
+        tamanho = bisect.bisect_left(finais, posicao)
+        if tamanho == len(finais):
+            finais.append(posicao)
+            indices.append(i)
+        else:
+            finais[tamanho] = posicao
+            indices[tamanho] = i
+        anteriores[i] = indices[tamanho - 1] if tamanho else -1
+    estaveis = set()
+    i = indices[-1] if indices else -1
+    while i != -1:
+        estaveis.add(i)
+        i = anteriores[i]
+    return estaveis
+
+
+class Original:
+    """
+    Documento como foi carregado. O cabeçalho é copiado (ele é editado no lugar);
+    as tasks são compartilhadas com a DAG em edição
+    """
+
+    def __init__(self, dag_data):
+        self.cabecalho = dict(dag_data['dag'])
+        self.tasks = list(dag_data['tasks'])
+        self.chaves = chaves_tasks(self.tasks)
+        self.posicoes = {chave: i for i, chave in enumerate(self.chaves)}
+        self._hashes = [None] * len(self.tasks)
+
+    def hash(self, posicao):
+        if self._hashes[posicao] is None:
+            self._hashes[posicao] = hash_task(self.tasks[posicao])
+        return self._hashes[posicao]
+
+
+@dataclass
+class Diferenca:
+    cabecalho: Dict[str, Tuple[Any, Any]] = field(default_factory=dict)
+    # (chave, posição atual, task)
+    adicionadas: List[Tuple[str, int, dict]] = field(default_factory=list)
+    # (chave, posição original)
+    removidas: List[Tuple[str, int]] = field(default_factory=list)
+    # (chave, posição original, posição atual)
+    movidas: List[Tuple[str, int, int]] = field(default_factory=list)
+    # (chave, {campo: (antes, depois)})
+    alteradas: List[Tuple[str, Dict[str, Tuple[Any, Any]]]] = field(default_factory=list)
+    # (chave, chave anterior na ordem final ou None) das adicionadas e movidas
+    posicionar: List[Tuple[str, Optional[str]]] = field(default_factory=list)
+
+    @property
+    def vazia(self):
+        return not (self.cabecalho or self.adicionadas or self.removidas or self.movidas or self.alteradas)
+
+
+def comparar(original, dag_data):
+    """Diferença entre o Original e a DAG atual (tasks em lista ou ListaTasks)"""
+    diferenca = Diferenca(cabecalho=diferenca_campos(original.cabecalho, dag_data['dag']))
+
+    atuais = list(dag_data['tasks'])
+    chaves = chaves_tasks(atuais)
+    casadas = []  # (posição atual, posição original)
+    for posicao, (chave, task) in enumerate(zip(chaves, atuais)):
+        posicao_original = original.posicoes.get(chave)
+        if posicao_original is None:
+            diferenca.adicionadas.append((chave, posicao, task))
+            continue
+        casadas.append((posicao, posicao_original))
+        anterior = original.tasks[posicao_original]
+        if anterior is not task and original.hash(posicao_original) != hash_task(task):
+            diferenca.alteradas.append((chave, diferenca_campos(anterior, task, _CAMPOS_IGNORADOS)))
+
+    presentes = set(chaves)
+    diferenca.removidas = [(chave, i) for i, chave in enumerate(original.chaves) if chave not in presentes]
+
+    estaveis = _estaveis([posicao_original for _, posicao_original in casadas])
+    reposicionar = {posicao for _, posicao, _ in diferenca.adicionadas}
+    for i, (posicao, posicao_original) in enumerate(casadas):
+        if i not in estaveis:
+            diferenca.movidas.append((chaves[posicao], posicao_original, posicao))
+            reposicionar.add(posicao)
+    diferenca.posicionar = [
+        (chaves[posicao], chaves[posicao - 1] if posicao else None) for posicao in sorted(reposicionar)
+    ]
+    return diferenca
+
+
+def _definir_remover(campos):
+    secao = {}
+    definir = {campo: depois for campo, (_, depois) in campos.items() if depois is not AUSENTE}
+    remover = sorted(campo for campo, (_, depois) in campos.items() if depois is AUSENTE)
+    if definir:
+        secao['definir'] = definir
+    if remover:
+        secao['remover'] = remover
+    return secao
+
+
+def gerar_patch(diferenca):
+    """Patch JSON (dicionário) equivalente à diferença"""
+    patch = {'formato': FORMATO_PATCH, 'versao': VERSAO_PATCH}
+    cabecalho = _definir_remover(diferenca.cabecalho)
+    if cabecalho:
+        patch['dag'] = cabecalho
+
+    tasks = {}
+    if diferenca.removidas:
+        tasks['remover'] = [chave for chave, _ in diferenca.removidas]
+    if diferenca.alteradas:
+        tasks['alterar'] = {chave: _definir_remover(campos) for chave, campos in diferenca.alteradas}
+    if diferenca.adicionadas:
+        tasks['adicionar'] = {
+            chave: {campo: valor for campo, valor in task.items() if campo not in _CAMPOS_IGNORADOS}
+            for chave, _, task in diferenca.adicionadas
+        }
+    if diferenca.posicionar:
+        tasks['posicionar'] = [list(par) for par in diferenca.posicionar]
+    if tasks:
+        patch['tasks'] = tasks
+    return patch
+
+
+def patch_para_json(patch):
+    return json.dumps(patch, ensure_ascii=False, separators=(',', ':'), default=str)
+
+
+def carregar_patch(conteudo):
+    """Lê e confere o patch JSON (texto ou bytes)"""
+    if isinstance(conteudo, bytes):
+        conteudo = conteudo.decode('utf-8')
+    try:
+        patch = json.loads(conteudo)
+    except json.JSONDecodeError as e:
+        raise ErroPatch(f"JSON inválido: {e}")
+    if not isinstance(patch, dict) or patch.get('formato') != FORMATO_PATCH:
+        raise ErroPatch("O arquivo não é um patch de DAG do editor")
+    if patch.get('versao') != VERSAO_PATCH:
+        raise ErroPatch(f"Versão de patch não suportada: {patch.get('versao')}")
+    return patch
+
+
+def aplicar_patch(dag_data, patch):
+    """
+    Aplica o patch a uma DAG em edição (tasks em ListaTasks) e devolve a lista de
+    avisos das operações que não encontraram a task esperada e foram ignoradas
+    """
+    avisos = []
+    cabecalho = patch.get('dag', {})
+    dag_data['dag'].update(cabecalho.get('definir', {}))
+    for campo in cabecalho.get('remover', []):
+        dag_data['dag'].pop(campo, None)
+
+    tasks = dag_data['tasks']
+    operacoes = patch.get('tasks', {})
+    itens = tasks.itens()
+    ids = dict(zip(chaves_tasks([task for _, task in itens]), (task_id for task_id, _ in itens)))
+
+    remover = []
+    for chave in operacoes.get('remover', []):
+        if chave in ids:
+            remover.append(ids.pop(chave))
+        else:
+            avisos.append(f"Remover '{chave}': task não encontrada")
+    tasks.remover_varios(remover)
+
+    for chave, campos in operacoes.get('alterar', {}).items():
+        if chave not in ids:
+            avisos.append(f"Alterar '{chave}': task não encontrada")
+            continue
+        task = {**tasks.task(ids[chave]), **campos.get('definir', {})}
+        for campo in campos.get('remover', []):
+            task.pop(campo, None)
+        tasks.substituir(ids[chave], task)
+
+    adicionar = operacoes.get('adicionar', {})
+    for chave, anterior in operacoes.get('posicionar', []):
+        if anterior is None:
+            referencia = None
+        elif anterior in ids:
+            referencia = ids[anterior]
+        else:
+            avisos.append(f"Posicionar '{chave}': task anterior '{anterior}' não encontrada, colocada no final")
+            referencia = tasks.id_na_posicao(-1) if tasks else None
+
+        if chave in adicionar:
+            if chave in ids:
+                avisos.append(f"Adicionar '{chave}': a task já existe e foi mantida")
+                continue
+            ids[chave] = tasks.inserir_apos(referencia, dict(adicionar[chave]))
+        elif chave in ids:
+            tasks.mover_para(ids[chave], referencia)
+        else:
+            avisos.append(f"Mover '{chave}': task não encontrada")
+    return avisos
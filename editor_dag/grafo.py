@@ -0,0 +1,380 @@
+"""
+Grafo de dependências a partir do campo ordem_execução
+
+Sintaxe aceita (no estilo do Airflow), uma ou mais instruções por linha,
+separadas por quebra de linha ou ';':
+
+    extrair >> [transformar_a, transformar_b] >> publicar
+    notificar << publicar
+    # comentários são ignorados
+
+A validação é incremental: ao mudar o texto, só as linhas alteradas são
+interpretadas de novo, e ciclos/tasks inalcançáveis são recalculados apenas nos
+componentes do grafo que contêm arestas ou tasks alteradas. Ordem topológica,
+caminho crítico e largura máxima são calculados sob demanda e guardados até a
+próxima alteração.
+"""
+import re
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+_IDENTIFICADOR = re.compile(r'^[A-Za-z0-9_.\-]+$')
+_OPERADOR = re.compile(r'(>>|<<)')
+_SEPARADOR_INSTRUCOES = re.compile(r';')
+
+LIMITE_CACHE_LINHAS = 4096
+
+
+@dataclass(frozen=True)
+class LinhaInterpretada:
+    arestas: Tuple[Tuple[str, str], ...] = ()
+    nos: Tuple[str, ...] = ()
+    erros: Tuple[str, ...] = ()
+
+
+def _interpretar_operando(texto):
+    texto = texto.strip()
+    if texto.startswith('['):
+        if not texto.endswith(']'):
+            return None, f"colchete sem fechamento em '{texto}'"
+        texto = texto[1:-1]
+    elif texto.endswith(']'):
+        return None, f"colchete sem abertura em '{texto}'"
+    nomes = [nome.strip() for nome in texto.split(',') if nome.strip()]
+    if not nomes:
+        return None, "operando vazio"
+    invalidos = [nome for nome in nomes if not _IDENTIFICADOR.match(nome)]
+    if invalidos:
+        return None, f"identificador inválido: {', '.join(invalidos)}"
+    return nomes, None
+
+
+def interpretar_linha(linha):
+    """Converte uma linha do ordem_execução em arestas (origem, destino)"""
+    linha = linha.split('#', 1)[0]
+    arestas, nos, erros = [], [], []
+    for instrucao in _SEPARADOR_INSTRUCOES.split(linha):
+        if not instrucao.strip():
+            continue
+        partes = _OPERADOR.split(instrucao)
+        operandos = []
+        for parte in partes[0::2]:
+            nomes, erro = _interpretar_operando(parte)
+            if erro:
+                erros.append(erro)
+                break
+            operandos.append(nomes)
+        else:
+            operadores = partes[1::2]
+            for nomes in operandos:
+                nos.extend(nomes)
+            for esquerda, operador, direita in zip(operandos, operadores, operandos[1:]):
+                origem, destino = (esquerda, direita) if operador == '>>' else (direita, esquerda)
+                arestas.extend((o, d) for o in origem for d in destino)
+    return LinhaInterpretada(tuple(arestas), tuple(nos), tuple(erros))
+
+
+@dataclass
+class Metricas:
+    ordem_topologica: List[str] = field(default_factory=list)
+    caminho_critico: List[str] = field(default_factory=list)
+    largura_maxima: int = 0
+    niveis: Dict[str, int] = field(default_factory=dict)
+
+
+class GrafoExecucao:
+    """Grafo de dependências entre tasks, mantido de forma incremental"""
+
+    def __init__(self):
+        self._texto = None
+        self._linhas = Counter()
+        self._cache_linhas = {}
+        self._contagem_arestas = Counter()
+        self._contagem_nos_citados = Counter()
+        self._sucessores = {}
+        self._predecessores = {}
+        self._tasks = Counter()
+        self._linhas_com_erro = Counter()
+
+        self._ciclos = {}  # id do ciclo -> frozenset de nós
+        self._ciclo_do_no = {}
+        self._proximo_ciclo = 0
+        self._inalcancaveis = set()
+        self._desconhecidos = set()
+
+        self.versao = 0
+        self._metricas = None
+        self._versao_metricas = -1
+
+    # Atualização
+
+    def _linha_interpretada(self, linha):
+        resultado = self._cache_linhas.get(linha)
+        if resultado is None:
+            if len(self._cache_linhas) >= LIMITE_CACHE_LINHAS:
+                self._cache_linhas.clear()
+            resultado = self._cache_linhas[linha] = interpretar_linha(linha)
+        return resultado
+
+    def _garantir_no(self, no):
+        if no not in self._sucessores:
+            self._sucessores[no] = set()
+            self._predecessores[no] = set()
+
+    def _descartar_no_se_isolado(self, no):
+        if (no in self._sucessores and not self._sucessores[no] and not self._predecessores[no]
+                and not self._contagem_nos_citados[no] and not self._tasks[no]):
+            del self._sucessores[no]
+            del self._predecessores[no]
+
+    def _aplicar_linha(self, linha, sinal, sujos):
+        resultado = self._linha_interpretada(linha)
+        if resultado.erros:
+            self._linhas_com_erro[linha] += sinal
+            if self._linhas_com_erro[linha] <= 0:
+                del self._linhas_com_erro[linha]
+        for no in resultado.nos:
+            self._contagem_nos_citados[no] += sinal
+            if self._contagem_nos_citados[no] <= 0:
+                del self._contagem_nos_citados[no]
+            self._garantir_no(no)
+            sujos.add(no)
+        for origem, destino in resultado.arestas:
+            aresta = (origem, destino)
+            antes = self._contagem_arestas[aresta]
+            self._contagem_arestas[aresta] = antes + sinal
+            if antes == 0 and sinal > 0:
+                self._sucessores[origem].add(destino)
+                self._predecessores[destino].add(origem)
+            elif antes + sinal <= 0:
+                del self._contagem_arestas[aresta]
+                self._sucessores[origem].discard(destino)
+                self._predecessores[destino].discard(origem)
+            sujos.add(origem)
+            sujos.add(destino)
+
+    def atualizar_texto(self, texto):
+        """Atualiza o grafo a partir do novo texto, interpretando só as linhas alteradas"""
+        texto = texto or ''
+        if texto == self._texto:
+            return False
+        self._texto = texto
+        novas = Counter(linha.strip() for linha in texto.splitlines() if linha.strip())
+        removidas = self._linhas - novas
+        adicionadas = novas - self._linhas
+        self._linhas = novas
+
+        sujos = set()
+        for linha, quantidade in removidas.items():
+            for _ in range(quantidade):
+                self._aplicar_linha(linha, -1, sujos)
+        for linha, quantidade in adicionadas.items():
+            for _ in range(quantidade):
+                self._aplicar_linha(linha, +1, sujos)
+        return self._revalidar(sujos)
+
+    def atualizar_tasks(self, identificadores):
+        """Informa os identificadores das tasks da DAG (lista ou Counter)"""
+        novas = identificadores if isinstance(identificadores, Counter) else Counter(identificadores)
+        sujos = set((self._tasks - novas).keys()) | set((novas - self._tasks).keys())
+        if not sujos:
+            return False
+        self._tasks = Counter(novas)
+        for no in sujos:
+            if self._tasks[no]:
+                self._garantir_no(no)
+        return self._revalidar(sujos)
+
+    # Revalidação incremental
+
+    def _regiao(self, sujos):
+        """Componentes fracamente conexos que contêm algum nó alterado"""
+        regiao = set()
+        fila = deque(no for no in sujos if no in self._sucessores)
+        regiao.update(fila)
+        while fila:
+            no = fila.popleft()
+            for vizinho in self._sucessores[no] | self._predecessores[no]:
+                if vizinho not in regiao:
+                    regiao.add(vizinho)
+                    fila.append(vizinho)
+        return regiao
+
+    def _componentes_fortes(self, nos):
+        """Tarjan iterativo restrito aos nós informados"""
+        indice, menor, na_pilha = {}, {}, set()
+        pilha, componentes = [], []
+        contador = 0
+        for inicio in nos:
+            if inicio in indice:
+                continue
+            trabalho = [(inicio, iter(self._sucessores[inicio]))]
+            indice[inicio] = menor[inicio] = contador
+            contador += 1
+            pilha.append(inicio)
+            na_pilha.add(inicio)
+            while trabalho:
+                no, sucessores = trabalho[-1]
+                avancou = False
+                for sucessor in sucessores:
+                    if sucessor not in indice:
+                        indice[sucessor] = menor[sucessor] = contador
+                        contador += 1
+                        pilha.append(sucessor)
+                        na_pilha.add(sucessor)
+                        trabalho.append((sucessor, iter(self._sucessores[sucessor])))
+                        avancou = True
+                        break
+                    if sucessor in na_pilha:
+                        menor[no] = min(menor[no], indice[sucessor])
+                if avancou:
+                    continue
+                trabalho.pop()
+                if trabalho:
+                    pai = trabalho[-1][0]
+                    menor[pai] = min(menor[pai], menor[no])
+                if menor[no] == indice[no]:
+                    componente = []
+                    while True:
+                        membro = pilha.pop()
+                        na_pilha.discard(membro)
+                        componente.append(membro)
+                        if membro == no:
+                            break
+                    componentes.append(componente)
+        return componentes
+
+    def _revalidar(self, sujos):
+        for no in list(sujos):
+            self._descartar_no_se_isolado(no)
+        regiao = self._regiao(sujos)
+
+        # Ciclos antigos que tocam a região são recalculados
+        for no in sujos | regiao:
+            ciclo_id = self._ciclo_do_no.get(no)
+            if ciclo_id is not None and ciclo_id in self._ciclos:
+                for membro in self._ciclos.pop(ciclo_id):
+                    self._ciclo_do_no.pop(membro, None)
+        for componente in self._componentes_fortes(regiao):
+            no = componente[0]
+            if len(componente) > 1 or no in self._sucessores[no]:
+                ciclo_id = self._proximo_ciclo
+                self._proximo_ciclo += 1
+                self._ciclos[ciclo_id] = frozenset(componente)
+                for membro in componente:
+                    self._ciclo_do_no[membro] = ciclo_id
+
+        # Inalcançáveis: nós da região que nenhuma origem (sem predecessores) alcança
+        self._inalcancaveis -= sujos | regiao
+        fila = deque(no for no in regiao if not self._predecessores[no])
+        alcancados = set(fila)
+        while fila:
+            for sucessor in self._sucessores[fila.popleft()]:
+                if sucessor not in alcancados:
+                    alcancados.add(sucessor)
+                    fila.append(sucessor)
+        self._inalcancaveis |= regiao - alcancados
+
+        # Identificadores citados que não existem entre as tasks
+        for no in sujos:
+            if self._contagem_nos_citados[no] and not self._tasks[no]:
+                self._desconhecidos.add(no)
+            else:
+                self._desconhecidos.discard(no)
+
+        self.versao += 1
+        return True
+
+    # Resultados
+
+    @property
+    def desconhecidos(self):
+        return sorted(self._desconhecidos)
+
+    @property
+    def ciclos(self):
+        return [sorted(ciclo) for ciclo in self._ciclos.values()]
+
+    @property
+    def inalcancaveis(self):
+        return sorted(self._inalcancaveis - set(self._ciclo_do_no))
+
+    @property
+    def orfas(self):
+        """Tasks que não aparecem no ordem_execução (só faz sentido se ele estiver preenchido)"""
+        if not self._contagem_nos_citados:
+            return []
+        return sorted(no for no in self._tasks if not self._contagem_nos_citados[no])
+
+    def erros_sintaxe(self):
+        """Lista de (número da linha, mensagem) para as linhas que não puderam ser interpretadas"""
+        if not self._linhas_com_erro:
+            return []
+        erros = []
+        for numero, linha in enumerate((self._texto or '').splitlines(), start=1):
+            linha = linha.strip()
+            if linha in self._linhas_com_erro:
+                erros.extend((numero, erro) for erro in self._linha_interpretada(linha).erros)
+        return erros
+
+    @property
+    def valido(self):
+        return not (self._desconhecidos or self._ciclos or self._linhas_com_erro)
+
+    def metricas(self) -> Optional[Metricas]:
+        """Ordem topológica, caminho crítico e largura máxima (None se houver ciclos)"""
+        if self._ciclos:
+            return None
+        if self._versao_metricas == self.versao:
+            return self._metricas
+
+        graus = {no: len(predecessores) for no, predecessores in self._predecessores.items()}
+        fila = deque(sorted(no for no, grau in graus.items() if grau == 0))
+        ordem, nivel, anterior = [], {}, {}
+        for no in fila:
+            nivel[no] = 0
+        while fila:
+            no = fila.popleft()
+            ordem.append(no)
+            for sucessor in sorted(self._sucessores[no]):
+                if nivel[no] + 1 > nivel.get(sucessor, -1):
+                    nivel[sucessor] = nivel[no] + 1
+                    anterior[sucessor] = no
+                graus[sucessor] -= 1
+                if graus[sucessor] == 0:
+                    fila.append(sucessor)
+
+        caminho = []
+        if ordem:
+            no = max(ordem, key=lambda n: nivel[n])
+            while no is not None:
+                caminho.append(no)
+                no = anterior.get(no)
+            caminho.reverse()
+
+        self._metricas = Metricas(
+            ordem_topologica=ordem,
+            caminho_critico=caminho,
+            largura_maxima=max(Counter(nivel.values()).values(), default=0),
+            niveis=nivel,
+        )
+        self._versao_metricas = self.versao
+        return self._metricas
+
+    def para_dot(self):
+        """Representação do grafo em DOT (Graphviz) com destaque para problemas"""
+        linhas = ['digraph ordem_execucao {', '  rankdir=LR;', '  node [shape=box, fontsize=10];']
+        for no in sorted(self._sucessores):
+            atributos = []
+            if no in self._desconhecidos:
+                atributos.append('color=red, fontcolor=red, style=dashed')
+            elif no in self._ciclo_do_no:
+                atributos.append('color=orange, penwidth=2')
+            elif no in self._inalcancaveis:
+                atributos.append('color=gray')
+            linhas.append(f'  "{no}"' + (f' [{", ".join(atributos)}]' if atributos else '') + ';')
+        for origem, destino in sorted(self._contagem_arestas):
+            linhas.append(f'  "{origem}" -> "{destino}";')
+        linhas.append('}')
+        return '\n'.join(linhas)
@@ -0,0 +1,185 @@
+"""
+Desfazer/refazer das alterações de uma DAG em edição
+
+Cada entrada do histórico guarda apenas o que a operação tocou: as entradas
+internas da ListaTasks alteradas (ver ListaTasks.encerrar_registro) e os campos
+do cabeçalho que mudaram. As tasks não alteradas continuam compartilhadas com
+a DAG em edição, então editar uma task custa memória proporcional àquela task.
+
+O histórico é limitado por quantidade de entradas e por um tamanho aproximado
+em bytes; quando um dos limites é excedido, as entradas mais antigas saem primeiro.
+
+Cada alteração registrada, desfeita ou refeita também é enfileirada como uma
+Alteracao (só os valores finais das entradas tocadas), que o diário de
+gravação automática retira com retirar_alteracoes() (ver editor_dag.diario).
+"""
+import os
+import sys
+from collections import deque
+from collections.abc import Mapping
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+LIMITE_ENTRADAS_PADRAO = int(os.environ.get('EDITOR_DAG_HISTORICO_ENTRADAS', 50))
+LIMITE_BYTES_PADRAO = int(float(os.environ.get('EDITOR_DAG_HISTORICO_MB', 20)) * 2**20)
+
+
+class _Ausente:
+    # Gravado no pickle como referência ao módulo: continua sendo o mesmo objeto ao ler
+    def __reduce__(self):
+        return '_AUSENTE'
+
+
+# Campo do cabeçalho que não existia antes (ou deixou de existir depois)
+_AUSENTE = _Ausente()
+
+
+def _tamanho_valor(valor):
+    """Tamanho aproximado de um valor guardado no histórico (tasks são mapeamentos rasos)"""
+    tamanho = sys.getsizeof(valor)
+    if isinstance(valor, Mapping):
+        tamanho += sum(sys.getsizeof(v) for v in valor.values())
+    return tamanho
+
+
+@dataclass
+class EntradaHistorico:
+    descricao: str
+    tasks_antes: dict
+    tasks_depois: dict
+    cabecalho: dict  # campo -> (antes, depois)
+    tamanho: int
+
+
+@dataclass
+class Alteracao:
+    """Valores finais das entradas tocadas por uma alteração (ou por desfazer/refazer)"""
+    descricao: str
+    tasks: dict
+    cabecalho: dict  # campo -> valor depois
+
+    def aplicar(self, dag_data):
+        """Reaplica a alteração na DAG (aplicar de novo não muda nada)"""
+        dag_data['tasks'].restaurar(self.tasks)
+        for campo, valor in self.cabecalho.items():
+            if valor is _AUSENTE:
+                dag_data['dag'].pop(campo, None)
+            else:
+                dag_data['dag'][campo] = valor
+
+
+class Historico:
+    """Pilhas de desfazer/refazer de uma DAG"""
+
+    def __init__(self, limite_entradas=LIMITE_ENTRADAS_PADRAO, limite_bytes=LIMITE_BYTES_PADRAO):
+        self.limite_entradas = limite_entradas
+        self.limite_bytes = limite_bytes
+        self._desfazer = deque()
+        self._refazer = []
+        self.tamanho = 0
+        self._alteracoes = []
+
+    def __len__(self):
+        return len(self._desfazer)
+
+    @property
+    def pode_desfazer(self):
+        return bool(self._desfazer)
+
+    @property
+    def pode_refazer(self):
+        return bool(self._refazer)
+
+    @property
+    def proximo_desfazer(self):
+        return self._desfazer[-1].descricao if self._desfazer else None
+
+    @property
+    def proximo_refazer(self):
+        return self._refazer[-1].descricao if self._refazer else None
+
+    @contextmanager
+    def registrar(self, dag_data, descricao):
+        """Registra como uma única entrada tudo o que for alterado na DAG dentro do bloco"""
+        tasks = dag_data['tasks']
+        cabecalho_antes = dict(dag_data['dag'])
+        tasks.iniciar_registro()
+        try:
+            yield
+        finally:
+            antes, depois = tasks.encerrar_registro()
+            self._empilhar(descricao, antes, depois, self._diferenca(cabecalho_antes, dag_data['dag']))
+
+    def registrar_cabecalho(self, dag_data, cabecalho_antes, descricao="Configurações da DAG"):
+        """Registra alterações já feitas no cabeçalho, a partir de uma cópia anterior dele"""
+        self._empilhar(descricao, {}, {}, self._diferenca(cabecalho_antes, dag_data['dag']))
+
+    @staticmethod
+    def _diferenca(antes, depois):
+        return {
+            campo: (antes.get(campo, _AUSENTE), depois.get(campo, _AUSENTE))
+            for campo in antes.keys() | depois.keys()
+            if antes.get(campo, _AUSENTE) != depois.get(campo, _AUSENTE)
+        }
+
+    def _empilhar(self, descricao, antes, depois, cabecalho):
+        if not antes and not cabecalho:
+            return
+        # Só os valores antigos ocupam memória própria; os novos estão na DAG em edição
+        tamanho = sys.getsizeof(antes) + sys.getsizeof(depois) + sys.getsizeof(cabecalho)
+        tamanho += sum(_tamanho_valor(v) for v in antes.values())
+        tamanho += sum(_tamanho_valor(v) for v, _ in cabecalho.values())
+        self._desfazer.append(EntradaHistorico(descricao, antes, depois, cabecalho, tamanho))
+        self.tamanho += tamanho
+        self._refazer.clear()
+        self._limitar()
+        self._enfileirar(descricao, depois, cabecalho, 1)
+
+    def _enfileirar(self, descricao, tasks, cabecalho, indice):
+        self._alteracoes.append(Alteracao(
+            descricao, tasks, {campo: valores[indice] for campo, valores in cabecalho.items()}
+        ))
+
+    def retirar_alteracoes(self):
+        """Alterações feitas (inclusive desfazer/refazer) desde a última chamada, em ordem"""
+        alteracoes, self._alteracoes = self._alteracoes, []
+        return alteracoes
+
+    def _limitar(self):
+        """Descarta as entradas mais antigas até respeitar os limites (mantém ao menos a última)"""
+        while len(self._desfazer) > 1 and (
+                len(self._desfazer) > self.limite_entradas or self.tamanho > self.limite_bytes):
+            self.tamanho -= self._desfazer.popleft().tamanho
+
+    @staticmethod
+    def _aplicar_cabecalho(dag_data, cabecalho, indice):
+        for campo, valores in cabecalho.items():
+            if valores[indice] is _AUSENTE:
+                dag_data['dag'].pop(campo, None)
+            else:
+                dag_data['dag'][campo] = valores[indice]
+
+    def desfazer(self, dag_data):
+        """Volta a DAG para antes da última alteração e devolve a descrição dela"""
+        if not self._desfazer:
+            return None
+        entrada = self._desfazer.pop()
+        self.tamanho -= entrada.tamanho
+        dag_data['tasks'].restaurar(entrada.tasks_antes)
+        self._aplicar_cabecalho(dag_data, entrada.cabecalho, 0)
+        self._refazer.append(entrada)
+        self._enfileirar(f"Desfazer: {entrada.descricao}", entrada.tasks_antes, entrada.cabecalho, 0)
+        return entrada.descricao
+
+    def refazer(self, dag_data):
+        """Reaplica a última alteração desfeita e devolve a descrição dela"""
+        if not self._refazer:
+            return None
+        entrada = self._refazer.pop()
+        dag_data['tasks'].restaurar(entrada.tasks_depois)
+        self._aplicar_cabecalho(dag_data, entrada.cabecalho, 1)
+        self._desfazer.append(entrada)
+        self.tamanho += entrada.tamanho
+        self._limitar()
+        self._enfileirar(f"Refazer: {entrada.descricao}", entrada.tasks_depois, entrada.cabecalho, 1)
+        return entrada.descricao
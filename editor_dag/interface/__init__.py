@@ -0,0 +1,8 @@
+"""
+Interface Streamlit do editor de DAGs
+
+O main.py só chama app.executar(); as funções ficam nestes módulos, que o
+Python importa uma única vez por processo em vez de redefini-las a cada rerun.
+Dependências pesadas (pandas, numpy, pool de processos) são importadas dentro
+das funções que as usam, para não atrasar a primeira renderização.
+"""
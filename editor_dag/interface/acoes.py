@@ -0,0 +1,312 @@
+"""Ações do editor sobre a DAG em edição (cada alteração entra no histórico)"""
+import os
+import pickle
+import uuid
+
+import streamlit as st
+import yaml
+
+from editor_dag import dag as dag_ops
+from editor_dag.dag import ErroEstruturaDag
+from editor_dag.diario import Diario
+from editor_dag.interface.estado import (
+    arquivo_no_workspace, clear_form, config, dono_sessao, guardar_original, iniciar_diario, marcar_dag_alterada,
+    novo_diario, obter_diario, obter_historico, obter_original, preencher_formulario
+)
+from editor_dag.validacao import obter_validador
+
+
+def criar_nova_dag():
+    """Cria uma nova DAG do zero"""
+    st.session_state.dag_data = dag_ops.preparar_para_edicao(dag_ops.nova_dag())
+    iniciar_diario(f"nova:{uuid.uuid4().hex}", "nova_dag.yml")
+    marcar_dag_alterada(reiniciar_cabecalho=True)
+    st.session_state.original_filename = "nova_dag.yml"
+    st.session_state.modo_atual = "Criar Parametro DAG"
+    st.session_state.arquivo_carregado = True
+
+
+def resetar_aplicacao():
+    """Reseta toda a aplicação para o estado inicial"""
+    st.session_state.dag_data = None
+    preencher_formulario({})
+    st.session_state.original_filename = ""
+    st.session_state.form_cleared = False
+    st.session_state.arquivo_carregado = False
+    st.session_state.workspace_arquivo = None
+    st.session_state.workspace_caminho = None
+    st.session_state.dags_carregadas = {}
+    st.session_state.status_carga = []
+    st.session_state.dag_carregada_atual = None
+
+
+def carregar_uploads(arquivos):
+    """Lê e valida todos os arquivos enviados (YAML ou .zip) e guarda as DAGs válidas na sessão"""
+    # O pool de processos e o zipfile só são carregados quando há upload
+    from editor_dag.carregamento import carregar_entradas, contar_entradas, iterar_arquivos
+
+    with st.spinner("Lendo DAGs..."):
+        resultados = carregar_entradas(iterar_arquivos(arquivos), quantidade=contar_entradas(arquivos))
+
+    st.session_state.dags_carregadas = {
+        r.nome: dag_ops.preparar_para_edicao(r.dag_data) for r in resultados if r.ok
+    }
+    for dag_data in st.session_state.dags_carregadas.values():
+        guardar_original(dag_data)
+    st.session_state.status_carga = [
+        {
+            'Arquivo': r.nome,
+            'Status': '✅ OK' if r.ok else '❌ Erro',
+            'Tasks': len(r.dag_data['tasks']) if r.ok else None,
+            'Erro': r.erro or '',
+        }
+        for r in resultados
+    ]
+    if st.session_state.dags_carregadas:
+        abrir_dag_carregada(next(iter(st.session_state.dags_carregadas)))
+    return len(st.session_state.dags_carregadas)
+
+
+def abrir_dag_carregada(nome):
+    """Troca a DAG em edição por outra já carregada (as alterações da anterior ficam na sessão)"""
+    st.session_state.dag_data = st.session_state.dags_carregadas[nome]
+    st.session_state.dag_carregada_atual = nome
+    clear_form()
+    st.session_state.original_filename = os.path.basename(nome)
+    st.session_state.modo_atual = "Editar Parametro DAG"
+    st.session_state.arquivo_carregado = True
+    # Envios com o mesmo nome de usuários diferentes são documentos diferentes
+    iniciar_diario(f"upload:{dono_sessao()}:{nome}", os.path.basename(nome))
+    marcar_dag_alterada(reiniciar_cabecalho=True)
+
+
+def abrir_dag_workspace(indice, caminho_relativo):
+    """Abre no editor uma DAG do workspace, direto do disco"""
+    try:
+        st.session_state.dag_data = dag_ops.preparar_para_edicao(
+            dag_ops.carregar_dag_arquivo(indice.caminho_absoluto(caminho_relativo))
+        )
+    except ErroEstruturaDag as e:
+        st.error(str(e))
+        return False
+    except yaml.YAMLError as e:
+        st.error(f"Erro ao ler arquivo YAML: {e}")
+        return False
+    except Exception as e:
+        st.error(f"Erro ao processar arquivo: {e}")
+        return False
+
+    guardar_original(st.session_state.dag_data)
+    clear_form()
+    st.session_state.original_filename = os.path.basename(caminho_relativo)
+    st.session_state.workspace_arquivo = caminho_relativo
+    st.session_state.workspace_caminho = indice.caminho_absoluto(caminho_relativo)
+    st.session_state.arquivo_carregado = True
+    iniciar_diario(f"workspace:{st.session_state.workspace_caminho}",
+                   os.path.basename(caminho_relativo), caminho_relativo)
+    marcar_dag_alterada(reiniciar_cabecalho=True)
+    return True
+
+
+def salvar_dag_workspace(indice):
+    """
+    Grava a DAG em edição de volta no arquivo do workspace e atualiza o índice
+    Com formato_sidecar no config.json, grava também o sidecar da fábrica de DAGs
+    (lança ErroSidecar, depois de gravar o YAML, se ele não puder ser gerado). Lança
+    ValueError se a DAG em edição não veio deste workspace
+    """
+    from editor_dag.lote import escrever_atomico
+
+    caminho_relativo = arquivo_no_workspace(indice)
+    if caminho_relativo is None:
+        raise ValueError(f"A DAG em edição não é um arquivo do workspace {indice.diretorio}")
+    caminho = indice.caminho_absoluto(caminho_relativo)
+    conteudo = download_yaml()
+    escrever_atomico(caminho, conteudo)
+    indice.reindexar_arquivo(caminho_relativo)
+
+    # O arquivo salvo é o novo ponto de partida: o diário deixa de ter alterações pendentes
+    diario = obter_diario()
+    if diario is not None:
+        try:
+            diario.iniciar(st.session_state.dag_data, obter_original())
+        except OSError as e:
+            st.session_state.falha_diario = str(e)
+
+    formato = config().formato_sidecar
+    if formato:
+        from editor_dag.sidecar import escrever_sidecar
+
+        escrever_sidecar(caminho, formato, obter_validador(config()), conteudo.encode('utf-8'))
+
+
+def _abrir_restaurada(diario, dag_data, original):
+    """Coloca em edição a DAG reconstruída do diário, no lugar da que estava aberta"""
+    tasks = dag_data['tasks']
+    if original is not None:
+        st.session_state.originais[tasks] = original
+    st.session_state.diarios[tasks] = diario
+    st.session_state.dag_data = dag_data
+    if diario.chave.startswith('upload:'):
+        nome = diario.chave.split(':', 2)[2]
+        st.session_state.dags_carregadas[nome] = dag_data
+        st.session_state.dag_carregada_atual = nome
+    st.session_state.original_filename = diario.nome
+    st.session_state.workspace_arquivo = diario.workspace_arquivo
+    # O caminho absoluto (da chave) diz de qual workspace o arquivo é
+    st.session_state.workspace_caminho = (
+        diario.chave[len('workspace:'):] if diario.chave.startswith('workspace:') else None
+    )
+    st.session_state.arquivo_carregado = True
+    clear_form()
+    marcar_dag_alterada(reiniciar_cabecalho=True)
+
+
+def restaurar_documento(chave, nome, workspace_arquivo=None):
+    """Reabre o documento `chave` no estado gravado no seu diário"""
+    diario = novo_diario(chave, nome, workspace_arquivo)
+    try:
+        dag_data, original = diario.restaurar()
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError) as e:
+        st.session_state.falha_diario = f"Não foi possível restaurar '{nome}': {e}"
+        return False
+    _abrir_restaurada(diario, dag_data, original)
+    return True
+
+
+def restaurar_diario():
+    """Troca a DAG em edição pela versão do seu diário (gravada em outra aba ou sessão)"""
+    diario = obter_diario()
+    return restaurar_documento(diario.chave, diario.nome, diario.workspace_arquivo)
+
+
+def manter_versao_aba():
+    """Grava a DAG desta aba no diário por cima da versão de outra aba ou sessão"""
+    diario = obter_diario()
+    situacao = diario.situacao_disco()
+    versao = max(diario.versao, situacao.versao if situacao else 0) + 1
+    try:
+        diario.iniciar(st.session_state.dag_data, obter_original(), versao)
+    except OSError as e:
+        st.session_state.falha_diario = str(e)
+
+
+def descartar_documento(chave, nome):
+    """Apaga o diário do documento `chave`"""
+    Diario(chave, nome).descartar()
+
+
+def desfazer_alteracao(refazer=False):
+    """Desfaz (ou refaz) a última alteração da DAG em edição"""
+    historico = obter_historico()
+    dag_data = st.session_state.dag_data
+    descricao = historico.refazer(dag_data) if refazer else historico.desfazer(dag_data)
+    if descricao is not None:
+        clear_form()
+        marcar_dag_alterada(reiniciar_cabecalho=True)
+    return descricao
+
+
+def inserir_task_abaixo(task_id):
+    """Insere uma nova task abaixo da task especificada"""
+    preencher_formulario({}, task_id)
+    st.session_state.inserir_abaixo = True
+
+
+def add_or_update_task():
+    """Adiciona uma nova task ou atualiza uma existente"""
+    if st.session_state.current_task:
+        new_task = st.session_state.current_task.copy()
+        tasks = st.session_state.dag_data['tasks']
+        identificador = new_task.get('identificador_task', '')
+
+        if st.session_state.editing_task_id is not None:
+            if getattr(st.session_state, 'inserir_abaixo', False):
+                # Inserir nova task abaixo da task atual
+                with obter_historico().registrar(st.session_state.dag_data, f"Inserir task {identificador}"):
+                    tasks.inserir_apos(st.session_state.editing_task_id, new_task)
+                st.session_state.inserir_abaixo = False
+                st.session_state.mensagem_tasks = "Task inserida com sucesso!"
+            else:
+                # Atualizar task existente (o task_num é recalculado ao gerar o YAML)
+                with obter_historico().registrar(st.session_state.dag_data, f"Editar task {identificador}"):
+                    tasks.substituir(st.session_state.editing_task_id, new_task)
+                st.session_state.mensagem_tasks = "Task atualizada com sucesso!"
+        else:
+            # Adicionar nova task no final
+            with obter_historico().registrar(st.session_state.dag_data, f"Adicionar task {identificador}"):
+                tasks.anexar(new_task)
+            st.session_state.mensagem_tasks = "Task adicionada com sucesso!"
+
+        # A grade é reiniciada para não reaplicar edições antigas sobre a task alterada
+        marcar_dag_alterada()
+
+        # Limpar formulário automaticamente
+        clear_form()
+        st.session_state.form_cleared = True
+
+
+def importar_tasks(tasks_novas, referencia=None):
+    """Acrescenta as tasks importadas (no final ou após a referência) em uma única alteração"""
+    tasks = st.session_state.dag_data['tasks']
+    with obter_historico().registrar(st.session_state.dag_data, f"Importar {len(tasks_novas)} task(s)"):
+        if referencia is None:
+            ids = tasks.anexar_varias(tasks_novas)
+        else:
+            ids = tasks.inserir_varias_apos(referencia, tasks_novas)
+    marcar_dag_alterada()
+    return len(ids)
+
+
+def remove_task(task_id):
+    """Remove uma task da lista"""
+    tasks = st.session_state.dag_data['tasks']
+    identificador = tasks.task(task_id).get('identificador_task', '')
+    with obter_historico().registrar(st.session_state.dag_data, f"Remover task {identificador}"):
+        tasks.remover(task_id)
+    marcar_dag_alterada()
+    st.session_state.mensagem_tasks = "Task removida com sucesso!"
+
+
+def edit_task(task_id):
+    """Prepara o formulário para edição de uma task existente"""
+    task = st.session_state.dag_data['tasks'].task(task_id)
+    preencher_formulario(task.copy(), task_id)
+
+
+def remover_tasks(task_ids):
+    """Remove várias tasks em uma única passada"""
+    with obter_historico().registrar(st.session_state.dag_data, f"Remover {len(task_ids)} task(s)"):
+        removidas = st.session_state.dag_data['tasks'].remover_varios(task_ids)
+    if st.session_state.editing_task_id in task_ids:
+        clear_form()
+    marcar_dag_alterada()
+    st.session_state.mensagem_tasks = f"{removidas} task(s) removida(s) com sucesso!"
+    return removidas
+
+
+def mover_tasks(task_ids, deslocamento):
+    """Move as tasks uma posição acima (-1) ou abaixo (+1)"""
+    with obter_historico().registrar(st.session_state.dag_data, "Mover task(s)"):
+        movidas = st.session_state.dag_data['tasks'].mover_varios(task_ids, deslocamento)
+    if movidas:
+        marcar_dag_alterada()
+
+
+def reordenar_tasks(task_ids):
+    """Aplica uma nova ordem completa às tasks"""
+    if tuple(task_ids) != st.session_state.dag_data['tasks'].ids():
+        with obter_historico().registrar(st.session_state.dag_data, "Reordenar tasks"):
+            st.session_state.dag_data['tasks'].reordenar(task_ids)
+        marcar_dag_alterada()
+        st.session_state.mensagem_tasks = "Ordem das tasks atualizada!"
+
+
+def download_yaml():
+    """Prepara o arquivo YAML para download (reaproveitado enquanto a revisão da DAG não muda)"""
+    revisao, yaml_str = st.session_state.get('yaml_cache', (None, None))
+    if revisao == st.session_state.dag_revisao:
+        return yaml_str
+    yaml_str = dag_ops.gerar_yaml_dag(st.session_state.dag_data)
+    st.session_state.yaml_cache = (st.session_state.dag_revisao, yaml_str)
+    return yaml_str
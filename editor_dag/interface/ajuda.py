@@ -0,0 +1,88 @@
+"""Texto de ajuda exibido no fim da página"""
+import streamlit as st
+
+
+def exibir_ajuda():
+    """Informações de ajuda"""
+    with st.expander("ℹ️ Ajuda e Informações"):
+        st.markdown("""
+        ### Como Usar:
+    
+        #### 🆕 **Criar Parametro DAG:**
+        - Selecione **"Criar Parametro DAG"** no menu superior
+        - Preencha todas as configurações da DAG (campos com * são obrigatórios)
+        - Adicione tasks usando o formulário
+        - Baixe o arquivo YAML final
+    
+        #### 📁 **Editar Parametro DAG:**
+        - Selecione **"Editar Parametro DAG"** no menu superior
+        - Anexe um ou mais arquivos YAML, ou um `.zip` com as DAGs do time
+        - Troque entre as DAGs carregadas em **📚 DAG em edição** sem enviar de novo
+        - **AS CONFIGURAÇÕES DA DAG SERÃO CARREGADAS AUTOMATICAMENTE**
+        - Edite as configurações e tasks conforme necessário
+        - Baixe o arquivo YAML editado
+    
+        #### 🗂️ **Workspace:**
+        - Informe o diretório local com as DAGs; apenas arquivos novos ou alterados são reindexados
+        - Busque tasks em todas as DAGs por identificador, conexão, mini operador ou ID do mini operador
+        - Abra qualquer DAG no editor sem upload e salve de volta com **💾 Salvar no workspace**
+        - Em **📈 Carga do agendamento**, veja as colisões do cron com as demais DAGs e os horários com menor carga
+    
+        #### 📋 **Gerenciar Tasks:**
+        - Use **⬇️** para inserir uma task após outra específica
+        - Use **🔼**/**🔽** para mover tasks (ou **Reordenar** para arrastar e soltar)
+        - Use **✏️** para modificar uma task existente  
+        - Use **🗑️** para remover uma task
+        - Use **🔍** para ver ID do Operador e Informações Extras completas
+        - Use **↩️ Desfazer**/**↪️ Refazer** para voltar ou reaplicar as últimas alterações da DAG
+        - No modo **Grade**, edite as células diretamente e marque várias linhas em **✔** para inserir, editar ou remover
+        - Em **📥 Importar tasks de planilha**, envie um CSV ou Excel (`.xlsx` requer o pacote `openpyxl`) com uma task por linha, ligue as colunas aos campos e importe as linhas válidas de uma vez (um único **↩️ Desfazer**); as rejeitadas podem ser baixadas com os erros de cada linha
+    
+        ### Configurações:
+        - As opções de **ID da Conexão** e **Mini Operadores** são carregadas do arquivo `config.json`
+        - Você pode editar o arquivo `config.json` para adicionar novas opções
+        - Em `catalogo_qlik` (vazio por padrão), indique a exportação do qlik-cli (um arquivo ou um diretório com, por exemplo, `qlik app ls --json > qlik_catalogo/apps.json` e `qlik automation ls --json > qlik_catalogo/automations.json`); ela é relida sozinha quando muda, e enquanto não existir o catálogo fica oculto
+        - Com o catálogo, use **🔎 Catálogo do Qlik** acima do formulário para buscar apps, automations e reports pelo início do nome ou do ID e preencher o **ID do Mini Operador**
+        - Com `formato_sidecar` (`json` ou `msgpack`, este requer o pacote `msgpack`), **💾 Salvar no workspace** grava ao lado do YAML o sidecar lido pela fábrica de DAGs com `editor_dag.sidecar.carregar_dag_rapido`; para um diretório inteiro use `python -m editor_dag sidecar dags/` (`--verificar` lista os desatualizados)
+    
+        ### Campos Obrigatórios (*):
+        - **Descrição**: Descrição da DAG
+        - **Dono**: Responsável pela DAG
+        - **Email em Falha**: Emails para notificação
+        - **Data Inicial**: Data de início da DAG
+        - **Agendamento Cron**: Expressão cron para agendamento
+        - **Quantidade de Tentativas**: Número de tentativas em caso de falha
+        - **Tempo para Tentativa**: Tempo entre tentativas
+        - **Identificador da Task**: Nome único para a task
+        - **Ativo**: Se a task está ativa
+        - **ID da Conexão**: ID da conexão no Airflow
+        - **Mini Operador**: Tipo de operador
+        - **ID do Mini Operador**: ID específico do operador
+    
+        ### Validação:
+        - Campos obrigatórios, emails, datas, cron, identificadores repetidos, operadores fora do `config.json` e IDs de mini operador que não são UUID são conferidos a cada alteração
+        - Com o catálogo do Qlik, IDs que não existem na exportação (ou são de outro tipo que o esperado pelo mini operador) também são apontados
+        - Os erros aparecem na coluna **⚠️ Erros** da grade e no relatório acima do download, que fica bloqueado até a correção
+
+        ### Ordem de Execução:
+        - Use `>>`/`<<` entre identificadores e `[a, b]` para tasks em paralelo, uma instrução por linha (ou separadas por `;`)
+        - Identificadores inexistentes, ciclos e tasks fora da ordem são apontados em **🔗 Dependências entre Tasks**
+
+        ### Alterações e Patch:
+        - Em **🧾 Alterações desde o carregamento**, compare a DAG com o arquivo carregado: configurações, tasks adicionadas, removidas, movidas e alteradas (casadas pelo identificador)
+        - Baixe as alterações como um patch JSON e aplique-o em outra DAG; tasks que não existirem nela são ignoradas com um aviso
+
+        ### Modelos e Geração em Lote:
+        - Escreva marcadores `{{nome}}` nos campos da DAG e das tasks (ex.: `recarga_{{app}}_{{unidade}}`) e salve a DAG em **🧩 Modelos e geração de DAGs em lote** (no diretório `modelos_dag` do `config.json`)
+        - Escolha um modelo e informe uma lista de valores por marcador: cada combinação vira uma DAG, baixada em um `.zip`; `deslocamento_cron` (minutos) espalha os agendamentos
+        - Pela linha de comando: `python -m editor_dag gerar recarga_apps --matriz matriz.yml --saida dags.zip`
+
+        ### Desempenho:
+        - Cada seção (configurações, formulário, tabela, download...) é atualizada sozinha: editar a descrição atualiza só as configurações e o download, e gravar uma task atualiza a tabela e o download, sem redesenhar a página inteira
+        - O YAML só é gerado ao clicar em **📥 Baixar Arquivo YAML** (ou ao abrir a visualização)
+        - Abra o editor com `?perfil=1` na URL (ou inicie com `EDITOR_DAG_PERFIL=1`) para ver na barra lateral o tempo e os widgets de cada seção (medidos nas execuções da página inteira)
+        - Cada execução também é gravada em `perfil_editor_dag.jsonl` (ou no arquivo de `EDITOR_DAG_PERFIL_ARQUIVO`)
+        - Cada alteração é gravada automaticamente em um diário local (em `~/.cache/editor_dag/autosave` ou `EDITOR_DAG_AUTOSAVE_DIR`, que deve ser do usuário do servidor com permissão 700; `EDITOR_DAG_AUTOSAVE=0` desativa): depois de um refresh ou reinício do servidor, use **♻️ DAGs com alterações não salvas** para voltar ao último estado, ou **🗑️ Descartar**; cada usuário (login ou, sem login, o navegador identificado pelo parâmetro `?navegador=` da URL, que não deve ser compartilhado) vê só as suas DAGs
+        - Ao abrir uma DAG que tem alterações gravadas, ou quando outra aba altera a mesma DAG, escolha entre **♻️ Restaurar** a versão gravada e **✋ Manter a versão desta aba**
+        - Abas paradas há mais de `EDITOR_DAG_OCIOSO_MINUTOS` (padrão: 15) têm as DAGs guardadas em disco para liberar memória do servidor; elas voltam sozinhas na próxima interação
+        """)
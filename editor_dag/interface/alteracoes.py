@@ -0,0 +1,103 @@
+"""Comparação com o arquivo carregado e exportação/aplicação do patch JSON"""
+import os
+
+import streamlit as st
+
+from editor_dag.diferenca import (AUSENTE, ErroPatch, aplicar_patch, carregar_patch, comparar, gerar_patch,
+                                  patch_para_json)
+from editor_dag.interface.estado import clear_form, marcar_dag_alterada, obter_historico, obter_original
+from editor_dag.interface.fragmentos import secao
+
+# Máximo de linhas de cada lista exibida na comparação
+LIMITE_LINHAS = 200
+
+
+def _valor(valor):
+    return "(ausente)" if valor is AUSENTE else f"`{valor}`"
+
+
+def _listar(linhas):
+    st.markdown("\n".join(linhas[:LIMITE_LINHAS]))
+    if len(linhas) > LIMITE_LINHAS:
+        st.caption(f"... e mais {len(linhas) - LIMITE_LINHAS}")
+
+
+def exibir_diferenca(diferenca):
+    col1, col2, col3, col4, col5 = st.columns(5)
+    col1.metric("Cabeçalho", len(diferenca.cabecalho))
+    col2.metric("Adicionadas", len(diferenca.adicionadas))
+    col3.metric("Removidas", len(diferenca.removidas))
+    col4.metric("Movidas", len(diferenca.movidas))
+    col5.metric("Alteradas", len(diferenca.alteradas))
+
+    if diferenca.cabecalho:
+        st.markdown("**Configurações da DAG:**")
+        _listar([f"- **{campo}**: {_valor(antes)} → {_valor(depois)}"
+                 for campo, (antes, depois) in sorted(diferenca.cabecalho.items())])
+    if diferenca.adicionadas:
+        st.markdown("**Tasks adicionadas:**")
+        _listar([f"- `{chave}` na posição {posicao}" for chave, posicao, _ in diferenca.adicionadas])
+    if diferenca.removidas:
+        st.markdown("**Tasks removidas:**")
+        _listar([f"- `{chave}` (era a {posicao})" for chave, posicao in diferenca.removidas])
+    if diferenca.movidas:
+        st.markdown("**Tasks movidas:**")
+        _listar([f"- `{chave}`: {antes} → {depois}" for chave, antes, depois in diferenca.movidas])
+    if diferenca.alteradas:
+        st.markdown("**Tasks alteradas:**")
+        _listar([
+            f"- `{chave}` · **{campo}**: {_valor(antes)} → {_valor(depois)}"
+            for chave, campos in diferenca.alteradas
+            for campo, (antes, depois) in sorted(campos.items())
+        ])
+
+
+def exibir_aplicar_patch():
+    """Aplica na DAG em edição um patch exportado de outra DAG (entra no histórico)"""
+    arquivo = st.file_uploader("Aplicar um patch JSON a esta DAG", type=['json'],
+                               key=f"patch_{st.session_state.grade_versao}")
+    if arquivo is None or not st.button("🩹 Aplicar patch", key='aplicar_patch'):
+        return
+    try:
+        patch = carregar_patch(arquivo.getvalue())
+    except (ErroPatch, UnicodeDecodeError) as e:
+        st.error(f"Patch inválido: {e}")
+        return
+
+    with obter_historico().registrar(st.session_state.dag_data, f"Aplicar patch {arquivo.name}"):
+        avisos = aplicar_patch(st.session_state.dag_data, patch)
+    clear_form()
+    marcar_dag_alterada(reiniciar_cabecalho=True)
+    st.session_state.avisos_patch = avisos
+    st.rerun()
+
+
+@secao('alteracoes')
+def exibir_alteracoes():
+    """Alterações desde o carregamento do arquivo, patch JSON e aplicação de patch"""
+    original = obter_original()
+    avisos = st.session_state.pop('avisos_patch', None)
+
+    with st.expander("🧾 Alterações desde o carregamento", expanded=avisos is not None):
+        if avisos is not None:
+            st.success("Patch aplicado")
+            for aviso in avisos:
+                st.warning(aviso)
+
+        if original is None:
+            st.info("A comparação fica disponível para DAGs carregadas de um arquivo ou do workspace.")
+        elif st.toggle("Comparar com o arquivo carregado", key='mostrar_alteracoes'):
+            diferenca = comparar(original, st.session_state.dag_data)
+            if diferenca.vazia:
+                st.success("✅ Nenhuma alteração em relação ao arquivo carregado")
+            else:
+                exibir_diferenca(diferenca)
+                nome = os.path.splitext(st.session_state.original_filename or 'dag')[0]
+                st.download_button(
+                    label="📥 Baixar patch JSON",
+                    data=patch_para_json(gerar_patch(diferenca)),
+                    file_name=f"{nome}.patch.json",
+                    mime="application/json",
+                )
+
+        exibir_aplicar_patch()
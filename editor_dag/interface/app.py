@@ -0,0 +1,203 @@
+"""Montagem da página do editor, executada pelo main.py a cada rerun"""
+import streamlit as st
+from streamlit_option_menu import option_menu
+
+from editor_dag.interface.acoes import abrir_dag_carregada, carregar_uploads, criar_nova_dag, resetar_aplicacao
+from editor_dag.interface.ajuda import exibir_ajuda
+from editor_dag.interface.alteracoes import exibir_alteracoes
+from editor_dag.interface.cabecalho import exibir_cabecalho, exibir_carga_agendamento, exibir_dependencias
+from editor_dag.interface.download import exibir_barra_historico, exibir_download
+from editor_dag.interface.estado import carregar_configuracoes, inicializar_sessao, retomar_sessao
+from editor_dag.interface.formulario import exibir_formulario_task
+from editor_dag.interface.importacao import exibir_importacao
+from editor_dag.interface.modelos import exibir_modelos
+from editor_dag.interface.painel_workspace import exibir_workspace
+from editor_dag.interface.recuperacao import exibir_recuperaveis, exibir_situacao_diario
+from editor_dag.interface.tabela import exibir_tasks
+from editor_dag.perfil import Perfilador, perfil_solicitado
+
+
+def exibir_modo_edicao():
+    """Upload de uma ou mais DAGs e troca entre as DAGs já carregadas"""
+    st.markdown("### 📁 Editar DAG Existente")
+
+    if not st.session_state.arquivo_carregado:
+        # Upload de um ou mais arquivos (ou de um .zip) para edição
+        uploaded_files = st.file_uploader(
+            "📤 Anexe seus arquivos YAML (ou um .zip com várias DAGs) para editar",
+            type=['yml', 'yaml', 'zip'],
+            accept_multiple_files=True,
+            help="Selecione arquivos YAML no formato das DAGs do Airflow"
+        )
+
+        if uploaded_files:
+            quantidade = carregar_uploads(uploaded_files)
+            if quantidade:
+                st.success(f"✅ {quantidade} DAG(s) carregada(s) com sucesso!")
+                st.rerun()
+            else:
+                st.error("❌ Nenhum arquivo válido. Verifique o formato.")
+                st.dataframe(st.session_state.status_carga, hide_index=True, use_container_width=True)
+        return
+
+    carregadas = st.session_state.dags_carregadas
+    if len(carregadas) > 1:
+        nomes = list(carregadas)
+        nome = st.selectbox(
+            "📚 DAG em edição",
+            options=nomes,
+            index=nomes.index(st.session_state.dag_carregada_atual),
+            help="As alterações de cada DAG são mantidas ao trocar"
+        )
+        if nome != st.session_state.dag_carregada_atual:
+            abrir_dag_carregada(nome)
+            st.rerun()
+
+    if st.session_state.status_carga:
+        com_erro = sum(1 for status in st.session_state.status_carga if status['Erro'])
+        titulo = f"📑 Arquivos enviados ({len(st.session_state.status_carga)}, {com_erro} com erro)"
+        with st.expander(titulo, expanded=bool(com_erro)):
+            st.dataframe(st.session_state.status_carga, hide_index=True, use_container_width=True)
+
+    # Mostrar informações do arquivo carregado
+    st.info(f"📄 Editando: **{st.session_state.original_filename}**")
+
+
+def exibir_perfil(perfil):
+    """Painel de medição na barra lateral (fora do tempo medido)"""
+    tasks_dag = st.session_state.dag_data['tasks'] if st.session_state.dag_data else ()
+    registro = perfil.finalizar(modo=st.session_state.modo_atual, tasks=len(tasks_dag))
+    with st.sidebar:
+        st.markdown("### ⏱️ Perfil da execução")
+        secoes = sorted(registro['secoes'].items(), key=lambda item: -item[1]['ms'])
+        st.dataframe(
+            [{'Seção': nome, 'ms': secao['ms'], 'Widgets': secao['widgets']} for nome, secao in secoes],
+            hide_index=True, use_container_width=True
+        )
+        st.caption(f"Total: {registro['total_ms']:.1f} ms • gravado em `{perfil.arquivo}`")
+
+
+def executar():
+    """Desenha a página inteira para o estado atual da sessão"""
+    # Configuração da página
+    st.set_page_config(
+        page_title="Editor YAML para DAGs do Airflow",
+        page_icon="📊",
+        layout="wide"
+    )
+
+    # Medição opcional por seção (EDITOR_DAG_PERFIL=1 ou ?perfil=1)
+    parametros_url = st.query_params.to_dict() if hasattr(st, 'query_params') else st.experimental_get_query_params()
+    perfil = Perfilador(perfil_solicitado(parametros_url))
+    perfil.marcar("inicio")
+
+    # Título da aplicação
+    st.title("📊 Editor YAML para DAGs do Airflow")
+
+    # Carregar configurações
+    perfil.marcar("configuracoes")
+    if carregar_configuracoes() is None:
+        st.stop()
+
+    perfil.marcar("estado_sessao")
+    retomar_sessao()
+    inicializar_sessao()
+
+    # Menu de opções superior
+    # Tuplas em vez de listas: o Streamlit testa cada lista passada a um componente como
+    # possível DataFrame, o que importa pandas/numpy/pyarrow já na primeira renderização
+    perfil.marcar("menu")
+    selected = option_menu(
+        None,
+        ("Criar Parametro DAG", "Editar Parametro DAG", "Workspace"),
+        icons=('plus-circle', 'pencil-square', 'folder2-open'),
+        menu_icon="cast",
+        default_index=0,
+        orientation="horizontal",
+        key='menu_principal'
+    )
+
+    # Atualizar modo baseado na seleção do menu
+    if selected != st.session_state.modo_atual:
+        st.session_state.modo_atual = selected
+        if selected == "Criar Parametro DAG":
+            criar_nova_dag()
+        else:
+            resetar_aplicacao()
+
+    # Conteúdo baseado no modo selecionado
+    indice_workspace = None
+    if st.session_state.modo_atual == "Criar Parametro DAG":
+        st.markdown("### 🆕 Criar Nova DAG")
+
+        # Inicializar DAG vazia se não existir
+        if st.session_state.dag_data is None:
+            criar_nova_dag()
+
+    elif st.session_state.modo_atual == "Editar Parametro DAG":
+        exibir_modo_edicao()
+
+    elif st.session_state.modo_atual == "Workspace":
+        st.markdown("### 🗂️ Workspace")
+        indice_workspace = exibir_workspace()
+
+        if st.session_state.arquivo_carregado and st.session_state.get('workspace_arquivo'):
+            st.info(f"📄 Editando: **{st.session_state.workspace_arquivo}**")
+
+    # DAGs com alterações não salvas de sessões anteriores (gravação automática)
+    perfil.marcar("recuperacao")
+    exibir_recuperaveis()
+
+    # Se há uma DAG carregada (em qualquer modo), mostrar TODAS as seções
+    if st.session_state.dag_data is not None and st.session_state.arquivo_carregado:
+
+        # Desfazer/refazer (APARECE EM AMBOS OS MODOS): preenchido no fim da página,
+        # depois das alterações feitas nesta execução
+        barra_historico = st.container()
+
+        # Alterações gravadas por outra aba ou sessão no diário desta DAG
+        exibir_situacao_diario()
+
+        # Seção DAG - Configurações (APARECE EM AMBOS OS MODOS)
+        perfil.marcar("cabecalho")
+        exibir_cabecalho()
+
+        perfil.marcar("agendamento_dependencias")
+        exibir_carga_agendamento()
+        exibir_dependencias()
+
+        # Seção Tasks (APARECE EM AMBOS OS MODOS)
+        st.header("📋 Gerenciar Tasks")
+
+        perfil.marcar("formulario")
+        exibir_formulario_task()
+
+        # Importação em lote de planilha CSV/Excel
+        perfil.marcar("importacao")
+        exibir_importacao()
+
+        # Tabela de tasks existentes - Layout Compacto
+        perfil.marcar("tabela_tasks")
+        exibir_tasks()
+
+        perfil.marcar("historico")
+        with barra_historico:
+            exibir_barra_historico()
+
+        # Botão de download
+        perfil.marcar("download")
+        exibir_download(indice_workspace)
+
+        # Comparação com o arquivo carregado e patch JSON
+        perfil.marcar("alteracoes")
+        exibir_alteracoes()
+
+        # Modelos com marcadores e geração de DAGs em lote
+        perfil.marcar("modelos")
+        exibir_modelos()
+
+    perfil.marcar("ajuda")
+    exibir_ajuda()
+
+    if perfil.ativo:
+        exibir_perfil(perfil)
@@ -0,0 +1,225 @@
+"""Configurações da DAG, validação do agendamento e dependências entre tasks"""
+import os
+from datetime import datetime
+
+import streamlit as st
+
+from editor_dag.cron import validar_cron
+from editor_dag.interface.estado import arquivo_no_workspace, marcar_dag_alterada, obter_grafo_execucao, obter_historico
+from editor_dag.interface.fragmentos import acao, invalidar, secao
+
+
+def _registrar_cabecalho(cabecalho_anterior):
+    if st.session_state.dag_data['dag'] == cabecalho_anterior:
+        return False
+    obter_historico().registrar_cabecalho(st.session_state.dag_data, cabecalho_anterior)
+    marcar_dag_alterada(reiniciar_grade=False)
+    return True
+
+
+def campo_alterado(campo, chave):
+    """Callback de um campo do cabeçalho: grava o valor e atualiza as seções que dependem dele"""
+    dag = st.session_state.dag_data['dag']
+    cabecalho_anterior = dict(dag)
+    valor = st.session_state[chave]
+    dag[campo] = valor.strftime('%Y-%m-%d') if campo == 'data_inicial' else valor
+    if _registrar_cabecalho(cabecalho_anterior):
+        invalidar('cabecalho')
+
+
+def _campo(campo):
+    """key e callback do widget de um campo do cabeçalho"""
+    # As chaves dos campos mudam quando outra DAG é aberta (ou o cabeçalho muda por desfazer/patch),
+    # para que os campos não mostrem o que foi digitado antes; alterar tasks não os recria
+    chave = f"cabecalho_{campo}_{st.session_state.cabecalho_versao}"
+    return {'key': chave, 'on_change': acao(campo_alterado), 'args': (campo, chave)}
+
+
+@secao('cabecalho')
+def exibir_cabecalho():
+    """Campos do cabeçalho da DAG; alterações entram no histórico como uma única entrada"""
+    st.header("⚙️ Configurações da DAG")
+
+    # Cópia rasa do cabeçalho para detectar campos preenchidos com o valor padrão do widget
+    cabecalho_anterior = dict(st.session_state.dag_data['dag'])
+
+    with st.container():
+        col1, col2, col3 = st.columns(3)
+
+        with col1:
+            st.session_state.dag_data['dag']['descricao'] = st.text_input(
+                "Descrição*",
+                **_campo('descricao'),
+                value=st.session_state.dag_data['dag'].get('descricao', ''),
+                placeholder="Descrição da DAG"
+            )
+
+            st.session_state.dag_data['dag']['dono'] = st.text_input(
+                "Dono*",
+                **_campo('dono'),
+                value=st.session_state.dag_data['dag'].get('dono', ''),
+                placeholder="Nome do responsável"
+            )
+
+            st.session_state.dag_data['dag']['email_em_falha'] = st.text_input(
+                "Email em Falha*",
+                **_campo('email_em_falha'),
+                value=st.session_state.dag_data['dag'].get('email_em_falha', ''),
+                placeholder="email1@exemplo.com,email2@exemplo.com"
+            )
+
+        with col2:
+            data_inicial = st.session_state.dag_data['dag'].get('data_inicial', datetime.now().strftime('%Y-%m-%d'))
+            try:
+                date_value = datetime.strptime(data_inicial, '%Y-%m-%d')
+            except:
+                date_value = datetime.now()
+
+            st.session_state.dag_data['dag']['data_inicial'] = st.date_input(
+                "Data Inicial*",
+                **_campo('data_inicial'),
+                value=date_value
+            ).strftime('%Y-%m-%d')
+
+            st.session_state.dag_data['dag']['agendamento_cron'] = st.text_input(
+                "Agendamento Cron*",
+                **_campo('agendamento_cron'),
+                value=st.session_state.dag_data['dag'].get('agendamento_cron', ''),
+                placeholder="0 0 * * *",
+                help="""
+                        ┌───────────── minuto (0 - 59)
+                        │ ┌───────────── hora (0 - 23)
+                        │ │ ┌───────────── dia do mês (1 - 31)
+                        │ │ │ ┌───────────── mês (1 - 12)
+                        │ │ │ │ ┌───────────── dia da semana (0 - 6) (0=Domingo)
+                        │ │ │ │ │
+                        * * * * *
+                    """
+            )
+
+            st.session_state.dag_data['dag']['tags'] = st.text_input(
+                "Tags",
+                **_campo('tags'),
+                value=st.session_state.dag_data['dag'].get('tags', ''),
+                placeholder="TAG1,TAG2"
+            )
+
+        with col3:
+            st.session_state.dag_data['dag']['quantidade_tentativas'] = st.number_input(
+                "Quantidade de Tentativas*",
+                **_campo('quantidade_tentativas'),
+                min_value=0,
+                value=st.session_state.dag_data['dag'].get('quantidade_tentativas', 2)
+            )
+
+            st.session_state.dag_data['dag']['tempo_para_tentativa'] = st.number_input(
+                "Tempo para Tentativa*",
+                **_campo('tempo_para_tentativa'),
+                min_value=0,
+                value=st.session_state.dag_data['dag'].get('tempo_para_tentativa', 1)
+            )
+
+            st.session_state.dag_data['dag']['ordem_execução'] = st.text_area(
+                "Ordem de Execução",
+                **_campo('ordem_execução'),
+                value=st.session_state.dag_data['dag'].get('ordem_execução', ''),
+                placeholder="Ordem de execução das tasks...",
+                height=100
+            )
+
+    _registrar_cabecalho(cabecalho_anterior)
+
+
+@secao('agendamento')
+def exibir_carga_agendamento():
+    """Validação do agendamento_cron e colisões com as demais DAGs do workspace"""
+    expressao = str(st.session_state.dag_data['dag'].get('agendamento_cron') or '')
+    erro = validar_cron(expressao)
+    if erro:
+        st.error(f"Agendamento Cron inválido: {erro}")
+        return
+
+    diretorio = st.session_state.get('workspace_diretorio')
+    if not diretorio or not os.path.isdir(diretorio):
+        return
+
+    # A análise de ocupação (numpy) e o índice só são carregados com um workspace aberto
+    from editor_dag.cron import analisar_agendamentos, ocupacao_semanal, sugerir_horarios
+    from editor_dag.workspace import IndiceWorkspace
+
+    with st.expander("📈 Carga do agendamento"):
+        indice = IndiceWorkspace(diretorio)
+        conexoes = [valor for valor, _ in indice.valores_distintos('conexao_id') if valor]
+        conexao = st.selectbox(
+            "Considerar tasks da conexão",
+            options=[None] + conexoes,
+            format_func=lambda x: "Todas" if x is None else x,
+            key='carga_conexao'
+        )
+
+        # A própria DAG (se veio do workspace) fica de fora da ocupação das demais
+        proprio = arquivo_no_workspace(indice)
+        outras = [(cron, peso) for caminho, cron, peso in indice.agendamentos(conexao)
+                  if caminho != proprio and (peso or conexao is None)]
+        peso = sum(
+            1 for task in st.session_state.dag_data['tasks']
+            if task.get('ativo') == 1 and (conexao is None or task.get('conexao_id') == conexao)
+        )
+
+        analise = analisar_agendamentos(outras + [(expressao, peso)], limite_pontos=5)
+        ocupacao_outras = ocupacao_semanal(outras)
+        col1, col2 = st.columns(2)
+        col1.metric("DAGs consideradas", len(outras) + 1)
+        col2.metric("Pico de tasks simultâneas", f"{analise.pico_tasks:g}")
+
+        if analise.pontos_quentes:
+            st.markdown("**Colisões com maior carga:**")
+            st.dataframe(
+                [{'Horário': p.rotulo, 'DAGs': p.dags, 'Tasks': p.tasks} for p in analise.pontos_quentes],
+                hide_index=True, use_container_width=True
+            )
+        else:
+            st.success("✅ Nenhuma colisão entre DAGs")
+
+        sugestoes = sugerir_horarios(expressao, ocupacao_outras, peso=peso)
+        if sugestoes:
+            st.markdown("**Horários com menor carga:**")
+            for sugestao in sugestoes:
+                st.markdown(f"- `{sugestao.expressao}` — pico de {sugestao.carga:g} tasks")
+
+
+@secao('dependencias')
+def exibir_dependencias():
+    """Validação e métricas do ordem_execução"""
+    grafo = obter_grafo_execucao()
+    erros_sintaxe = grafo.erros_sintaxe()
+    ha_problemas = not grafo.valido or bool(grafo.inalcancaveis)
+
+    with st.expander("🔗 Dependências entre Tasks", expanded=ha_problemas):
+        if not st.session_state.dag_data['dag'].get('ordem_execução'):
+            st.info("Preencha a Ordem de Execução (ex.: `task_a >> [task_b, task_c] >> task_d`) para validar as dependências.")
+            return
+
+        for numero, erro in erros_sintaxe:
+            st.error(f"Linha {numero}: {erro}")
+        if grafo.desconhecidos:
+            st.error(f"Identificadores que não existem nas tasks: {', '.join(grafo.desconhecidos)}")
+        for ciclo in grafo.ciclos:
+            st.error(f"Ciclo entre as tasks: {', '.join(ciclo)}")
+        if grafo.inalcancaveis:
+            st.warning(f"Tasks que dependem de um ciclo e nunca executarão: {', '.join(grafo.inalcancaveis)}")
+        if grafo.orfas:
+            st.warning(f"Tasks fora da ordem de execução: {', '.join(grafo.orfas)}")
+
+        metricas = grafo.metricas()
+        if metricas is not None:
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Tasks no grafo", len(metricas.ordem_topologica))
+            col2.metric("Caminho crítico", len(metricas.caminho_critico))
+            col3.metric("Paralelismo máximo", metricas.largura_maxima)
+            st.caption("Caminho crítico: " + " → ".join(metricas.caminho_critico))
+            if not ha_problemas and not erros_sintaxe:
+                st.success("✅ Ordem de execução válida")
+
+        if st.toggle("Mostrar grafo", key='mostrar_grafo'):
+            st.graphviz_chart(grafo.para_dot())
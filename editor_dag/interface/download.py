@@ -0,0 +1,106 @@
+"""Desfazer/refazer, relatório de validação, download e gravação da DAG"""
+import streamlit as st
+
+from editor_dag import dag as dag_ops
+from editor_dag.interface.acoes import desfazer_alteracao, download_yaml, salvar_dag_workspace
+from editor_dag.interface.estado import arquivo_no_workspace, obter_historico, obter_relatorio_validacao
+from editor_dag.interface.fragmentos import FRAGMENTOS_NOMEADOS, secao
+
+# Com dados sob demanda (data=função), o arquivo só é gerado quando o botão é clicado;
+# o recurso chegou ao Streamlit antes dos fragmentos nomeados
+DOWNLOAD_SOB_DEMANDA = FRAGMENTOS_NOMEADOS
+
+
+def _yaml_sob_demanda(dag_data):
+    # Chamada fora da execução do script: recebe a DAG em vez de ler o session_state
+    return lambda: dag_ops.gerar_yaml_dag(dag_data)
+
+
+@secao('historico')
+def exibir_barra_historico():
+    """Botões de desfazer/refazer com a descrição da próxima alteração na dica"""
+    historico = obter_historico()
+    col_desfazer, col_refazer, _ = st.columns([1, 1, 4])
+    with col_desfazer:
+        if st.button("↩️ Desfazer", disabled=not historico.pode_desfazer, key='desfazer',
+                     help=historico.proximo_desfazer):
+            desfazer_alteracao()
+            st.rerun()
+    with col_refazer:
+        if st.button("↪️ Refazer", disabled=not historico.pode_refazer, key='refazer',
+                     help=historico.proximo_refazer):
+            desfazer_alteracao(refazer=True)
+            st.rerun()
+
+
+def exibir_relatorio_validacao(relatorio):
+    """Lista os erros da DAG e de cada task, na ordem das tasks"""
+    st.error(f"❌ {relatorio.quantidade} erro(s) de validação. Corrija-os para liberar o download.")
+    with st.expander("📋 Relatório de validação", expanded=True):
+        linhas = [f"- **DAG** · {erro}" for erro in relatorio.erros_dag]
+        tasks = st.session_state.dag_data['tasks']
+        for task_id in sorted(relatorio.erros_tasks, key=tasks.posicao):
+            identificador = tasks.task(task_id).get('identificador_task') or '(sem identificador)'
+            for erro in relatorio.erros_tasks[task_id]:
+                linhas.append(f"- **Task {tasks.posicao(task_id)}** `{identificador}` · {erro}")
+        st.markdown("\n".join(linhas[:200]))
+        if len(linhas) > 200:
+            st.caption(f"... e mais {len(linhas) - 200} erro(s)")
+
+
+@secao('download')
+def exibir_download(indice_workspace=None):
+    """Download do YAML, bloqueado enquanto houver erros de validação"""
+    st.header("💾 Download do Arquivo YAML")
+
+    # Validação final: o download fica bloqueado enquanto houver erros
+    relatorio = obter_relatorio_validacao()
+    if not relatorio.ok:
+        exibir_relatorio_validacao(relatorio)
+
+    if st.session_state.modo_atual == "Criar Parametro DAG":
+        nome_arquivo = f"{st.session_state.current_task.get('identificador_task', '')}.yml"
+    else:
+        nome_arquivo = f"{st.session_state.original_filename}"
+
+    if DOWNLOAD_SOB_DEMANDA:
+        # Gerar o YAML de milhares de tasks a cada alteração deixaria toda edição lenta
+        st.download_button(
+            label="📥 Baixar Arquivo YAML",
+            data=_yaml_sob_demanda(st.session_state.dag_data),
+            file_name=nome_arquivo,
+            mime="application/x-yaml",
+            on_click='ignore',
+            use_container_width=True,
+            disabled=not relatorio.ok
+        )
+    else:
+        st.download_button(
+            label="📥 Baixar Arquivo YAML",
+            data=download_yaml(),
+            file_name=nome_arquivo,
+            mime="application/x-yaml",
+            use_container_width=True,
+            disabled=not relatorio.ok
+        )
+
+    if (st.session_state.modo_atual == "Workspace" and st.session_state.get('workspace_arquivo')
+            and indice_workspace is not None and arquivo_no_workspace(indice_workspace) is None):
+        st.info(f"A DAG em edição é `{st.session_state.get('workspace_caminho') or st.session_state.workspace_arquivo}`, "
+                "de outro workspace: abra aquele workspace para salvá-la, ou baixe o YAML.")
+    elif (st.session_state.modo_atual == "Workspace" and st.session_state.get('workspace_arquivo')
+            and indice_workspace is not None):
+        if st.button("💾 Salvar no workspace", use_container_width=True, key='workspace_salvar',
+                     disabled=not relatorio.ok):
+            from editor_dag.sidecar import ErroSidecar
+
+            try:
+                salvar_dag_workspace(indice_workspace)
+            except ErroSidecar as e:
+                st.warning(f"'{st.session_state.workspace_arquivo}' salvo, mas o sidecar não foi gravado: {e}")
+            else:
+                st.success(f"✅ '{st.session_state.workspace_arquivo}' salvo e reindexado!")
+
+    # Visualização do YAML (opcional) - só é renderizada quando ativada
+    if st.toggle("👁️ Visualização do YAML", key='mostrar_yaml'):
+        st.code(download_yaml(), language='yaml')
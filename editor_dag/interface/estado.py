@@ -0,0 +1,304 @@
+"""Estado da sessão do editor e os objetos derivados da DAG em edição"""
+import hashlib
+import os
+import re
+import uuid
+import weakref
+from collections import Counter
+
+import streamlit as st
+
+from editor_dag.catalogo_qlik import obter_catalogo_qlik
+from editor_dag.configuracoes import obter_configuracoes
+from editor_dag.diario import ATIVO as AUTOSAVE_ATIVO, Diario
+from editor_dag.diferenca import Original
+from editor_dag.grafo import GrafoExecucao
+from editor_dag.historico import Historico
+from editor_dag.ociosidade import DepositoSessoes
+from editor_dag.validacao import ValidacaoIncremental, obter_validador
+
+ARQUIVO_CONFIG = 'config.json'
+
+# Parâmetro da URL com o id aleatório do navegador (mantido no refresh e ao reabrir o link)
+PARAMETRO_NAVEGADOR = 'navegador'
+
+# Chaves da sessão gravadas em disco quando a sessão fica ociosa
+CHAVES_DESCARREGAVEIS = ('dag_data', 'dags_carregadas', 'current_task', 'historicos', 'originais', 'diarios')
+# Caches derivados da DAG: descartados junto e recalculados quando a sessão volta
+CHAVES_DERIVADAS = ('validacoes', 'grafo_execucao', 'grafo_versao_tasks', 'yaml_cache')
+
+
+def _sessao_ativa(sessao_id):
+    from streamlit import runtime
+    return not runtime.exists() or runtime.get_instance().is_active_session(sessao_id)
+
+
+# Compartilhado por todas as sessões do processo
+deposito_sessoes = DepositoSessoes(CHAVES_DESCARREGAVEIS, CHAVES_DERIVADAS, sessao_ativa=_sessao_ativa)
+
+
+def carregar_configuracoes():
+    """
+    Carrega as configurações do arquivo config.json
+    O resultado é compartilhado pelo processo e só é relido quando o arquivo muda
+    """
+    try:
+        return obter_configuracoes(ARQUIVO_CONFIG)
+    except Exception as e:
+        st.error(f"Erro ao carregar configurações: {e}")
+        return None
+
+
+def config():
+    """Configurações já carregadas nesta execução (ver carregar_configuracoes)"""
+    return obter_configuracoes(ARQUIVO_CONFIG)
+
+
+def retomar_sessao():
+    """
+    Registra a atividade da sessão e devolve a ela o estado gravado em disco por ociosidade
+    Deve ser chamada antes de inicializar_sessao (que recriaria as chaves vazias)
+    """
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    contexto = get_script_run_ctx()
+    if contexto is None:
+        return
+    if deposito_sessoes.tocar(contexto.session_id, contexto.session_state) is False:
+        st.warning("⚠️ Não foi possível recuperar a DAG desta sessão, que estava parada. Carregue o arquivo novamente.")
+
+
+def obter_catalogo():
+    """
+    Catálogo do Qlik configurado em catalogo_qlik no config.json, ou None; uma exportação
+    que ainda não existe conta como sem catálogo (não como erro de leitura)
+    """
+    caminho = config().catalogo_qlik
+    return obter_catalogo_qlik(caminho) if caminho and os.path.exists(caminho) else None
+
+
+def inicializar_sessao():
+    """Inicialização do estado da sessão"""
+    if 'dag_data' not in st.session_state:
+        st.session_state.dag_data = None
+
+    if 'current_task' not in st.session_state:
+        st.session_state.current_task = {}
+
+    if 'original_filename' not in st.session_state:
+        st.session_state.original_filename = ""
+
+    if 'editing_task_id' not in st.session_state:
+        st.session_state.editing_task_id = None
+
+    if 'form_cleared' not in st.session_state:
+        st.session_state.form_cleared = False
+
+    if 'modo_atual' not in st.session_state:
+        st.session_state.modo_atual = "Criar Parametro DAG"
+
+    if 'arquivo_carregado' not in st.session_state:
+        st.session_state.arquivo_carregado = False
+
+    # Versão da estrutura da lista de tasks (reinicia o estado da grade ao inserir/remover)
+    if 'grade_versao' not in st.session_state:
+        st.session_state.grade_versao = 0
+
+    # Versão dos campos do cabeçalho (recriados quando outra DAG é aberta ou o cabeçalho muda fora deles)
+    if 'cabecalho_versao' not in st.session_state:
+        st.session_state.cabecalho_versao = 0
+
+    # Versão dos campos do formulário de task (recriados quando outra task é carregada nele)
+    if 'formulario_versao' not in st.session_state:
+        st.session_state.formulario_versao = 0
+
+    # Conexões desconhecidas vistas nesta sessão (não alteram o CONFIG compartilhado)
+    if 'conexoes_extras' not in st.session_state:
+        st.session_state.conexoes_extras = ()
+
+    # Revisão da DAG em edição: incrementada a cada alteração, controla o cache do YAML
+    if 'dag_revisao' not in st.session_state:
+        st.session_state.dag_revisao = 0
+
+    # DAGs enviadas no modo de edição (nome -> dag_data) e o status de cada arquivo
+    if 'dags_carregadas' not in st.session_state:
+        st.session_state.dags_carregadas = {}
+        st.session_state.status_carga = []
+        st.session_state.dag_carregada_atual = None
+
+    # Histórico de desfazer/refazer de cada DAG aberta (liberado junto com a lista de tasks)
+    if 'historicos' not in st.session_state:
+        st.session_state.historicos = weakref.WeakKeyDictionary()
+
+    # Estado da validação incremental de cada DAG aberta (mesma chave dos históricos)
+    if 'validacoes' not in st.session_state:
+        st.session_state.validacoes = weakref.WeakKeyDictionary()
+
+    # Documento como foi carregado de cada DAG aberta, para a comparação e o patch
+    if 'originais' not in st.session_state:
+        st.session_state.originais = weakref.WeakKeyDictionary()
+
+    # Diário da gravação automática de cada DAG aberta (mesma chave dos históricos)
+    if 'diarios' not in st.session_state:
+        st.session_state.diarios = weakref.WeakKeyDictionary()
+
+
+def marcar_dag_alterada(reiniciar_grade=True, reiniciar_cabecalho=False):
+    """
+    Registra uma alteração na DAG (invalida o YAML em cache e, opcionalmente, a grade e os
+    campos do cabeçalho) e grava no diário as alterações do histórico feitas desde a última chamada
+    """
+    st.session_state.dag_revisao += 1
+    if reiniciar_grade:
+        st.session_state.grade_versao += 1
+    if reiniciar_cabecalho:
+        st.session_state.cabecalho_versao += 1
+    gravar_diario()
+
+
+def preencher_formulario(task, task_id=None):
+    """Carrega a task no formulário; os campos são recriados com os valores dela"""
+    st.session_state.current_task = task
+    st.session_state.editing_task_id = task_id
+    st.session_state.formulario_versao += 1
+
+
+def clear_form():
+    """Limpa o formulário de task"""
+    preencher_formulario({})
+    if hasattr(st.session_state, 'inserir_abaixo'):
+        del st.session_state.inserir_abaixo
+
+
+def obter_historico():
+    """Histórico de desfazer/refazer da DAG em edição"""
+    tasks = st.session_state.dag_data['tasks']
+    if tasks not in st.session_state.historicos:
+        st.session_state.historicos[tasks] = Historico()
+    return st.session_state.historicos[tasks]
+
+
+def guardar_original(dag_data):
+    """Guarda a DAG recém-carregada como referência para a comparação"""
+    st.session_state.originais[dag_data['tasks']] = Original(dag_data)
+
+
+def obter_original():
+    """Original da DAG em edição, ou None se ela não veio de um arquivo"""
+    return st.session_state.originais.get(st.session_state.dag_data['tasks'])
+
+
+def _id_navegador():
+    """
+    Id aleatório do navegador no parâmetro ?navegador= da URL, criado na primeira execução;
+    None em versões do Streamlit sem st.query_params
+    """
+    if not hasattr(st, 'query_params'):
+        return None
+    valor = st.query_params.get(PARAMETRO_NAVEGADOR)
+    if not valor or not re.fullmatch(r'[0-9a-f]{32}', valor):
+        valor = uuid.uuid4().hex
+        st.query_params[PARAMETRO_NAVEGADOR] = valor
+    return valor
+
+
+def dono_sessao():
+    """
+    Hash do usuário logado (st.login, Streamlit 1.42+) ou, sem login, do id do navegador;
+    sem nenhum dos dois, um id desta sessão. Separa os diários da gravação automática de
+    cada usuário
+    """
+    if 'dono_sessao' not in st.session_state:
+        usuario = getattr(st, 'user', None)
+        if getattr(usuario, 'is_logged_in', False):
+            identidade = f"login:{usuario.get('email') or usuario.get('sub')}"
+        else:
+            identidade = f"navegador:{_id_navegador() or uuid.uuid4().hex}"
+        st.session_state.dono_sessao = hashlib.sha256(identidade.encode('utf-8')).hexdigest()[:32]
+    return st.session_state.dono_sessao
+
+
+def novo_diario(chave, nome, workspace_arquivo=None):
+    """Diario do documento `chave` para esta sessão; o de um envio é só do dono que o enviou"""
+    return Diario(chave, nome, workspace_arquivo, dono_sessao(), privado=chave.startswith('upload:'))
+
+
+def arquivo_no_workspace(indice):
+    """
+    Caminho relativo da DAG em edição no workspace `indice`, ou None se ela não veio dele
+    (um diário restaurado pode ser de outro workspace com um arquivo de mesmo nome)
+    """
+    relativo = st.session_state.get('workspace_arquivo')
+    caminho = st.session_state.get('workspace_caminho')
+    if not relativo or not caminho:
+        return None
+    if os.path.abspath(indice.caminho_absoluto(relativo)) != os.path.abspath(caminho):
+        return None
+    return relativo
+
+
+def obter_diario():
+    """Diário da DAG em edição, ou None sem gravação automática"""
+    return st.session_state.diarios.get(st.session_state.dag_data['tasks'])
+
+
+def iniciar_diario(chave, nome, workspace_arquivo=None):
+    """
+    Associa à DAG em edição o diário do documento `chave` (ver editor_dag.diario)
+    Se o diário em disco tem alterações de outra sessão, ele não é substituído: o
+    diário fica fora de sincronia até o usuário restaurar ou manter a versão da aba
+    """
+    tasks = st.session_state.dag_data['tasks']
+    if not AUTOSAVE_ATIVO or tasks in st.session_state.diarios:
+        return
+    diario = st.session_state.diarios[tasks] = novo_diario(chave, nome, workspace_arquivo)
+    situacao = diario.situacao_disco()
+    if situacao is not None and situacao.versao > 0:
+        return
+    try:
+        diario.iniciar(st.session_state.dag_data, obter_original())
+    except OSError as e:
+        st.session_state.falha_diario = str(e)
+
+
+def gravar_diario():
+    """Acrescenta ao diário as alterações registradas no histórico da DAG em edição"""
+    tasks = st.session_state.dag_data['tasks']
+    historico = st.session_state.historicos.get(tasks)
+    alteracoes = historico.retirar_alteracoes() if historico is not None else ()
+    diario = st.session_state.diarios.get(tasks)
+    if diario is None or not alteracoes:
+        return
+    try:
+        # Fora de sincronia (outra aba gravou), nada é gravado até o usuário escolher a versão
+        diario.acrescentar(alteracoes, st.session_state.dag_data)
+    except OSError as e:
+        st.session_state.falha_diario = str(e)
+
+
+def obter_relatorio_validacao():
+    """Erros da DAG em edição; só as tasks alteradas desde a última chamada são revalidadas"""
+    tasks = st.session_state.dag_data['tasks']
+    validador = obter_validador(config(), obter_catalogo())
+    validacao = st.session_state.validacoes.get(tasks)
+    if validacao is None or validacao.validador is not validador:
+        validacao = st.session_state.validacoes[tasks] = ValidacaoIncremental(validador)
+    return validacao.relatorio(st.session_state.dag_data)
+
+
+def obter_grafo_execucao():
+    """Grafo do ordem_execução da sessão, atualizado apenas no que mudou desde a última execução"""
+    if st.session_state.get('grafo_execucao') is None:
+        st.session_state.grafo_execucao = GrafoExecucao()
+    grafo = st.session_state.grafo_execucao
+
+    tasks = st.session_state.dag_data['tasks']
+    versao_tasks = (id(tasks), tasks.versao)
+    if st.session_state.get('grafo_versao_tasks') != versao_tasks:
+        grafo.atualizar_tasks(Counter(
+            task['identificador_task'] for task in tasks if task.get('identificador_task')
+        ))
+        st.session_state.grafo_versao_tasks = versao_tasks
+
+    grafo.atualizar_texto(str(st.session_state.dag_data['dag'].get('ordem_execução') or ''))
+    return grafo
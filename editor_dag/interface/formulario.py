@@ -0,0 +1,173 @@
+"""Formulário para adicionar, editar ou inserir uma task"""
+import streamlit as st
+
+from editor_dag.catalogo_qlik import TIPOS_POR_OPERADOR
+from editor_dag.configuracoes import opcoes_com_extras
+from editor_dag.interface.acoes import add_or_update_task
+from editor_dag.interface.estado import clear_form, config, obter_catalogo, preencher_formulario
+from editor_dag.interface.fragmentos import acao, invalidar, secao
+
+# Mini operador usado quando o objeto escolhido não combina com o operador atual
+OPERADOR_POR_TIPO = {'app': 'app', 'automation': 'automation', 'report': 'report'}
+
+CAMPOS_FORMULARIO = ('identificador_task', 'ativo', 'conexao_id', 'mini_operador', 'id_mini_operador', 'extra_info')
+
+
+def exibir_catalogo_qlik():
+    """Busca no catálogo do Qlik que preenche o ID do Mini Operador do formulário"""
+    catalogo = obter_catalogo()
+    if catalogo is None:
+        return
+    with st.expander(f"🔎 Catálogo do Qlik ({len(catalogo)} objetos)"):
+        for arquivo, erro in catalogo.erros:
+            st.warning(f"Não foi possível ler `{arquivo}`: {erro}")
+        if not len(catalogo):
+            st.caption("Gere a exportação com `qlik app ls --json` e `qlik automation ls --json` "
+                       f"em `{catalogo.caminho}`")
+            return
+
+        operador = st.session_state.current_task.get('mini_operador', '')
+        tipos_operador = catalogo.tipos_do_operador(operador)
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            texto = st.text_input("Nome ou ID (início)", key='busca_catalogo_qlik',
+                                  placeholder="vendas, c36213a0...")
+        with col2:
+            filtros = ("Conforme o mini operador", "Todos", *sorted(catalogo.tipos))
+            filtro = st.selectbox("Tipo", options=filtros, key='filtro_catalogo_qlik',
+                                  help=f"Mini operador atual: {operador or '-'}")
+        if filtro == "Todos" or (filtro == filtros[0] and not tipos_operador):
+            tipos = None
+        else:
+            tipos = tipos_operador if filtro == filtros[0] else (filtro,)
+
+        if not texto:
+            return
+        encontrados = catalogo.buscar(texto, tipos)
+        if not encontrados:
+            st.caption("Nenhum objeto encontrado")
+            return
+        objeto = st.selectbox(
+            "Objetos encontrados",
+            options=encontrados,
+            format_func=lambda o: f"{o.nome} · {o.tipo or '?'} · {o.id}",
+            key='objeto_catalogo_qlik',
+        )
+        st.button("📋 Usar no formulário", key='usar_objeto_qlik',
+                  on_click=acao(usar_objeto_qlik, 'formulario'), args=(objeto,))
+
+
+def usar_objeto_qlik(objeto):
+    """Preenche o ID do Mini Operador (e o operador, se não combinar) com o objeto do catálogo"""
+    task = dict(st.session_state.current_task, id_mini_operador=objeto.id)
+    operador = task.get('mini_operador', '')
+    if objeto.tipo and objeto.tipo not in TIPOS_POR_OPERADOR.get(operador, ()):
+        task['mini_operador'] = OPERADOR_POR_TIPO[objeto.tipo]
+    preencher_formulario(task, st.session_state.editing_task_id)
+
+
+def _chave_campo(campo):
+    return f"tarefa_{campo}_{st.session_state.formulario_versao}"
+
+
+def enviar_formulario():
+    """Grava a task do formulário (os valores submetidos já estão no estado dos campos)"""
+    for campo in CAMPOS_FORMULARIO:
+        chave = _chave_campo(campo)
+        if chave in st.session_state:
+            st.session_state.current_task[campo] = st.session_state[chave]
+    if not st.session_state.current_task.get('identificador_task'):
+        st.session_state.erro_formulario = "Por favor, preencha pelo menos o 'Identificador da Task'"
+        return
+    add_or_update_task()
+    clear_form()
+    invalidar('tasks', 'formulario')
+
+
+def limpar_formulario():
+    """Esvazia o formulário e sai do modo de edição"""
+    clear_form()
+    st.session_state.form_cleared = True
+
+
+@secao('formulario')
+def exibir_formulario_task():
+    """Formulário para adicionar/editar tasks"""
+    configuracoes = config()
+    exibir_catalogo_qlik()
+    erro = st.session_state.pop('erro_formulario', None)
+    with st.form("task_form"):
+        editing_mode = st.session_state.editing_task_id is not None
+        form_title = "✏️ Editando Task" if editing_mode else "➕ Adicionar Nova Task"
+        st.subheader(form_title)
+
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.session_state.current_task['identificador_task'] = st.text_input(
+                "Identificador da Task*",
+                key=_chave_campo('identificador_task'),
+                value=st.session_state.current_task.get('identificador_task', ''),
+                placeholder="minha_task"
+            )
+
+            st.session_state.current_task['ativo'] = st.selectbox(
+                "Ativo*",
+                key=_chave_campo('ativo'),
+                options=[1, 0],
+                index=0 if st.session_state.current_task.get('ativo', 1) == 1 else 1,
+                format_func=lambda x: "Sim" if x == 1 else "Não"
+            )
+
+            # Dropdown para ID da Conexão
+            conexao_atual = st.session_state.current_task.get('conexao_id', '')
+            if (conexao_atual and conexao_atual not in configuracoes.indice_conexoes
+                    and conexao_atual not in st.session_state.conexoes_extras):
+                st.session_state.conexoes_extras += (conexao_atual,)
+
+            opcoes_conexao, indice_conexao = opcoes_com_extras(
+                configuracoes.conexoes, configuracoes.indice_conexoes,
+                st.session_state.conexoes_extras, conexao_atual
+            )
+            st.session_state.current_task['conexao_id'] = st.selectbox(
+                "ID da Conexão*",
+                key=_chave_campo('conexao_id'),
+                options=opcoes_conexao,
+                index=indice_conexao
+            )
+
+        with col2:
+            # Dropdown para Mini Operador
+            operador_atual = st.session_state.current_task.get('mini_operador', '')
+            st.session_state.current_task['mini_operador'] = st.selectbox(
+                "Mini Operador*",
+                key=_chave_campo('mini_operador'),
+                options=configuracoes.mini_operadores,
+                index=configuracoes.indice_mini_operadores.get(operador_atual, 0)
+            )
+
+            st.session_state.current_task['id_mini_operador'] = st.text_input(
+                "ID do Mini Operador*",
+                key=_chave_campo('id_mini_operador'),
+                value=st.session_state.current_task.get('id_mini_operador', ''),
+                placeholder="c36213a0-8322-11ee-b566-537f0445863c"
+            )
+
+            st.session_state.current_task['extra_info'] = st.text_area(
+                "Informações Extras",
+                key=_chave_campo('extra_info'),
+                value=st.session_state.current_task.get('extra_info', ''),
+                placeholder="Informações adicionais...",
+                height=100
+            )
+
+        # Botões do formulário: a gravação acontece no callback, que atualiza só as seções afetadas
+        col_btn1, col_btn2, col_btn3 = st.columns([1, 1, 2])
+        with col_btn1:
+            submit_label = "💾 Atualizar Task" if editing_mode else "✅ Adicionar Task"
+            st.form_submit_button(submit_label, on_click=acao(enviar_formulario))
+        with col_btn2:
+            st.form_submit_button("🗑️ Limpar Formulário", on_click=acao(limpar_formulario, 'formulario'))
+
+        if erro:
+            st.error(erro)
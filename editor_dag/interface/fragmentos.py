@@ -0,0 +1,90 @@
+"""
+Seções da página reexecutadas sozinhas (fragmentos do Streamlit)
+
+Cada seção é um fragmento nomeado: um widget dentro dela reexecuta só a seção,
+não a página inteira. Quando uma ação altera dados que outras seções exibem, o
+callback do widget chama invalidar() com o que mudou ('cabecalho', 'tasks' ou
+'formulario') e apenas as seções que leem esses dados (LEITURAS) são
+reexecutadas, com st.rerun(scope=[...]).
+
+Em versões do Streamlit sem fragmentos nomeados, secao() devolve a própria
+função e invalidar() não faz nada: toda interação reexecuta a página inteira,
+depois dos callbacks.
+"""
+import functools
+import inspect
+
+import streamlit as st
+
+from editor_dag.interface.estado import inicializar_sessao, retomar_sessao
+
+FRAGMENTOS_NOMEADOS = hasattr(st, 'fragment') and 'key' in inspect.signature(st.fragment).parameters
+
+# Dados exibidos por cada seção
+LEITURAS = {
+    'historico': ('cabecalho', 'tasks'),
+    'cabecalho': ('cabecalho',),
+    # Carga do agendamento: cron do cabeçalho e quantidade de tasks ativas
+    'agendamento': ('cabecalho', 'tasks'),
+    'dependencias': ('cabecalho', 'tasks'),
+    'formulario': ('formulario',),
+    'importacao': ('tasks',),
+    'tabela': ('tasks',),
+    # O nome do arquivo no modo de criação vem do identificador do formulário
+    'download': ('cabecalho', 'tasks', 'formulario'),
+    'alteracoes': ('cabecalho', 'tasks'),
+    # A DAG em edição só é lida ao salvar como modelo
+    'modelos': (),
+    # Cada alteração gravada pode revelar que outra aba gravou o diário antes
+    'diario': ('cabecalho', 'tasks'),
+}
+
+
+def _retomar():
+    """Mesmo preparo do início da página; False se a DAG da sessão não pôde ser recuperada"""
+    retomar_sessao()
+    inicializar_sessao()
+    return st.session_state.dag_data is not None
+
+
+def _execucao_parcial():
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    contexto = get_script_run_ctx()
+    return bool(getattr(contexto, 'fragment_ids_this_run', None))
+
+
+def secao(nome):
+    """Transforma a função de uma seção da página no fragmento `nome` (ver LEITURAS)"""
+    def decorar(funcao):
+        if not FRAGMENTOS_NOMEADOS:
+            return funcao
+
+        @functools.wraps(funcao)
+        def executar(*args, **kwargs):
+            # Reexecuções só da seção não passam pelo início da página (app.executar)
+            if _execucao_parcial() and not _retomar():
+                st.rerun()
+            return funcao(*args, **kwargs)
+
+        return st.fragment(executar, key=nome)
+    return decorar
+
+
+def invalidar(*alterados):
+    """Reexecuta as seções que exibem os dados alterados; só pode ser chamada em callbacks de widgets"""
+    if not FRAGMENTOS_NOMEADOS or not alterados:
+        return
+    st.rerun(scope=[nome for nome, leituras in LEITURAS.items() if set(leituras) & set(alterados)])
+
+
+def acao(funcao, *alterados):
+    """Callback de widget que executa a função e invalida o que ela altera"""
+    @functools.wraps(funcao)
+    def executar(*args, **kwargs):
+        # Os callbacks rodam antes do script: a sessão pode estar em disco por ociosidade
+        if not _retomar():
+            return
+        funcao(*args, **kwargs)
+        invalidar(*alterados)
+    return executar
@@ -0,0 +1,114 @@
+"""Importação de tasks em lote a partir de planilha CSV/Excel"""
+import streamlit as st
+
+from editor_dag.interface.acoes import importar_tasks
+from editor_dag.interface.estado import config, obter_catalogo
+from editor_dag.interface.fragmentos import acao, secao
+from editor_dag.validacao import obter_validador
+
+NAO_IMPORTAR = "(não importar)"
+
+
+def _ler_planilha_enviada(arquivo):
+    """DataFrame da planilha enviada, lido uma vez por arquivo (o resultado fica na sessão)"""
+    from editor_dag.planilha import ler_planilha
+
+    lida = st.session_state.get('planilha_importacao')
+    if lida is None or lida[0] != arquivo.file_id:
+        lida = (arquivo.file_id, ler_planilha(arquivo.getvalue(), arquivo.name))
+        st.session_state.planilha_importacao = lida
+    return lida[1]
+
+
+def _escolher_mapeamento(colunas):
+    """Um seletor de coluna por campo da task, já preenchido pelos nomes das colunas"""
+    from editor_dag.planilha import CAMPOS_IMPORTACAO, sugerir_mapeamento
+
+    sugestao = sugerir_mapeamento(colunas)
+    opcoes = (NAO_IMPORTAR, *colunas)
+    mapeamento = {}
+    for coluna_tela, campo in zip(st.columns(3) * 2, CAMPOS_IMPORTACAO):
+        with coluna_tela:
+            escolhida = st.selectbox(
+                campo, options=opcoes,
+                index=opcoes.index(sugestao[campo]) if sugestao[campo] else 0,
+                key=f"mapa_importacao_{campo}_{st.session_state.grade_versao}",
+            )
+        mapeamento[campo] = None if escolhida == NAO_IMPORTAR else escolhida
+    return mapeamento
+
+
+def importar_planilha(tasks, referencia, mensagem):
+    """Callback do botão de importação"""
+    importar_tasks(tasks, referencia)
+    st.session_state.pop('planilha_importacao', None)
+    st.session_state.mensagem_importacao = mensagem
+
+
+@secao('importacao')
+def exibir_importacao():
+    """Upload da planilha, ligação das colunas, validação de todas as linhas e importação"""
+    mensagem = st.session_state.pop('mensagem_importacao', None)
+    with st.expander("📥 Importar tasks de planilha", expanded=mensagem is not None):
+        if mensagem:
+            st.success(mensagem)
+        arquivo = st.file_uploader(
+            "Planilha com uma task por linha (CSV ou Excel)",
+            type=['csv', 'xlsx', 'xls'],
+            key=f"planilha_tasks_{st.session_state.grade_versao}",
+            help="Colunas reconhecidas pelo nome: identificador_task, ativo, conexao_id, "
+                 "mini_operador, id_mini_operador, extra_info",
+        )
+        if arquivo is None:
+            return
+
+        from editor_dag.planilha import ErroPlanilha, rejeitadas_para_csv, validar_planilha
+
+        try:
+            df = _ler_planilha_enviada(arquivo)
+        except ErroPlanilha as e:
+            st.error(str(e))
+            return
+        if df.empty:
+            st.warning("A planilha não tem linhas.")
+            return
+
+        mapeamento = _escolher_mapeamento(list(df.columns))
+        if not mapeamento['identificador_task']:
+            st.warning("Escolha a coluna do identificador_task.")
+            return
+
+        tasks = st.session_state.dag_data['tasks']
+        configuracoes = config()
+        resultado = validar_planilha(
+            df, mapeamento, configuracoes,
+            obter_validador(configuracoes, obter_catalogo()),
+            identificadores_existentes={task.get('identificador_task') for task in tasks},
+        )
+
+        col_validas, col_rejeitadas, col_posicao = st.columns([1, 1, 2])
+        col_validas.metric("Válidas", len(resultado.tasks))
+        col_rejeitadas.metric("Rejeitadas", len(resultado.rejeitadas))
+        with col_posicao:
+            ids = [None, *tasks.ids()]
+            referencia = st.selectbox(
+                "Inserir", options=ids,
+                format_func=lambda task_id: "No final" if task_id is None else
+                f"Após {tasks.posicao(task_id)} · {tasks.task(task_id).get('identificador_task')}",
+                key=f"posicao_importacao_{st.session_state.grade_versao}",
+            )
+
+        if len(resultado.rejeitadas):
+            st.dataframe(resultado.rejeitadas.head(200), hide_index=True, use_container_width=True)
+            st.download_button(
+                "📥 Baixar linhas rejeitadas (CSV)",
+                data=rejeitadas_para_csv(resultado.rejeitadas),
+                file_name=f"rejeitadas_{arquivo.name.rsplit('.', 1)[0]}.csv",
+                mime="text/csv",
+            )
+
+        mensagem = (f"✅ {len(resultado.tasks)} task(s) importada(s) de {arquivo.name}"
+                    + (f"; {len(resultado.rejeitadas)} linha(s) rejeitada(s)" if len(resultado.rejeitadas) else ""))
+        st.button(f"📥 Importar {len(resultado.tasks)} task(s)", disabled=not resultado.tasks,
+                  key='importar_planilha', on_click=acao(importar_planilha, 'tasks'),
+                  args=(resultado.tasks, referencia, mensagem))
@@ -0,0 +1,121 @@
+"""Modelos de DAG com marcadores e geração de DAGs em lote a partir de uma matriz de parâmetros"""
+import tempfile
+
+import streamlit as st
+import yaml
+
+from editor_dag.dag import ErroEstruturaDag
+from editor_dag.interface.download import DOWNLOAD_SOB_DEMANDA
+from editor_dag.interface.estado import config
+from editor_dag.interface.fragmentos import acao, secao
+from editor_dag.modelos import (DESLOCAMENTO_CRON, ErroModelo, RegistroModelos, contar_combinacoes, escrever_zip,
+                                gerar_dags, marcadores, padrao_nome_padrao)
+from editor_dag.serializacao import carregar_yaml
+
+
+def salvar_modelo(registro, nome):
+    """Callback do botão que grava a DAG em edição como modelo"""
+    try:
+        registro.salvar(nome, st.session_state.dag_data)
+    except (ErroModelo, OSError) as e:
+        st.session_state.mensagem_modelos = ('error', f"Não foi possível salvar o modelo: {e}")
+        return
+    st.session_state.mensagem_modelos = ('success', f"✅ Modelo '{nome}' salvo em {registro.diretorio}")
+
+
+def _matriz_inicial(nomes):
+    """
+    Uma dimensão por marcador do modelo com um valor de exemplo, para o usuário substituir
+    (uma dimensão vazia não gera nenhuma DAG e a matriz já abriria inválida)
+    """
+    linhas = [f"{nome}: [{nome}_exemplo]" for nome in nomes]
+    if linhas:
+        linhas.append(f"# {DESLOCAMENTO_CRON}: [0, 15, 30]")
+    else:
+        # Sem marcadores, o modelo gera uma DAG por deslocamento do agendamento
+        linhas.append(f"{DESLOCAMENTO_CRON}: [0]")
+    return "\n".join(linhas)
+
+
+def _zip_sob_demanda(modelo, matriz, padrao_nome):
+    # Os YAMLs vão um a um para o zip em arquivo temporário; só o zip pronto é lido
+    def gerar():
+        with tempfile.TemporaryFile() as arquivo:
+            escrever_zip(gerar_dags(modelo, matriz, padrao_nome), arquivo)
+            arquivo.seek(0)
+            return arquivo.read()
+    return gerar
+
+
+@secao('modelos')
+def exibir_modelos():
+    """Salvar a DAG em edição como modelo e gerar um zip de DAGs a partir de um modelo"""
+    diretorio = config().modelos_dag
+    mensagem = st.session_state.pop('mensagem_modelos', None)
+    with st.expander("🧩 Modelos e geração de DAGs em lote", expanded=mensagem is not None):
+        if not diretorio:
+            st.info("Indique o diretório dos modelos em `modelos_dag` no config.json.")
+            return
+        if mensagem:
+            getattr(st, mensagem[0])(mensagem[1])
+
+        registro = RegistroModelos(diretorio)
+        col_nome, col_salvar = st.columns([3, 1])
+        with col_nome:
+            nome = st.text_input(
+                "Salvar a DAG em edição como modelo", key='nome_modelo', placeholder="recarga_apps",
+                help="Use marcadores {{nome}} nos campos da DAG e das tasks (ex.: recarga_{{app}}); "
+                     "um modelo com o mesmo nome é substituído",
+            ).strip()
+        with col_salvar:
+            st.write("")
+            st.button("💾 Salvar modelo", key='salvar_modelo', disabled=not nome, use_container_width=True,
+                      on_click=acao(salvar_modelo), args=(registro, nome))
+
+        modelos = registro.listar()
+        if not modelos:
+            st.caption("Nenhum modelo salvo ainda.")
+            return
+
+        escolhido = st.selectbox("Modelo", options=modelos, key='modelo_escolhido')
+        try:
+            modelo = registro.carregar(escolhido)
+        except (ErroEstruturaDag, yaml.YAMLError, OSError) as e:
+            st.error(f"Erro ao ler o modelo '{escolhido}': {e}")
+            return
+
+        nomes = sorted(marcadores(modelo))
+        st.caption("Marcadores: " + (", ".join(f"`{{{{{nome}}}}}`" for nome in nomes) or "nenhum"))
+        texto = st.text_area(
+            "Matriz de parâmetros (YAML)", value=_matriz_inicial(nomes), height=200,
+            key=f"matriz_modelo_{escolhido}",
+            help="Uma lista de valores por marcador; cada combinação gera uma DAG. Valores ligados entre si "
+                 "(ex.: nome e ID do app) vão juntos em uma lista de dicionários: "
+                 "`app: [{app: vendas, id_app: ...}]`. "
+                 f"`{DESLOCAMENTO_CRON}` (minutos) desloca o agendamento de cada DAG.",
+        )
+        try:
+            matriz = carregar_yaml(texto)
+            padrao = padrao_nome_padrao(matriz)
+        except (yaml.YAMLError, ErroModelo) as e:
+            st.error(f"Matriz inválida: {e}")
+            return
+        padrao = st.text_input("Nome dos arquivos", key=f"padrao_nome_modelo_{escolhido}", placeholder=padrao,
+                               help="Padrão com marcadores; vazio usa o sugerido").strip() or padrao
+
+        try:
+            # Só confere a matriz e os nomes dos arquivos; as DAGs são geradas no clique
+            gerar_dags(modelo, matriz, padrao)
+        except ErroModelo as e:
+            st.error(str(e))
+            return
+
+        quantidade = contar_combinacoes(matriz)
+        rotulo = f"📦 Baixar {quantidade} DAG(s) (.zip)"
+        nome_zip = f"{escolhido}.zip"
+        if DOWNLOAD_SOB_DEMANDA:
+            st.download_button(rotulo, data=_zip_sob_demanda(modelo, matriz, padrao), file_name=nome_zip,
+                               mime="application/zip", on_click='ignore', use_container_width=True)
+        elif st.button(f"📦 Gerar {quantidade} DAG(s)", key='gerar_zip_modelo', use_container_width=True):
+            st.download_button(rotulo, data=_zip_sob_demanda(modelo, matriz, padrao)(), file_name=nome_zip,
+                               mime="application/zip", use_container_width=True)
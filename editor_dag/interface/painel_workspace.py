@@ -0,0 +1,71 @@
+"""Modo Workspace: índice de um diretório de DAGs, busca de tasks e abertura no editor"""
+import os
+
+import streamlit as st
+
+from editor_dag.interface.acoes import abrir_dag_workspace
+
+
+def exibir_workspace():
+    """Seleção do diretório, reindexação incremental e busca entre todas as DAGs"""
+    # O índice (sqlite e pool de processos) só é carregado no modo Workspace
+    from editor_dag.workspace import CAMPOS_BUSCA, IndiceWorkspace
+
+    diretorio = st.text_input(
+        "📁 Diretório das DAGs",
+        key='workspace_diretorio',
+        placeholder="/caminho/para/repositorio/dags",
+        help="Todos os arquivos .yml/.yaml do diretório (e subdiretórios) são indexados"
+    )
+    if not diretorio:
+        return None
+    if not os.path.isdir(diretorio):
+        st.error("Diretório não encontrado")
+        return None
+
+    indice = IndiceWorkspace(diretorio)
+
+    # Reindexa ao trocar de diretório ou a pedido; só arquivos alterados são relidos
+    reindexar = st.button("🔄 Reindexar", key='workspace_reindexar')
+    if reindexar or st.session_state.get('workspace_indexado') != indice.diretorio:
+        with st.spinner("Atualizando índice..."):
+            resultado = indice.reindexar()
+        st.session_state.workspace_indexado = indice.diretorio
+        st.caption(
+            f"{resultado.total} DAGs no diretório • {resultado.lidos} relidas • "
+            f"{resultado.removidos} removidas do índice • {resultado.com_erro} com erro"
+        )
+
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        campo = st.selectbox(
+            "Campo",
+            options=[None, *CAMPOS_BUSCA],
+            format_func=lambda c: "Qualquer campo" if c is None else c,
+            key='workspace_campo'
+        )
+    with col2:
+        termo = st.text_input("🔎 Buscar tasks", key='workspace_termo', placeholder="qliksensecloud")
+    with col3:
+        parcial = st.checkbox("Busca parcial", key='workspace_parcial')
+
+    if termo:
+        resultados = indice.buscar_tasks(termo, campo=campo, exato=not parcial)
+        st.caption(f"{len(resultados)} tasks encontradas")
+        if resultados:
+            st.dataframe(resultados, use_container_width=True, hide_index=True)
+        caminhos = sorted({r['caminho'] for r in resultados})
+    else:
+        caminhos = [d['caminho'] for d in indice.listar_dags() if d['erro'] is None]
+
+    col_abrir1, col_abrir2 = st.columns([3, 1])
+    with col_abrir1:
+        caminho = st.selectbox("DAG", options=caminhos, key='workspace_dag', index=None,
+                               placeholder="Selecione uma DAG para editar")
+    with col_abrir2:
+        st.write("")
+        if st.button("📂 Abrir no editor", disabled=caminho is None, key='workspace_abrir'):
+            if abrir_dag_workspace(indice, caminho):
+                st.rerun()
+
+    return indice
@@ -0,0 +1,101 @@
+"""Restauração das DAGs gravadas no diário da gravação automática e conflito entre abas"""
+from datetime import datetime
+
+import streamlit as st
+
+from editor_dag.diario import ATIVO as AUTOSAVE_ATIVO, listar_pendentes
+from editor_dag.interface.acoes import descartar_documento, manter_versao_aba, restaurar_diario, restaurar_documento
+from editor_dag.interface.estado import dono_sessao, obter_diario
+from editor_dag.interface.fragmentos import secao
+
+
+def _hora(situacao):
+    return datetime.fromtimestamp(situacao.hora).strftime('%d/%m/%Y %H:%M:%S')
+
+
+def _exibir_falha():
+    falha = st.session_state.pop('falha_diario', None)
+    if falha:
+        st.warning(f"⚠️ Gravação automática indisponível: {falha}")
+
+
+@secao('diario')
+def exibir_situacao_diario():
+    """Aviso quando o diário da DAG em edição foi gravado por outra aba ou sessão"""
+    _exibir_falha()
+    diario = obter_diario()
+    if diario is None or diario.sincronizado:
+        return
+    situacao = diario.situacao_disco()
+    if situacao is None:
+        return
+
+    if not diario.iniciado:
+        st.warning(f"♻️ **{situacao.nome}** tem alterações não salvas, gravadas automaticamente em "
+                   f"{_hora(situacao)}. Restaure-as ou continue a partir do arquivo aberto.")
+    else:
+        st.warning(f"⚠️ **{situacao.nome}** foi alterada em outra aba em {_hora(situacao)}. "
+                   "As alterações desta aba não estão sendo gravadas até você escolher uma das versões.")
+    col_restaurar, col_manter, _ = st.columns([1, 1, 2])
+    with col_restaurar:
+        if st.button("♻️ Restaurar", key='restaurar_diario', use_container_width=True,
+                     help="Substitui a DAG desta aba pela versão gravada"):
+            restaurar_diario()
+            st.rerun()
+    with col_manter:
+        if st.button("✋ Manter a versão desta aba", key='manter_versao_aba', use_container_width=True,
+                     help="Grava a DAG desta aba por cima da versão gravada"):
+            manter_versao_aba()
+            st.rerun()
+
+
+def _pendentes_da_sessao():
+    """
+    DAGs do usuário com alterações não salvas, procuradas uma vez por sessão (o diretório
+    não é varrido a cada execução); restaurar ou descartar tira a DAG da lista
+    """
+    if 'pendentes_diario' not in st.session_state:
+        try:
+            st.session_state.pendentes_diario = listar_pendentes(dono_sessao())
+        except OSError as e:
+            st.session_state.pendentes_diario = []
+            st.session_state.falha_diario = str(e)
+    return st.session_state.pendentes_diario
+
+
+def _retirar_pendente(situacao):
+    st.session_state.pendentes_diario = [
+        pendente for pendente in st.session_state.pendentes_diario if pendente.chave != situacao.chave
+    ]
+
+
+def exibir_recuperaveis():
+    """DAGs com alterações não salvas de sessões anteriores (refresh do navegador ou reinício do servidor)"""
+    if not AUTOSAVE_ATIVO:
+        return
+    abertas = {diario.chave for diario in st.session_state.diarios.values()}
+    pendentes = [situacao for situacao in _pendentes_da_sessao() if situacao.chave not in abertas]
+    if st.session_state.dag_data is None:
+        _exibir_falha()
+    if not pendentes:
+        return
+
+    with st.expander(f"♻️ DAGs com alterações não salvas ({len(pendentes)})",
+                     expanded=st.session_state.dag_data is None):
+        for i, situacao in enumerate(pendentes[:20]):
+            col_nome, col_restaurar, col_descartar = st.columns([4, 1, 1])
+            with col_nome:
+                origem = f" · workspace `{situacao.workspace_arquivo}`" if situacao.workspace_arquivo else ""
+                st.markdown(f"**{situacao.nome}**{origem} · {situacao.versao} alteração(ões) · {_hora(situacao)}")
+            with col_restaurar:
+                if st.button("♻️ Restaurar", key=f"restaurar_pendente_{i}", use_container_width=True):
+                    if restaurar_documento(situacao.chave, situacao.nome, situacao.workspace_arquivo):
+                        _retirar_pendente(situacao)
+                    st.rerun()
+            with col_descartar:
+                if st.button("🗑️ Descartar", key=f"descartar_pendente_{i}", use_container_width=True):
+                    descartar_documento(situacao.chave, situacao.nome)
+                    _retirar_pendente(situacao)
+                    st.rerun()
+        if len(pendentes) > 20:
+            st.caption(f"... e mais {len(pendentes) - 20}")
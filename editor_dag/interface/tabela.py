@@ -0,0 +1,303 @@
+"""Visualizações da lista de tasks: grade paginada, lista detalhada e reordenação"""
+import streamlit as st
+
+from editor_dag.interface.acoes import (edit_task, inserir_task_abaixo, mover_tasks, remove_task,
+                                        remover_tasks, reordenar_tasks)
+from editor_dag.interface.estado import config, marcar_dag_alterada, obter_historico, obter_relatorio_validacao
+from editor_dag.interface.fragmentos import acao, invalidar, secao
+
+# Colunas exibidas na grade de tasks (campo da task -> rótulo)
+COLUNAS_GRADE = {
+    'task_num': "Nº",
+    'ativo': "Ativo",
+    'identificador_task': "Identificador",
+    'conexao_id': "Conexão",
+    'mini_operador': "Operador",
+    'id_mini_operador': "ID do Mini Operador",
+    'extra_info': "Informações Extras",
+}
+
+
+def tasks_para_dataframe(itens, inicio, erros_tasks):
+    """Monta o DataFrame apenas com as tasks da página atual, indexado pelo id de cada task"""
+    # O pandas só é carregado quando a grade é exibida
+    import pandas as pd
+
+    linhas = []
+    for posicao, (task_id, task) in enumerate(itens, start=inicio):
+        linhas.append({
+            'selecionar': False,
+            'task_num': posicao,
+            'ativo': task.get('ativo', 1) == 1,
+            'identificador_task': task.get('identificador_task', ''),
+            'conexao_id': task.get('conexao_id', ''),
+            'mini_operador': task.get('mini_operador', ''),
+            'id_mini_operador': str(task.get('id_mini_operador', '')),
+            'extra_info': task.get('extra_info', '') or '',
+            'erros': '; '.join(erros_tasks.get(task_id, ())),
+        })
+    return pd.DataFrame(linhas, index=[task_id for task_id, _ in itens],
+                        columns=['selecionar', *COLUNAS_GRADE, 'erros'])
+
+
+def aplicar_edicoes_grade(itens, edicoes):
+    """Aplica na DAG as células alteradas na grade (somente as linhas editadas)"""
+    tasks = st.session_state.dag_data['tasks']
+    alterou = False
+    for linha, campos in edicoes.items():
+        task_id, task = itens[int(linha)]
+        novos_valores = {}
+        for campo, valor in campos.items():
+            if campo in ('selecionar', 'task_num', 'erros'):
+                continue
+            if campo == 'ativo':
+                valor = 1 if valor else 0
+            if task.get(campo) != valor:
+                novos_valores[campo] = valor
+        if novos_valores:
+            with obter_historico().registrar(st.session_state.dag_data, f"Editar na grade: {task.get('identificador_task', '')}"):
+                tasks.substituir(task_id, {**task, **novos_valores})
+            alterou = True
+    if alterou:
+        # A grade mantém seu estado: as edições vêm do próprio widget
+        marcar_dag_alterada(reiniciar_grade=False)
+    return alterou
+
+
+def grade_editada(chave_grade, inicio, fim):
+    """Callback da grade: aplica as células editadas e atualiza as seções que exibem as tasks"""
+    itens = st.session_state.dag_data['tasks'].itens(inicio, fim)
+    if aplicar_edicoes_grade(itens, st.session_state[chave_grade].get('edited_rows', {})):
+        invalidar('tasks')
+
+
+def exibir_grade_tasks():
+    """Exibe as tasks em uma única grade paginada com edição inline e seleção múltipla"""
+    tasks = st.session_state.dag_data['tasks']
+    total = len(tasks)
+    configuracoes = config()
+
+    col_pag1, col_pag2, col_pag3 = st.columns([1, 1, 4])
+    with col_pag1:
+        tamanho_pagina = st.selectbox("Tasks por página", options=[25, 50, 100, 250], key='grade_tamanho_pagina')
+    total_paginas = max(1, -(-total // tamanho_pagina))
+    if st.session_state.get('grade_pagina', 1) > total_paginas:
+        st.session_state.grade_pagina = total_paginas
+    with col_pag2:
+        pagina = st.number_input("Página", min_value=1, max_value=total_paginas, value=1, key='grade_pagina')
+    with col_pag3:
+        st.caption(f"{total} tasks • página {pagina} de {total_paginas}")
+
+    inicio = (pagina - 1) * tamanho_pagina
+    itens = tasks.itens(inicio, inicio + tamanho_pagina)
+    chave_grade = f"grade_tasks_{st.session_state.grade_versao}_{inicio}_{tamanho_pagina}"
+
+    opcoes_conexao = list(configuracoes.conexoes + st.session_state.conexoes_extras)
+    opcoes_conexao += sorted({t.get('conexao_id') for _, t in itens} - set(opcoes_conexao) - {None})
+    opcoes_operador = list(configuracoes.mini_operadores)
+    opcoes_operador += sorted({t.get('mini_operador') for _, t in itens} - set(opcoes_operador) - {None})
+
+    # As edições pendentes da grade são aplicadas antes de montar o DataFrame,
+    # para que a coluna de erros já reflita o valor recém-digitado
+    edicoes = st.session_state.get(chave_grade, {}).get('edited_rows', {})
+    if edicoes:
+        aplicar_edicoes_grade(itens, edicoes)
+        itens = tasks.itens(inicio, inicio + tamanho_pagina)
+    erros_tasks = obter_relatorio_validacao().erros_tasks
+
+    df_editado = st.data_editor(
+        tasks_para_dataframe(itens, inicio, erros_tasks),
+        key=chave_grade,
+        on_change=acao(grade_editada),
+        args=(chave_grade, inicio, inicio + tamanho_pagina),
+        use_container_width=True,
+        hide_index=True,
+        num_rows="fixed",
+        disabled=['task_num', 'erros'],
+        column_config={
+            'selecionar': st.column_config.CheckboxColumn("✔", width="small"),
+            'task_num': st.column_config.NumberColumn(COLUNAS_GRADE['task_num'], width="small"),
+            'ativo': st.column_config.CheckboxColumn(COLUNAS_GRADE['ativo'], width="small"),
+            'identificador_task': st.column_config.TextColumn(COLUNAS_GRADE['identificador_task'], required=True),
+            'conexao_id': st.column_config.SelectboxColumn(COLUNAS_GRADE['conexao_id'], options=opcoes_conexao),
+            'mini_operador': st.column_config.SelectboxColumn(COLUNAS_GRADE['mini_operador'], options=opcoes_operador),
+            'id_mini_operador': st.column_config.TextColumn(COLUNAS_GRADE['id_mini_operador']),
+            'extra_info': st.column_config.TextColumn(COLUNAS_GRADE['extra_info']),
+            'erros': st.column_config.TextColumn("⚠️ Erros"),
+        },
+    )
+
+    selecionadas = df_editado.index[df_editado['selecionar']].tolist()
+
+    col_acao1, col_acao2, col_acao3, col_acao4, col_acao5, _ = st.columns([1, 1, 1, 1, 1, 1])
+    with col_acao1:
+        st.button("⬇️ Inserir abaixo", disabled=len(selecionadas) == 0, key='grade_inserir',
+                  on_click=acao(inserir_task_abaixo, 'formulario'),
+                  args=(selecionadas[-1] if selecionadas else None,))
+    with col_acao2:
+        st.button("✏️ Editar", disabled=len(selecionadas) != 1, key='grade_editar',
+                  on_click=acao(edit_task, 'formulario'), args=(selecionadas[0] if selecionadas else None,))
+    with col_acao3:
+        st.button("🔼 Subir", disabled=len(selecionadas) == 0, key='grade_subir',
+                  on_click=acao(mover_tasks, 'tasks'), args=(selecionadas, -1))
+    with col_acao4:
+        st.button("🔽 Descer", disabled=len(selecionadas) == 0, key='grade_descer',
+                  on_click=acao(mover_tasks, 'tasks'), args=(selecionadas, +1))
+    with col_acao5:
+        st.button(f"🗑️ Remover ({len(selecionadas)})", disabled=len(selecionadas) == 0, key='grade_remover',
+                  on_click=acao(remover_tasks, 'tasks', 'formulario'), args=(selecionadas,))
+
+
+def exibir_reordenacao_tasks():
+    """Reordenação das tasks arrastando e soltando (requer streamlit-sortables)"""
+    # Importado só quando a reordenação é aberta; sem o pacote, ficam os botões 🔼/🔽
+    try:
+        from streamlit_sortables import sort_items
+    except ImportError:
+        st.info("Instale o pacote `streamlit-sortables` para reordenar arrastando. "
+                "Enquanto isso, use 🔼/🔽 na grade ou na lista detalhada.")
+        return
+
+    tasks = st.session_state.dag_data['tasks']
+    rotulos = {}
+    for posicao, (task_id, task) in enumerate(tasks.itens()):
+        rotulos[f"{posicao} · {task.get('identificador_task', '')}"] = task_id
+
+    nova_ordem = sort_items(list(rotulos), key=f"ordenar_{st.session_state.grade_versao}")
+    st.button("💾 Aplicar nova ordem", key='aplicar_ordem', on_click=acao(reordenar_tasks, 'tasks'),
+              args=([rotulos[rotulo] for rotulo in nova_ordem],))
+
+
+def exibir_lista_detalhada():
+    """Uma linha por task com os botões de ação e os detalhes em um expander"""
+    # CSS para linhas mais compactas
+    st.markdown("""
+    <style>
+    .compact-row {
+        line-height: 1.0 !important;
+        min-height: 20px !important;
+        padding: 1px 0px !important;
+    }
+    .small-text {
+        font-size: 12px !important;
+    }
+    </style>
+    """, unsafe_allow_html=True)
+
+    columns_widths = [1.5, 0.3, 0.3, 1.5, 1.2, 0.8, 2]
+
+    # Cabeçalho
+    cols = st.columns(columns_widths)
+    with cols[0]:
+        st.markdown("**Ações**")
+    with cols[1]:
+        st.markdown("**Nº**")
+    with cols[2]:
+        st.markdown("**Ativo**")
+    with cols[3]:
+        st.markdown("**Identificador**")
+    with cols[4]:
+        st.markdown("**Conexão**")
+    with cols[5]:
+        st.markdown("**Operador**")
+    with cols[6]:
+        st.markdown("**Detalhes**")
+
+    st.divider()
+
+    # Linhas das tasks - ALTURA REDUZIDA
+    tasks = st.session_state.dag_data['tasks']
+    erros_tasks = obter_relatorio_validacao().erros_tasks
+    # Um callback de cada tipo para todas as linhas
+    inserir, editar = acao(inserir_task_abaixo, 'formulario'), acao(edit_task, 'formulario')
+    mover, remover = acao(mover_tasks, 'tasks'), acao(remove_task, 'tasks')
+    for i, (task_id, task) in enumerate(tasks.itens()):
+        # Container compacto para cada linha
+        with st.container():
+            cols = st.columns(columns_widths)
+
+            with cols[0]:
+                # Botões de ação compactos - mesma linha
+                btn_col1, btn_col2, btn_col3, btn_col4, btn_col5 = st.columns(5)
+
+                # Chaves pelo id estável: mudanças em outras linhas não afetam estes botões
+                with btn_col1:
+                    st.button("⬇️", key=f"insert_{task_id}", on_click=inserir, args=(task_id,))
+
+                with btn_col2:
+                    st.button("🔼", key=f"up_{task_id}", disabled=i == 0, on_click=mover, args=([task_id], -1))
+
+                with btn_col3:
+                    st.button("🔽", key=f"down_{task_id}", disabled=i == len(tasks) - 1,
+                              on_click=mover, args=([task_id], +1))
+
+                with btn_col4:
+                    st.button("✏️", key=f"edit_{task_id}", on_click=editar, args=(task_id,))
+
+                with btn_col5:
+                    st.button("🗑️", key=f"delete_{task_id}", on_click=remover, args=(task_id,))
+
+            with cols[1]:
+                st.markdown(f"<div class='compact-row small-text'>**{i}**</div>", unsafe_allow_html=True)
+
+            with cols[2]:
+                st.markdown(f"<div class='compact-row'>✅</div>" if task['ativo'] == 1 else "<div class='compact-row'>❌</div>", unsafe_allow_html=True)
+
+            with cols[3]:
+                st.markdown(f"<div class='compact-row small-text'>`{task['identificador_task']}`</div>", unsafe_allow_html=True)
+                if task_id in erros_tasks:
+                    st.caption("⚠️ " + "; ".join(erros_tasks[task_id]))
+
+            with cols[4]:
+                st.markdown(f"<div class='compact-row small-text'>`{task['conexao_id']}`</div>", unsafe_allow_html=True)
+
+            with cols[5]:
+                st.markdown(f"<div class='compact-row small-text'>`{task['mini_operador']}`</div>", unsafe_allow_html=True)
+
+            with cols[6]:
+                # Expander para detalhes (ID Operador e Extra Info) - APENAS O BOTÃO
+                with st.expander("🔍"):
+                    st.write(f"**ID do Mini Operador:**")
+                    # Converter para string para evitar erro de len()
+                    id_operador = str(task['id_mini_operador'])
+                    st.code(id_operador)
+
+                    extra_info = task.get('extra_info', '')
+                    if extra_info:
+                        st.write(f"**Informações Extras:**")
+                        st.code(extra_info)
+                    else:
+                        st.info("Nenhuma informação extra")
+
+        # Linha divisória sutil entre tasks (exceto para a última)
+        if i < len(tasks) - 1:
+            st.divider()
+
+
+@secao('tabela')
+def exibir_tasks():
+    """Tabela de tasks existentes no modo de visualização escolhido"""
+    # Confirmação da última ação sobre as tasks (gravada pelo callback, que roda antes desta seção)
+    mensagem = st.session_state.pop('mensagem_tasks', None)
+    if mensagem:
+        st.toast(mensagem, icon="✅")
+    st.subheader("📊 Tasks Configuradas")
+
+    if not st.session_state.dag_data['tasks']:
+        st.info("Nenhuma task configurada. Adicione tasks usando o formulário acima.")
+        return
+
+    modo_tabela = st.radio(
+        "Visualização",
+        options=["Grade", "Lista detalhada", "Reordenar"],
+        horizontal=True,
+        key='modo_tabela',
+        help="A grade mantém a página leve mesmo com milhares de tasks"
+    )
+
+    if modo_tabela == "Grade":
+        exibir_grade_tasks()
+    elif modo_tabela == "Reordenar":
+        exibir_reordenacao_tasks()
+    else:
+        exibir_lista_detalhada()
@@ -0,0 +1,249 @@
+"""
+Edição em lote de arquivos de DAG
+
+As operações são declarativas (dicionários lidos de JSON/YAML), por exemplo:
+
+    - operacao: definir_task
+      onde: {conexao_id: rodrigo_trial_snowflake}
+      valores: {conexao_id: snowflake_producao}
+    - operacao: definir_task
+      onde: {mini_operador: [app, verifica_app_d0]}
+      valores: {ativo: 0}
+    - operacao: incrementar_dag
+      campo: quantidade_tentativas
+      valor: 1
+
+Em "onde", um valor em lista significa "qualquer um destes".
+"""
+import difflib
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+
+import yaml
+
+from editor_dag.dag import (ErroEstruturaDag, adicionar_task, carregar_dag, gerar_yaml_dag,
+                            remover_tasks)
+from editor_dag.serializacao import carregar_yaml
+
+EXTENSOES_DAG = ('.yml', '.yaml')
+
+
+class ErroOperacao(ValueError):
+    """Operação de lote inválida"""
+
+
+def _corresponde(dados, onde):
+    for campo, esperado in (onde or {}).items():
+        valor = dados.get(campo)
+        if isinstance(esperado, list):
+            if valor not in esperado:
+                return False
+        elif valor != esperado:
+            return False
+    return True
+
+
+def _definir(dados, valores):
+    alterou = False
+    for campo, valor in valores.items():
+        if dados.get(campo) != valor or campo not in dados:
+            dados[campo] = valor
+            alterou = True
+    return alterou
+
+
+def _op_definir_dag(dag_data, op):
+    if not _corresponde(dag_data['dag'], op.get('onde')):
+        return False
+    return _definir(dag_data['dag'], op['valores'])
+
+
+def _op_incrementar_dag(dag_data, op):
+    if not _corresponde(dag_data['dag'], op.get('onde')):
+        return False
+    campo = op['campo']
+    atual = dag_data['dag'].get(campo, 0)
+    if isinstance(atual, bool) or not isinstance(atual, (int, float)):
+        raise ErroOperacao(f"incrementar_dag: '{campo}' vale {atual!r}, que não é um número")
+    dag_data['dag'][campo] = atual + op.get('valor', 1)
+    return op.get('valor', 1) != 0
+
+
+def _op_definir_task(dag_data, op):
+    alterou = False
+    for task in dag_data['tasks']:
+        if _corresponde(task, op.get('onde')):
+            alterou = _definir(task, op['valores']) or alterou
+    return alterou
+
+
+def _op_remover_task(dag_data, op):
+    posicoes = [i for i, task in enumerate(dag_data['tasks']) if _corresponde(task, op.get('onde'))]
+    if posicoes:
+        remover_tasks(dag_data, posicoes)
+    return bool(posicoes)
+
+
+def _op_adicionar_task(dag_data, op):
+    # Não duplica a task se já existir uma com o mesmo identificador
+    identificador = op['task'].get('identificador_task')
+    if any(task.get('identificador_task') == identificador for task in dag_data['tasks']):
+        return False
+    posicao = None
+    if op.get('apos'):
+        for i, task in enumerate(dag_data['tasks']):
+            if task.get('identificador_task') == op['apos']:
+                posicao = i + 1
+                break
+    adicionar_task(dag_data, dict(op['task']), posicao)
+    return True
+
+
+OPERACOES = {
+    'definir_dag': (_op_definir_dag, ('valores',)),
+    'incrementar_dag': (_op_incrementar_dag, ('campo',)),
+    'definir_task': (_op_definir_task, ('valores',)),
+    'remover_task': (_op_remover_task, ('onde',)),
+    'adicionar_task': (_op_adicionar_task, ('task',)),
+}
+
+
+def validar_operacoes(operacoes):
+    """Confere nome e campos obrigatórios de cada operação antes de tocar nos arquivos"""
+    if not isinstance(operacoes, list):
+        raise ErroOperacao("As operações devem ser uma lista")
+    for i, op in enumerate(operacoes):
+        if not isinstance(op, dict) or op.get('operacao') not in OPERACOES:
+            raise ErroOperacao(f"Operação {i}: informe 'operacao' entre {', '.join(OPERACOES)}")
+        for campo in OPERACOES[op['operacao']][1]:
+            if campo not in op:
+                raise ErroOperacao(f"Operação {i} ({op['operacao']}): campo '{campo}' é obrigatório")
+        if op.get('onde') is not None and not isinstance(op['onde'], dict):
+            raise ErroOperacao(f"Operação {i} ({op['operacao']}): 'onde' deve ser um dicionário {{campo: valor}}")
+        # Um filtro vazio corresponde a todas as tasks
+        if op['operacao'] == 'remover_task' and not op['onde']:
+            raise ErroOperacao(f"Operação {i} (remover_task): informe ao menos um campo em 'onde'")
+        if op['operacao'] == 'incrementar_dag' and not isinstance(op.get('valor', 1), (int, float)):
+            raise ErroOperacao(f"Operação {i} (incrementar_dag): 'valor' deve ser um número")
+    return operacoes
+
+
+def carregar_operacoes(caminho):
+    """Lê a lista de operações de um arquivo JSON ou YAML"""
+    with open(caminho, 'r', encoding='utf-8') as f:
+        return validar_operacoes(carregar_yaml(f.read()))
+
+
+def aplicar_operacoes(dag_data, operacoes):
+    """Aplica as operações na DAG em memória e indica se algo mudou"""
+    alterou = False
+    for op in operacoes:
+        funcao = OPERACOES[op['operacao']][0]
+        alterou = funcao(dag_data, op) or alterou
+    return alterou
+
+
+def permissoes_arquivo_novo():
+    """Modo de um arquivo novo criado com open(): 0o666 menos a umask do processo"""
+    try:
+        # Ler a umask com os.umask() a troca por um instante para todas as threads do processo
+        with open('/proc/self/status', encoding='ascii') as f:
+            for linha in f:
+                if linha.startswith('Umask:'):
+                    return 0o666 & ~int(linha.split()[1], 8)
+    except (OSError, ValueError):
+        pass
+    mascara = os.umask(0)
+    os.umask(mascara)
+    return 0o666 & ~mascara
+
+
+def escrever_atomico(caminho, conteudo, modo=None):
+    """
+    Grava o arquivo (texto ou bytes) via arquivo temporário + os.replace, sem deixar arquivos pela metade
+    Mantém as permissões do arquivo existente; um arquivo novo fica com `modo` ou, sem ele, com
+    as permissões usuais de um arquivo novo (mkstemp cria com 0o600)
+    """
+    diretorio = os.path.dirname(os.path.abspath(caminho))
+    fd, temporario = tempfile.mkstemp(prefix='.tmp_', suffix='.yml', dir=diretorio)
+    try:
+        if isinstance(conteudo, bytes):
+            f = os.fdopen(fd, 'wb')
+        else:
+            f = os.fdopen(fd, 'w', encoding='utf-8', newline='')
+        with f:
+            f.write(conteudo)
+        if os.path.exists(caminho):
+            os.chmod(temporario, os.stat(caminho).st_mode & 0o7777)
+        else:
+            os.chmod(temporario, permissoes_arquivo_novo() if modo is None else modo)
+        os.replace(temporario, caminho)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+
+
+@dataclass
+class ResultadoArquivo:
+    caminho: str
+    status: str  # 'alterado', 'inalterado' ou 'erro'
+    diff: str = ''
+    erro: Optional[str] = None
+
+
+def processar_arquivo(caminho, operacoes, simular=False):
+    """Carrega, aplica as operações e grava o arquivo somente se ele mudou"""
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            original = f.read()
+        dag_data = carregar_dag(original)
+        dag_data['tasks'] = dag_data['tasks'] or []
+        if not aplicar_operacoes(dag_data, operacoes):
+            return ResultadoArquivo(caminho, 'inalterado')
+
+        novo = gerar_yaml_dag(dag_data)
+        if novo == original:
+            return ResultadoArquivo(caminho, 'inalterado')
+
+        diff = ''.join(difflib.unified_diff(
+            original.splitlines(keepends=True), novo.splitlines(keepends=True),
+            fromfile=caminho, tofile=caminho
+        ))
+        if not simular:
+            escrever_atomico(caminho, novo)
+        return ResultadoArquivo(caminho, 'alterado', diff)
+    except (yaml.YAMLError, ErroEstruturaDag, ErroOperacao, OSError, UnicodeDecodeError) as e:
+        return ResultadoArquivo(caminho, 'erro', erro=str(e))
+    except (TypeError, ValueError, KeyError, AttributeError) as e:
+        # Conteúdo que a operação não esperava: vira erro só deste arquivo, o lote continua
+        return ResultadoArquivo(caminho, 'erro', erro=f"Erro ao aplicar as operações: {e}")
+
+
+def listar_arquivos_dag(diretorio):
+    """Lista recursivamente os arquivos .yml/.yaml do diretório, em ordem estável"""
+    encontrados = []
+    for raiz, pastas, arquivos in os.walk(diretorio):
+        pastas[:] = sorted(p for p in pastas if not p.startswith('.'))
+        for nome in sorted(arquivos):
+            if nome.lower().endswith(EXTENSOES_DAG):
+                encontrados.append(os.path.join(raiz, nome))
+    return encontrados
+
+
+def _processar_args(args):
+    return processar_arquivo(*args)
+
+
+def processar_diretorio(diretorio, operacoes, simular=False, processos=None):
+    """Aplica as operações em todos os arquivos de DAG do diretório usando um pool de processos"""
+    validar_operacoes(operacoes)
+    arquivos = listar_arquivos_dag(diretorio)
+    tarefas = [(caminho, operacoes, simular) for caminho in arquivos]
+    if processos == 1 or len(tarefas) < 2:
+        return [_processar_args(t) for t in tarefas]
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        return list(executor.map(_processar_args, tarefas, chunksize=max(1, len(tarefas) // 64)))
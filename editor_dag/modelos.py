@@ -0,0 +1,265 @@
+"""
+Modelos de DAG com marcadores e geração de DAGs em massa a partir de uma matriz
+
+Um modelo é uma DAG salva no diretório de modelos (modelos_dag do config.json)
+com marcadores {{nome}} nos textos do cabeçalho e das tasks, por exemplo:
+
+    dag:
+      descricao: Recarga de {{app}} ({{unidade}})
+      agendamento_cron: 0 3 * * *
+    tasks:
+    - identificador_task: recarga_{{app}}_{{unidade}}
+      id_mini_operador: '{{id_app}}'
+
+A matriz dá os valores de cada dimensão e cada combinação (produto cartesiano
+das dimensões, na ordem da matriz) gera uma DAG. Uma dimensão com valores
+simples preenche o marcador de mesmo nome; uma dimensão com dicionários
+preenche marcadores ligados entre si:
+
+    unidade: [sp, rj, mg]
+    app:
+    - {app: vendas, id_app: 2f1c...}
+    - {app: estoque, id_app: 9a7e...}
+    deslocamento_cron: [0, 15, 30]
+
+deslocamento_cron (em minutos) desloca o agendamento_cron de cada DAG, da
+mesma forma que as sugestões de horário da carga do agendamento.
+
+Um texto que é só um marcador recebe o valor da matriz com o tipo original
+(ativo: '{{ativo}}' com 0 vira o inteiro 0); dentro de um texto maior o valor
+é convertido em texto.
+
+Cada DAG é uma cópia profunda do modelo montada já com os marcadores
+substituídos: dicionários e listas são sempre novos, então nenhuma DAG
+compartilha objetos mutáveis com o modelo ou com as demais. As DAGs são
+geradas uma por vez e o YAML de cada uma é escrito direto na sua entrada do
+zip (escrever_zip), sem montar os textos de todas em memória.
+"""
+import copy
+import io
+import itertools
+import math
+import os
+import re
+import time
+import zipfile
+from collections import Counter
+
+from editor_dag.cron import ErroCron, deslocar_cron
+from editor_dag.dag import carregar_dag_arquivo, dag_para_dict, gerar_yaml_dag, renumerar_tasks, validar_estrutura
+
+MARCADOR = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+DESLOCAMENTO_CRON = 'deslocamento_cron'
+EXTENSAO_MODELO = '.yml'
+
+_NOME_MODELO = re.compile(r"^[\w\-]+$")
+_CARACTERES_ARQUIVO = re.compile(r"[^\w\-.]+")
+
+
+class ErroModelo(ValueError):
+    """Modelo, matriz ou padrão de nome inválidos"""
+
+
+def marcadores(dados):
+    """Nomes dos marcadores {{nome}} usados nos valores de texto"""
+    encontrados = set()
+    pendentes = [dados]
+    while pendentes:
+        item = pendentes.pop()
+        if isinstance(item, str):
+            if '{{' in item:
+                encontrados.update(MARCADOR.findall(item))
+        elif isinstance(item, dict):
+            pendentes.extend(item.values())
+        elif isinstance(item, list):
+            pendentes.extend(item)
+    return encontrados
+
+
+def _substituir_texto(texto, valores):
+    if '{{' not in texto:
+        return texto
+    inteiro = MARCADOR.fullmatch(texto)
+    if inteiro:
+        return copy.deepcopy(valores[inteiro.group(1)])
+    return MARCADOR.sub(lambda m: str(valores[m.group(1)]), texto)
+
+
+def substituir(dados, valores):
+    """Cópia profunda dos dados com os marcadores trocados pelos valores"""
+    if isinstance(dados, str):
+        return _substituir_texto(dados, valores)
+    if isinstance(dados, dict):
+        return {chave: substituir(valor, valores) for chave, valor in dados.items()}
+    if isinstance(dados, list):
+        return [substituir(item, valores) for item in dados]
+    # Números, datas, booleanos e None são imutáveis
+    return dados
+
+
+def _dimensoes(matriz):
+    """Valores de cada dimensão, já como dicionários {marcador: valor}"""
+    if not isinstance(matriz, dict) or not matriz:
+        raise ErroModelo("A matriz deve ser um dicionário {dimensão: [valores]}")
+    dimensoes = []
+    for nome, valores in matriz.items():
+        if not isinstance(valores, list):
+            valores = [valores]
+        if not valores:
+            raise ErroModelo(f"A dimensão '{nome}' não tem valores")
+        dimensoes.append([
+            {str(chave): v for chave, v in valor.items()} if isinstance(valor, dict) else {str(nome): valor}
+            for valor in valores
+        ])
+    return dimensoes
+
+
+def _fornecidos(dimensoes):
+    """Marcadores preenchidos em todas as combinações"""
+    return set().union(*(set.intersection(*(set(valor) for valor in dimensao)) for dimensao in dimensoes))
+
+
+def contar_combinacoes(matriz):
+    """Quantidade de DAGs que a matriz gera"""
+    return math.prod(len(dimensao) for dimensao in _dimensoes(matriz))
+
+
+def expandir_matriz(matriz):
+    """Gera os valores ({marcador: valor}) de cada combinação, na ordem da matriz"""
+    for partes in itertools.product(*_dimensoes(matriz)):
+        valores = {}
+        for parte in partes:
+            valores.update(parte)
+        yield valores
+
+
+def padrao_nome_padrao(matriz):
+    """'dag_{{a}}_{{b}}.yml' com o primeiro marcador de cada dimensão"""
+    primeiros = [next(iter(dimensao[0])) for dimensao in _dimensoes(matriz)]
+    return 'dag_' + '_'.join(f"{{{{{nome}}}}}" for nome in primeiros) + '.yml'
+
+
+def nome_arquivo(padrao, valores):
+    """Nome do arquivo de uma combinação, com os valores reduzidos a caracteres seguros"""
+    nome = MARCADOR.sub(lambda m: _CARACTERES_ARQUIVO.sub('_', str(valores[m.group(1)])).strip('_'), padrao)
+    return nome if nome.lower().endswith(('.yml', '.yaml')) else nome + '.yml'
+
+
+def _montar_dag(modelo, valores, cron):
+    dag_data = substituir(modelo, valores)
+    dag_data['tasks'] = dag_data['tasks'] or []
+    renumerar_tasks(dag_data['tasks'])
+    if valores.get(DESLOCAMENTO_CRON):
+        dag_data['dag']['agendamento_cron'] = cron
+    return dag_data
+
+
+def _crons_deslocados(modelo, combinacoes, nomes):
+    """
+    agendamento_cron deslocado de cada combinação (None sem deslocamento), calculado
+    antes de gerar as DAGs para que um cron inválido não deixe um zip pela metade
+    """
+    crons, erros = [], []
+    cron_modelo = modelo['dag'].get('agendamento_cron')
+    for valores, nome in zip(combinacoes, nomes):
+        deslocamento = valores.get(DESLOCAMENTO_CRON)
+        if not deslocamento:
+            crons.append(None)
+            continue
+        try:
+            crons.append(deslocar_cron(substituir(cron_modelo, valores), deslocamento))
+        except ErroCron as e:
+            crons.append(None)
+            erros.append(f"{nome} ({e})")
+    if erros:
+        raise ErroModelo("agendamento_cron inválido para o deslocamento: " + '; '.join(erros[:5])
+                         + (f" e mais {len(erros) - 5}" if len(erros) > 5 else ""))
+    return crons
+
+
+def _gerar(modelo, combinacoes, nomes, crons):
+    for valores, nome, cron in zip(combinacoes, nomes, crons):
+        yield nome, _montar_dag(modelo, valores, cron)
+
+
+def gerar_dags(modelo, matriz, padrao_nome=None):
+    """
+    Confere modelo, matriz e padrão de nome e retorna um gerador de (nome do arquivo, DAG)
+    Marcadores sem valor, nomes de arquivo repetidos e crons que não podem ser deslocados
+    são apontados antes de gerar qualquer DAG
+    """
+    modelo = dag_para_dict(validar_estrutura(modelo))
+    dimensoes = _dimensoes(matriz)
+    fornecidos = _fornecidos(dimensoes)
+    padrao_nome = padrao_nome or padrao_nome_padrao(matriz)
+
+    faltando = (marcadores(modelo) | set(MARCADOR.findall(padrao_nome))) - fornecidos
+    if faltando:
+        raise ErroModelo(f"Marcadores sem valor na matriz: {', '.join(sorted(faltando))}")
+
+    combinacoes = list(expandir_matriz(matriz))
+    if DESLOCAMENTO_CRON in fornecidos:
+        for valores in combinacoes:
+            try:
+                valores[DESLOCAMENTO_CRON] = int(valores[DESLOCAMENTO_CRON] or 0)
+            except (TypeError, ValueError):
+                raise ErroModelo(f"{DESLOCAMENTO_CRON} deve ser um número de minutos, "
+                                 f"recebido '{valores[DESLOCAMENTO_CRON]}'")
+
+    nomes = [nome_arquivo(padrao_nome, valores) for valores in combinacoes]
+    repetidos = sorted(nome for nome, quantidade in Counter(nomes).items() if quantidade > 1)
+    if repetidos:
+        raise ErroModelo(f"O padrão de nome '{padrao_nome}' gera arquivos repetidos: {', '.join(repetidos[:5])}"
+                         + (f" e mais {len(repetidos) - 5}" if len(repetidos) > 5 else ""))
+    return _gerar(modelo, combinacoes, nomes, _crons_deslocados(modelo, combinacoes, nomes))
+
+
+def escrever_zip(dags, destino):
+    """
+    Grava cada (nome, DAG) como uma entrada do zip (destino: caminho ou arquivo binário)
+    O YAML é escrito direto na entrada comprimida; retorna a quantidade de DAGs gravadas
+    """
+    quantidade = 0
+    data_hora = time.localtime()[:6]
+    with zipfile.ZipFile(destino, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+        for nome, dag_data in dags:
+            info = zipfile.ZipInfo(nome, date_time=data_hora)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with io.TextIOWrapper(zf.open(info, 'w'), encoding='utf-8', newline='') as entrada:
+                gerar_yaml_dag(dag_data, entrada)
+            quantidade += 1
+    return quantidade
+
+
+class RegistroModelos:
+    """Modelos salvos como arquivos .yml em um diretório (criado ao salvar o primeiro)"""
+
+    def __init__(self, diretorio):
+        self.diretorio = os.path.abspath(diretorio)
+
+    def caminho(self, nome):
+        if not _NOME_MODELO.match(nome or ''):
+            raise ErroModelo("Use só letras, números, '_' e '-' no nome do modelo")
+        return os.path.join(self.diretorio, nome + EXTENSAO_MODELO)
+
+    def listar(self):
+        """Nomes dos modelos salvos, em ordem alfabética"""
+        try:
+            arquivos = os.listdir(self.diretorio)
+        except FileNotFoundError:
+            return []
+        return sorted(arquivo[:-len(EXTENSAO_MODELO)] for arquivo in arquivos
+                      if arquivo.endswith(EXTENSAO_MODELO) and _NOME_MODELO.match(arquivo[:-len(EXTENSAO_MODELO)]))
+
+    def carregar(self, nome):
+        """DAG do modelo (lança ErroEstruturaDag/yaml.YAMLError se o arquivo for inválido)"""
+        return carregar_dag_arquivo(self.caminho(nome))
+
+    def salvar(self, nome, dag_data):
+        """Grava a DAG (ListaTasks ou lista de tasks) como modelo, substituindo o anterior de mesmo nome"""
+        from editor_dag.lote import escrever_atomico
+
+        caminho = self.caminho(nome)
+        os.makedirs(self.diretorio, exist_ok=True)
+        escrever_atomico(caminho, gerar_yaml_dag(dag_data))
+        return caminho
@@ -0,0 +1,212 @@
+"""
+Descarga em disco do estado das sessões ociosas
+
+Cada aba aberta do editor mantém na memória do servidor a DAG em edição, as
+demais DAGs carregadas e os históricos de desfazer. O DepositoSessoes registra
+a última atividade de cada sessão; uma varredura periódica grava em disco (um
+pickle por sessão) as chaves pesadas das sessões paradas há mais de
+EDITOR_DAG_OCIOSO_MINUTOS (padrão: 15; 0 desativa) e as remove do estado da
+sessão. Na próxima interação, tocar() devolve as chaves à sessão antes de o
+script usá-las, e o arquivo é apagado.
+
+Os caches derivados da DAG (validação, grafo, YAML) não são gravados: são
+removidos junto e recalculados quando a sessão volta.
+
+O estado de uma sessão é qualquer objeto com `in`, [] e del por chave (no
+editor, o session_state da sessão). Os arquivos ficam em
+EDITOR_DAG_OCIOSO_DIR (padrão: ~/.cache/editor_dag/sessoes, ou no
+XDG_CACHE_HOME) e são apagados quando a sessão é retomada ou encerrada. Como
+eles são lidos com pickle, o diretório precisa ser do usuário do servidor e
+fechado aos demais (0o700): um diretório de outro dono, com permissões abertas
+ou que seja um link é recusado (diretorio_privado) e a sessão fica na memória.
+"""
+import os
+import pickle
+import stat
+import threading
+import time
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+# Cache do usuário do servidor: arquivos lidos com pickle não podem ficar em diretórios compartilhados
+DIRETORIO_CACHE = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.expanduser(os.path.join('~', '.cache')),
+                               'editor_dag')
+
+MINUTOS_PADRAO = float(os.environ.get('EDITOR_DAG_OCIOSO_MINUTOS', 15))
+DIRETORIO_PADRAO = os.environ.get('EDITOR_DAG_OCIOSO_DIR') or os.path.join(DIRETORIO_CACHE, 'sessoes')
+
+
+class DiretorioInseguro(OSError):
+    """Diretório de arquivos do editor que outros usuários podem alterar"""
+
+
+def diretorio_privado(diretorio):
+    """
+    Cria o diretório (0o700) ou confere que o existente é um diretório do usuário atual
+    fechado aos demais; lança DiretorioInseguro se não for
+    """
+    os.makedirs(diretorio, mode=0o700, exist_ok=True)
+    if os.name != 'posix':
+        return diretorio
+    estado = os.lstat(diretorio)
+    if not stat.S_ISDIR(estado.st_mode):
+        raise DiretorioInseguro(f"{diretorio} não é um diretório (link simbólico?)")
+    if estado.st_uid != os.getuid():
+        raise DiretorioInseguro(f"{diretorio} pertence a outro usuário (uid {estado.st_uid})")
+    if estado.st_mode & 0o077:
+        raise DiretorioInseguro(f"{diretorio} tem permissões {stat.filemode(estado.st_mode)}; use chmod 700")
+    return diretorio
+
+
+@dataclass
+class _Sessao:
+    estado: Any
+    ultima_atividade: float
+    arquivo: Optional[str] = None
+    # A última tentativa de descarga falhou; só tenta de novo depois de nova atividade
+    falhou: bool = False
+    # Gravar uma sessão grande não bloqueia a atividade das demais
+    trava: Any = field(default_factory=threading.Lock)
+
+
+def _para_pickle(valor):
+    # WeakKeyDictionary não é serializável; as chaves continuam sendo os mesmos
+    # objetos do restante do pickle, então o dicionário comum preserva a ligação
+    if isinstance(valor, weakref.WeakKeyDictionary):
+        return ('fraco', dict(valor))
+    return ('valor', valor)
+
+
+def _de_pickle(tipo, valor):
+    return weakref.WeakKeyDictionary(valor) if tipo == 'fraco' else valor
+
+
+class DepositoSessoes:
+    """Registro de atividade das sessões e descarga/retomada das sessões ociosas"""
+
+    def __init__(self, chaves, derivadas=(), minutos=MINUTOS_PADRAO, diretorio=DIRETORIO_PADRAO,
+                 sessao_ativa=None, relogio=time.monotonic):
+        self.chaves = tuple(chaves)
+        self.derivadas = tuple(derivadas)
+        self.limite_segundos = minutos * 60
+        self.diretorio = diretorio
+        # Função sessao_id -> bool; sessões encerradas saem do registro na varredura
+        self._sessao_ativa = sessao_ativa or (lambda sessao_id: True)
+        self._relogio = relogio
+        self._sessoes = {}
+        self._trava = threading.Lock()
+        self._varredura = None
+
+    @property
+    def ativo(self):
+        return self.limite_segundos > 0
+
+    def _caminho(self, sessao_id):
+        nome = ''.join(c for c in str(sessao_id) if c.isalnum() or c in '-_')
+        return os.path.join(self.diretorio, f"{nome}.pickle")
+
+    def tocar(self, sessao_id, estado):
+        """
+        Registra atividade da sessão e, se ela estava em disco, devolve as chaves ao estado
+        Retorna True quando a sessão foi retomada do disco e False se o arquivo não pôde ser lido
+        """
+        if not self.ativo:
+            return None
+        with self._trava:
+            self.iniciar_varredura()
+            sessao = self._sessoes.get(sessao_id)
+            if sessao is None:
+                self._sessoes[sessao_id] = _Sessao(estado, self._relogio())
+                return None
+        with sessao.trava:
+            sessao.estado = estado
+            sessao.ultima_atividade = self._relogio()
+            sessao.falhou = False
+            if sessao.arquivo is None:
+                return None
+            arquivo, sessao.arquivo = sessao.arquivo, None
+            return self._retomar(arquivo, estado)
+
+    def _retomar(self, arquivo, estado):
+        try:
+            diretorio_privado(self.diretorio)
+            with open(arquivo, 'rb') as f:
+                valores = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return False
+        finally:
+            self._apagar(arquivo)
+        for chave, (tipo, valor) in valores.items():
+            if chave not in estado:
+                estado[chave] = _de_pickle(tipo, valor)
+        return True
+
+    def descarregar_ociosas(self):
+        """Grava em disco as sessões paradas além do limite; devolve quantas foram descarregadas"""
+        descarregadas = 0
+        with self._trava:
+            sessoes = list(self._sessoes.items())
+        for sessao_id, sessao in sessoes:
+            with sessao.trava:
+                if not self._sessao_ativa(sessao_id):
+                    if sessao.arquivo:
+                        self._apagar(sessao.arquivo)
+                    with self._trava:
+                        self._sessoes.pop(sessao_id, None)
+                elif (sessao.arquivo is None and not sessao.falhou
+                      and self._relogio() - sessao.ultima_atividade >= self.limite_segundos):
+                    descarregadas += self._descarregar(sessao_id, sessao)
+        return descarregadas
+
+    def _descarregar(self, sessao_id, sessao):
+        estado = sessao.estado
+        valores = {chave: _para_pickle(estado[chave]) for chave in self.chaves if chave in estado}
+        if not any(valor for _, valor in valores.values()):
+            # Nada pesado para liberar (nenhuma DAG aberta)
+            return 0
+
+        arquivo = self._caminho(sessao_id)
+        temporario = f"{arquivo}.tmp"
+        try:
+            diretorio_privado(self.diretorio)
+            descritor = os.open(temporario, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(descritor, 'wb') as f:
+                pickle.dump(valores, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporario, arquivo)
+        except (OSError, pickle.PicklingError, TypeError, AttributeError):
+            self._apagar(temporario)
+            sessao.falhou = True
+            return 0
+
+        for chave in (*valores, *self.derivadas):
+            if chave in estado:
+                del estado[chave]
+        sessao.arquivo = arquivo
+        return 1
+
+    @staticmethod
+    def _apagar(arquivo):
+        try:
+            os.remove(arquivo)
+        except OSError:
+            pass
+
+    def iniciar_varredura(self, intervalo=None):
+        """Inicia (uma vez) a thread que descarrega as sessões ociosas periodicamente"""
+        if self._varredura is not None or not self.ativo:
+            return
+        intervalo = intervalo or min(60.0, self.limite_segundos / 2)
+        parar = threading.Event()
+
+        def varrer():
+            while not parar.wait(intervalo):
+                self.descarregar_ociosas()
+
+        self._varredura = parar
+        threading.Thread(target=varrer, name='editor_dag_ociosidade', daemon=True).start()
+
+    def parar_varredura(self):
+        if self._varredura is not None:
+            self._varredura.set()
+            self._varredura = None
@@ -0,0 +1,362 @@
+"""
+Lista de tasks com identidades estáveis
+
+Cada task recebe um id interno que não muda quando outras tasks são inseridas,
+removidas ou movidas. A ordem é mantida em uma lista duplamente encadeada
+(dicionários id -> anterior/próximo), então inserir, remover e mover uma task
+custa O(1). O task_num só é calculado na serialização (para_lista).
+
+As tasks guardadas são tratadas como valores: para alterar uma task use
+substituir() com um novo dicionário em vez de modificá-la no lugar. Os
+dicionários recebidos são guardados como TaskCompacta (somente leitura, ver
+editor_dag.task_compacta) e só voltam a ser dicionários em para_lista().
+
+Com iniciar_registro()/encerrar_registro() a lista devolve apenas as entradas
+internas alteradas (valores antes e depois), o que permite desfazer uma
+operação guardando só o que ela tocou (ver editor_dag.historico).
+"""
+from editor_dag.task_compacta import compactar
+
+
+class _Ausente:
+    # Gravado no pickle como referência ao módulo: continua sendo o mesmo objeto ao ler
+    def __reduce__(self):
+        return '_AUSENTE'
+
+
+# Marca, no registro de alterações, uma entrada que não existia
+_AUSENTE = _Ausente()
+
+
+class ListaTasks:
+    """Sequência ordenada de tasks indexada por ids estáveis"""
+
+    def __init__(self, tasks=()):
+        self._tasks = {}
+        self._anterior = {}
+        self._proximo = {}
+        self._primeiro = None
+        self._ultimo = None
+        self._proximo_id = 1
+        self._ordem = ()
+        self._posicoes = {}
+        self._ordem_valida = True
+        self._registro = None
+        # Incrementada a cada alteração; usada como chave de caches externos
+        self.versao = 0
+        for task in tasks:
+            self.anexar(task)
+
+    # Consulta
+
+    def __len__(self):
+        return len(self._tasks)
+
+    def __bool__(self):
+        return bool(self._tasks)
+
+    def __contains__(self, task_id):
+        return task_id in self._tasks
+
+    def __iter__(self):
+        """Percorre as tasks em ordem"""
+        tasks = self._tasks
+        return (tasks[task_id] for task_id in self.ids())
+
+    def __getitem__(self, posicao):
+        """Task pela posição (aceita fatias)"""
+        ids = self.ids()
+        if isinstance(posicao, slice):
+            return [self._tasks[task_id] for task_id in ids[posicao]]
+        return self._tasks[ids[posicao]]
+
+    def ids(self):
+        """Tupla com os ids na ordem atual (recalculada só depois de mudanças estruturais)"""
+        if not self._ordem_valida:
+            ordem = []
+            atual = self._primeiro
+            proximo = self._proximo
+            while atual is not None:
+                ordem.append(atual)
+                atual = proximo[atual]
+            self._ordem = tuple(ordem)
+            self._posicoes = {}
+            self._ordem_valida = True
+        return self._ordem
+
+    def itens(self, inicio=0, fim=None):
+        """Pares (id, task) do intervalo de posições informado"""
+        tasks = self._tasks
+        return [(task_id, tasks[task_id]) for task_id in self.ids()[inicio:fim]]
+
+    def task(self, task_id):
+        return self._tasks[task_id]
+
+    def posicao(self, task_id):
+        """Posição atual da task (índice montado uma vez por versão da ordem)"""
+        ids = self.ids()
+        if not self._posicoes and ids:
+            self._posicoes = {tid: i for i, tid in enumerate(ids)}
+        return self._posicoes[task_id]
+
+    def id_na_posicao(self, posicao):
+        return self.ids()[posicao]
+
+    def anterior(self, task_id):
+        return self._anterior[task_id]
+
+    def proximo(self, task_id):
+        return self._proximo[task_id]
+
+    @property
+    def proximo_id(self):
+        """Id que a próxima task inserida vai receber"""
+        return self._proximo_id
+
+    # Alteração
+
+    def reservar_ids(self, proximo_id):
+        """Garante que os novos ids comecem em proximo_id (ao reaplicar alterações gravadas com restaurar())"""
+        self._proximo_id = max(self._proximo_id, proximo_id)
+
+    def _novo_id(self):
+        task_id = self._proximo_id
+        self._proximo_id += 1
+        return task_id
+
+    def _alterou(self, estrutura=True):
+        self.versao += 1
+        if estrutura:
+            self._ordem_valida = False
+
+    def _anotar(self, tipo, chave=None):
+        """Guarda o valor atual da entrada antes da primeira alteração dentro do registro"""
+        if self._registro is not None and (tipo, chave) not in self._registro:
+            self._registro[(tipo, chave)] = self._ler(tipo, chave)
+
+    def _ler(self, tipo, chave):
+        if tipo == 'primeiro':
+            return self._primeiro
+        if tipo == 'ultimo':
+            return self._ultimo
+        return self._mapas()[tipo].get(chave, _AUSENTE)
+
+    def _mapas(self):
+        return {'task': self._tasks, 'anterior': self._anterior, 'proximo': self._proximo}
+
+    def _desligar(self, task_id):
+        self._anotar('anterior', task_id)
+        self._anotar('proximo', task_id)
+        anterior = self._anterior.pop(task_id)
+        proximo = self._proximo.pop(task_id)
+        if anterior is None:
+            self._anotar('primeiro')
+            self._primeiro = proximo
+        else:
+            self._anotar('proximo', anterior)
+            self._proximo[anterior] = proximo
+        if proximo is None:
+            self._anotar('ultimo')
+            self._ultimo = anterior
+        else:
+            self._anotar('anterior', proximo)
+            self._anterior[proximo] = anterior
+
+    def _ligar_apos(self, task_id, referencia):
+        """Encadeia task_id logo após a referência (None = no início)"""
+        if referencia is None:
+            self._anotar('primeiro')
+            proximo = self._primeiro
+            self._primeiro = task_id
+        else:
+            self._anotar('proximo', referencia)
+            proximo = self._proximo[referencia]
+            self._proximo[referencia] = task_id
+        self._anotar('anterior', task_id)
+        self._anotar('proximo', task_id)
+        self._anterior[task_id] = referencia
+        self._proximo[task_id] = proximo
+        if proximo is None:
+            self._anotar('ultimo')
+            self._ultimo = task_id
+        else:
+            self._anotar('anterior', proximo)
+            self._anterior[proximo] = task_id
+
+    def inserir_apos(self, referencia, task):
+        """Insere a task após a task de referência (None = no início) e devolve o novo id"""
+        if referencia is not None and referencia not in self._tasks:
+            raise KeyError(referencia)
+        task_id = self._novo_id()
+        self._anotar('task', task_id)
+        self._tasks[task_id] = compactar(task)
+        self._ligar_apos(task_id, referencia)
+        self._alterou()
+        return task_id
+
+    def anexar(self, task):
+        """Adiciona a task no final e devolve o novo id"""
+        return self.inserir_apos(self._ultimo, task)
+
+    def anexar_varias(self, tasks):
+        """Adiciona várias tasks no final em uma única alteração"""
+        return self.inserir_varias_apos(self._ultimo, tasks)
+
+    def inserir_varias_apos(self, referencia, tasks):
+        """Insere várias tasks, na ordem, após a referência (None = no início) em uma única alteração"""
+        if referencia is not None and referencia not in self._tasks:
+            raise KeyError(referencia)
+        ids = []
+        for task in tasks:
+            task_id = self._novo_id()
+            self._anotar('task', task_id)
+            self._tasks[task_id] = compactar(task)
+            self._ligar_apos(task_id, referencia)
+            referencia = task_id
+            ids.append(task_id)
+        if ids:
+            self._alterou()
+        return ids
+
+    def substituir(self, task_id, task):
+        """Troca o conteúdo da task mantendo id e posição"""
+        if task_id not in self._tasks:
+            raise KeyError(task_id)
+        self._anotar('task', task_id)
+        self._tasks[task_id] = compactar(task)
+        self._alterou(estrutura=False)
+
+    def remover(self, task_id):
+        self._desligar(task_id)
+        self._anotar('task', task_id)
+        del self._tasks[task_id]
+        self._alterou()
+
+    def remover_varios(self, task_ids):
+        """Remove várias tasks em uma passada (custo proporcional à quantidade removida)"""
+        removidos = 0
+        for task_id in set(task_ids):
+            if task_id in self._tasks:
+                self._desligar(task_id)
+                self._anotar('task', task_id)
+                del self._tasks[task_id]
+                removidos += 1
+        if removidos:
+            self._alterou()
+        return removidos
+
+    def mover_para(self, task_id, referencia):
+        """Move a task para logo após a referência (None = para o início)"""
+        if task_id == referencia:
+            return
+        if referencia is not None and referencia not in self._tasks:
+            raise KeyError(referencia)
+        self._desligar(task_id)
+        self._ligar_apos(task_id, referencia)
+        self._alterou()
+
+    def mover_acima(self, task_id):
+        """Troca a task de lugar com a anterior; devolve False se já é a primeira"""
+        anterior = self._anterior[task_id]
+        if anterior is None:
+            return False
+        self.mover_para(task_id, self._anterior[anterior])
+        return True
+
+    def mover_abaixo(self, task_id):
+        """Troca a task de lugar com a seguinte; devolve False se já é a última"""
+        proximo = self._proximo[task_id]
+        if proximo is None:
+            return False
+        self.mover_para(task_id, proximo)
+        return True
+
+    def mover_varios(self, task_ids, deslocamento):
+        """
+        Move um conjunto de tasks uma posição acima (-1) ou abaixo (+1) em uma passada,
+        mantendo a ordem relativa entre elas
+        """
+        selecionados = set(task_ids)
+        ordem = [tid for tid in self.ids() if tid in selecionados]
+        if deslocamento > 0:
+            ordem.reverse()
+        bloqueado = None
+        movidos = 0
+        for task_id in ordem:
+            vizinho = self._anterior[task_id] if deslocamento < 0 else self._proximo[task_id]
+            # Uma task encostada em outra selecionada que não pôde se mover também fica parada
+            if vizinho is None or vizinho == bloqueado:
+                bloqueado = task_id
+                continue
+            if deslocamento < 0:
+                self.mover_para(task_id, self._anterior[vizinho])
+            else:
+                self.mover_para(task_id, vizinho)
+            movidos += 1
+        return movidos
+
+    def reordenar(self, task_ids):
+        """Aplica uma nova ordem completa (por exemplo, vinda de arrastar e soltar)"""
+        task_ids = list(task_ids)
+        if len(task_ids) != len(self._tasks) or set(task_ids) != self._tasks.keys():
+            raise ValueError("A nova ordem deve conter exatamente as mesmas tasks")
+        if self._registro is not None:
+            for task_id in task_ids:
+                self._anotar('anterior', task_id)
+                self._anotar('proximo', task_id)
+            self._anotar('primeiro')
+            self._anotar('ultimo')
+        self._anterior.clear()
+        self._proximo.clear()
+        self._primeiro = self._ultimo = None
+        for task_id in task_ids:
+            self._ligar_apos(task_id, self._ultimo)
+        self._alterou()
+
+    # Registro de alterações
+
+    def iniciar_registro(self):
+        """Passa a anotar o valor anterior de cada entrada interna alterada"""
+        if self._registro is not None:
+            raise RuntimeError("Já existe um registro de alterações em andamento")
+        self._registro = {}
+
+    def encerrar_registro(self):
+        """
+        Encerra o registro e devolve (antes, depois) apenas com as entradas que mudaram
+        Os dois dicionários podem ser passados para restaurar() para desfazer/refazer
+        """
+        registro, self._registro = self._registro, None
+        antes, depois = {}, {}
+        for (tipo, chave), valor in (registro or {}).items():
+            atual = self._ler(tipo, chave)
+            if atual is not valor and atual != valor:
+                antes[(tipo, chave)] = valor
+                depois[(tipo, chave)] = atual
+        return antes, depois
+
+    def restaurar(self, valores):
+        """Reaplica entradas internas devolvidas por encerrar_registro()"""
+        mapas = self._mapas()
+        for (tipo, chave), valor in valores.items():
+            if tipo == 'primeiro':
+                self._primeiro = valor
+            elif tipo == 'ultimo':
+                self._ultimo = valor
+            elif valor is _AUSENTE:
+                mapas[tipo].pop(chave, None)
+            else:
+                mapas[tipo][chave] = valor
+        if valores:
+            self._alterou()
+
+    # Serialização
+
+    def para_lista(self):
+        """Lista de dicionários com o task_num atribuído pela posição"""
+        lista = []
+        for i, task in enumerate(self):
+            task = task.para_dict() if hasattr(task, 'para_dict') else dict(task)
+            task['task_num'] = i
+            lista.append(task)
+        return lista
@@ -0,0 +1,95 @@
+"""
+Medição opcional do tempo de cada seção de uma execução (rerun) do Streamlit
+
+Ativada pela variável de ambiente EDITOR_DAG_PERFIL=1 ou pelo parâmetro de URL
+?perfil=1. Cada execução registra, por seção, o tempo gasto e a quantidade de
+widgets criados; o resultado aparece na barra lateral e é acrescentado como uma
+linha JSON no arquivo EDITOR_DAG_PERFIL_ARQUIVO (padrão: perfil_editor_dag.jsonl).
+
+As seções são delimitadas por marcas: marcar('x') encerra a seção anterior e
+inicia a seção 'x', sem exigir que o código medido mude de indentação.
+"""
+import json
+import os
+import time
+from datetime import datetime
+
+ARQUIVO_PADRAO = 'perfil_editor_dag.jsonl'
+
+
+def perfil_solicitado(parametros_url=None):
+    """Indica se a medição foi pedida pela variável de ambiente ou pelo parâmetro ?perfil=1"""
+    if os.environ.get('EDITOR_DAG_PERFIL', '').lower() in ('1', 'true', 'sim'):
+        return True
+    valor = (parametros_url or {}).get('perfil')
+    if isinstance(valor, list):
+        valor = valor[0] if valor else None
+    return str(valor).lower() in ('1', 'true', 'sim')
+
+
+def _contador_widgets():
+    """Função que devolve quantos widgets já foram registrados nesta execução (ou None)"""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+    except ImportError:
+        return lambda: None
+    contexto = get_script_run_ctx()
+    # O conjunto de ids mudou de lugar entre versões do Streamlit
+    compartilhado = getattr(contexto, 'shared', None)
+    ids = getattr(compartilhado, 'widget_ids_this_run', None)
+    if ids is None:
+        ids = getattr(contexto, 'widget_ids_this_run', None)
+    if ids is None:
+        return lambda: None
+    if hasattr(ids, 'snapshot'):
+        return lambda: len(ids.snapshot())
+    return lambda: len(ids)
+
+
+class Perfilador:
+    """Tempos e widgets por seção de uma execução; inativo, todas as operações são vazias"""
+
+    def __init__(self, ativo, arquivo=None):
+        self.ativo = ativo
+        self.arquivo = arquivo or os.environ.get('EDITOR_DAG_PERFIL_ARQUIVO', ARQUIVO_PADRAO)
+        self.secoes = {}
+        self.total_ms = None
+        if ativo:
+            self._contar_widgets = _contador_widgets()
+            self._inicio = time.perf_counter()
+            self._secao = None
+
+    def marcar(self, nome):
+        """Encerra a seção atual e inicia a seção informada"""
+        if not self.ativo:
+            return
+        agora = time.perf_counter()
+        widgets = self._contar_widgets()
+        if self._secao is not None:
+            secao_nome, inicio, widgets_inicio = self._secao
+            anterior = self.secoes.get(secao_nome, {'ms': 0.0, 'widgets': 0})
+            anterior['ms'] += (agora - inicio) * 1000
+            if widgets is not None and widgets_inicio is not None:
+                anterior['widgets'] += widgets - widgets_inicio
+            self.secoes[secao_nome] = anterior
+        self._secao = (nome, agora, widgets) if nome is not None else None
+
+    def finalizar(self, **contexto):
+        """Encerra a última seção e grava a execução no arquivo JSONL"""
+        if not self.ativo or self.total_ms is not None:
+            return
+        self.marcar(None)
+        self.total_ms = (time.perf_counter() - self._inicio) * 1000
+        registro = {
+            'momento': datetime.now().isoformat(timespec='seconds'),
+            'total_ms': round(self.total_ms, 3),
+            'secoes': {nome: {'ms': round(s['ms'], 3), 'widgets': s['widgets']} for nome, s in self.secoes.items()},
+            **contexto,
+        }
+        try:
+            with open(self.arquivo, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(registro, ensure_ascii=False) + '\n')
+        except OSError:
+            # A medição nunca deve impedir o uso do editor
+            pass
+        return registro
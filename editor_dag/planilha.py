@@ -0,0 +1,146 @@
+"""
+Importação de tasks em lote a partir de uma planilha CSV ou Excel
+
+A planilha é lida em um DataFrame (tudo como texto) e cada campo da task é
+ligado a uma coluna (sugerir_mapeamento). A validação trata todas as linhas de
+uma vez: normalização e conversão do ativo, conexões do config.json e
+identificadores repetidos (na própria planilha ou já existentes na DAG) com
+operações vetorizadas do pandas; as regras de cada campo são as mesmas do
+editor (Validador.validar_tasks, que também valida uma coluna por vez).
+
+O resultado separa as tasks válidas, prontas para entrar na DAG em uma única
+alteração, das linhas rejeitadas, que mantêm as colunas originais mais o número
+da linha na planilha e os erros encontrados.
+
+Ler arquivos .xlsx requer o pacote openpyxl (opcional).
+"""
+import io
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import List
+
+import pandas as pd
+
+# Campos importados, na ordem em que a task é montada (a mesma do formulário)
+CAMPOS_IMPORTACAO = ('identificador_task', 'ativo', 'conexao_id', 'mini_operador', 'id_mini_operador', 'extra_info')
+
+# Nomes de coluna aceitos para cada campo, já normalizados (ver _normalizar_nome)
+_SINONIMOS = {
+    'identificador_task': ('identificador_task', 'identificador', 'task', 'nome_task', 'task_id'),
+    'ativo': ('ativo', 'ativa', 'active', 'habilitado'),
+    'conexao_id': ('conexao_id', 'conexao', 'id_conexao', 'connection', 'conn_id'),
+    'mini_operador': ('mini_operador', 'operador', 'operator', 'tipo'),
+    'id_mini_operador': ('id_mini_operador', 'id_operador', 'id_do_mini_operador', 'id_objeto', 'id_qlik'),
+    'extra_info': ('extra_info', 'informacoes_extras', 'extra', 'observacao', 'observacoes'),
+}
+
+_ATIVO = {
+    '': 1, '1': 1, '1.0': 1, 'sim': 1, 's': 1, 'true': 1, 'verdadeiro': 1, 'x': 1, 'yes': 1, 'y': 1,
+    '0': 0, '0.0': 0, 'nao': 0, 'não': 0, 'n': 0, 'false': 0, 'falso': 0, 'no': 0,
+}
+
+# Colunas acrescentadas às linhas rejeitadas
+COLUNA_LINHA = 'linha_planilha'
+COLUNA_ERROS = 'erros'
+
+
+class ErroPlanilha(ValueError):
+    """Planilha que não pôde ser lida"""
+
+
+@dataclass
+class ResultadoImportacao:
+    tasks: List[dict]
+    rejeitadas: pd.DataFrame
+    total: int
+
+
+def _normalizar_nome(nome):
+    texto = unicodedata.normalize('NFKD', str(nome)).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r"[^a-z0-9]+", '_', texto.lower()).strip('_')
+
+
+def ler_planilha(conteudo, nome_arquivo):
+    """DataFrame com todas as células como texto (células vazias viram '')"""
+    try:
+        if nome_arquivo.lower().endswith(('.xlsx', '.xlsm', '.xls')):
+            df = pd.read_excel(io.BytesIO(conteudo), dtype=str)
+        else:
+            try:
+                texto = conteudo.decode('utf-8-sig')
+            except UnicodeDecodeError:
+                # Exportações do Excel em português costumam vir em cp1252
+                texto = conteudo.decode('cp1252')
+            # sep=None detecta ',' ou ';' pela primeira linha
+            df = pd.read_csv(io.StringIO(texto), sep=None, engine='python', dtype=str, keep_default_na=False)
+    except ImportError as e:
+        raise ErroPlanilha(f"Para ler arquivos Excel instale o pacote openpyxl ({e})")
+    except (ValueError, pd.errors.ParserError) as e:
+        raise ErroPlanilha(f"Não foi possível ler a planilha: {e}")
+    df.columns = [str(coluna).strip() for coluna in df.columns]
+    return df.fillna('')
+
+
+def sugerir_mapeamento(colunas):
+    """{campo: coluna da planilha ou None} pelos nomes das colunas"""
+    por_nome = {}
+    for coluna in colunas:
+        por_nome.setdefault(_normalizar_nome(coluna), coluna)
+    return {
+        campo: next((por_nome[nome] for nome in sinonimos if nome in por_nome), None)
+        for campo, sinonimos in _SINONIMOS.items()
+    }
+
+
+def _tasks_da_planilha(df, mapeamento):
+    """DataFrame só com os campos da task, valores de texto sem espaços nas pontas"""
+    colunas = {}
+    for campo in CAMPOS_IMPORTACAO:
+        coluna = mapeamento.get(campo)
+        colunas[campo] = df[coluna].astype(str).str.strip() if coluna else pd.Series('', index=df.index)
+    return pd.DataFrame(colunas, index=df.index)
+
+
+def validar_planilha(df, mapeamento, config, validador, identificadores_existentes=()):
+    """Separa as linhas válidas (já como tasks) das rejeitadas, com os erros de cada uma"""
+    tasks = _tasks_da_planilha(df, mapeamento)
+    erros = pd.Series([()] * len(df), index=df.index, dtype=object)
+
+    def marcar(mascara, mensagem):
+        if mascara.any():
+            erros[mascara] = erros[mascara].map(lambda atuais: atuais + (mensagem,))
+
+    ativo = tasks['ativo'].str.lower().map(_ATIVO)
+    marcar(ativo.isna(), "ativo: use 1/0 ou sim/não")
+    tasks['ativo'] = ativo.fillna(1).astype(int)
+
+    conexoes = pd.Series(list(config.conexoes), dtype=str)
+    marcar((tasks['conexao_id'] != '') & ~tasks['conexao_id'].isin(conexoes),
+           "conexao_id: não está em conexoes do config.json")
+
+    identificadores = tasks['identificador_task']
+    preenchidos = identificadores != ''
+    marcar(preenchidos & identificadores.duplicated(keep=False), "identificador_task: repetido na planilha")
+    marcar(preenchidos & identificadores.isin(list(identificadores_existentes)),
+           "identificador_task: já existe na DAG")
+
+    # Regras de cada campo, as mesmas aplicadas às tasks do editor
+    # Montados a partir das colunas em listas: bem mais rápido que to_dict('records')
+    registros = [dict(zip(CAMPOS_IMPORTACAO, valores))
+                 for valores in zip(*(tasks[campo].tolist() for campo in CAMPOS_IMPORTACAO))]
+    for i, mensagens in validador.validar_tasks(registros).items():
+        erros.iat[i] = erros.iat[i] + mensagens
+
+    rejeitada = erros.map(bool)
+    rejeitadas = df[rejeitada].copy()
+    # Linha como aparece no Excel: o cabeçalho é a linha 1
+    rejeitadas.insert(0, COLUNA_LINHA, rejeitada.to_numpy().nonzero()[0] + 2)
+    rejeitadas[COLUNA_ERROS] = erros[rejeitada].map('; '.join)
+    validas = [registro for registro, invalida in zip(registros, rejeitada) if not invalida]
+    return ResultadoImportacao(tasks=validas, rejeitadas=rejeitadas, total=len(df))
+
+
+def rejeitadas_para_csv(rejeitadas):
+    """CSV das linhas rejeitadas (UTF-8 com BOM, para abrir direto no Excel)"""
+    return rejeitadas.to_csv(index=False).encode('utf-8-sig')
@@ -0,0 +1,90 @@
+"""
+Leitura e escrita de YAML das DAGs
+
+Usa o libyaml (CSafeLoader/CSafeDumper) quando o PyYAML foi compilado com ele
+e cai para a implementação pura em Python quando não está disponível. A saída
+é sempre idêntica byte a byte à de yaml.dump(..., default_flow_style=False,
+allow_unicode=True, sort_keys=False).
+"""
+import os
+import re
+
+import yaml
+
+try:
+    from yaml import CSafeLoader as _LoaderC, CSafeDumper as _DumperC
+    LIBYAML_DISPONIVEL = True
+except ImportError:
+    _LoaderC = _DumperC = None
+    LIBYAML_DISPONIVEL = False
+
+BACKENDS = ('auto', 'c', 'python')
+
+OPCOES_DUMP = {
+    'default_flow_style': False,
+    'allow_unicode': True,
+    'sort_keys': False,
+}
+
+# O emissor do libyaml difere do emissor em Python para caracteres de controle,
+# caracteres fora do BMP e na quebra de strings longas com aspas duplas.
+# Documentos com esses valores são gerados pelo caminho em Python.
+_CARACTERES_DIVERGENTES = re.compile(
+    '[\U00010000-\U0010FFFF\x00-\x09\x0b-\x1f\x7f-\x9f\u2028\u2029\ufeff]'
+)
+_QUEBRA_OU_ESPACO_NAS_PONTAS = re.compile(r'\n|^\s|\s$')
+_TAMANHO_SEGURO = 40
+
+
+def _backend_padrao():
+    backend = os.environ.get('EDITOR_DAG_YAML_BACKEND', 'auto')
+    return backend if backend in BACKENDS else 'auto'
+
+
+def _texto_seguro_para_libyaml(texto):
+    if _CARACTERES_DIVERGENTES.search(texto):
+        return False
+    return len(texto) <= _TAMANHO_SEGURO or not _QUEBRA_OU_ESPACO_NAS_PONTAS.search(texto)
+
+
+def seguro_para_libyaml(dados):
+    """Indica se o emissor do libyaml gera exatamente o mesmo texto que o emissor em Python"""
+    pendentes = [dados]
+    while pendentes:
+        item = pendentes.pop()
+        if isinstance(item, str):
+            if not _texto_seguro_para_libyaml(item):
+                return False
+        elif isinstance(item, dict):
+            pendentes.extend(item.keys())
+            pendentes.extend(item.values())
+        elif isinstance(item, list):
+            pendentes.extend(item)
+    return True
+
+
+def carregar_yaml(conteudo, backend=None):
+    """Converte texto (ou bytes/stream) YAML em objetos Python, como yaml.safe_load"""
+    backend = backend or _backend_padrao()
+    if backend != 'python' and LIBYAML_DISPONIVEL:
+        return yaml.load(conteudo, Loader=_LoaderC)
+    if backend == 'c':
+        raise RuntimeError("libyaml não está disponível nesta instalação do PyYAML")
+    return yaml.safe_load(conteudo)
+
+
+def gerar_yaml(dados, stream=None, backend=None):
+    """Serializa os dados em YAML mantendo a ordem das chaves e caracteres unicode"""
+    backend = backend or _backend_padrao()
+    if backend == 'c' and not LIBYAML_DISPONIVEL:
+        raise RuntimeError("libyaml não está disponível nesta instalação do PyYAML")
+
+    usar_c = LIBYAML_DISPONIVEL and (backend == 'c' or (backend == 'auto' and seguro_para_libyaml(dados)))
+    if usar_c:
+        try:
+            return yaml.dump(dados, stream, Dumper=_DumperC, **OPCOES_DUMP)
+        except yaml.representer.RepresenterError:
+            # Tipos que só o Dumper completo sabe representar
+            if backend == 'c' or stream is not None:
+                raise
+    return yaml.dump(dados, stream, **OPCOES_DUMP)
@@ -0,0 +1,187 @@
+"""
+Sidecar pré-compilado das DAGs para a fábrica de DAGs do Airflow
+
+O processador de DAGs do Airflow relê todos os YAMLs a cada ciclo. O sidecar
+guarda os mesmos dados já convertidos em JSON (ou msgpack, opcional) ao lado do
+YAML, com o hash sha256 do YAML de origem:
+
+    dags/vendas.yml
+    dags/vendas.yml.json     {"formato": "editor_dag/sidecar", "versao": 1,
+                              "hash_origem": "<sha256 do vendas.yml>", "dag_data": {...}}
+
+Na fábrica, carregar_dag_rapido(caminho_do_yaml) lê o sidecar quando o hash
+confere com o conteúdo atual do YAML e, se ele não existir, estiver
+desatualizado ou for de outra versão, lê o próprio YAML. O resultado é sempre
+o mesmo de carregar o YAML; este módulo só depende do PyYAML (e do msgpack,
+se instalado) e pode ser importado sem o Streamlit.
+
+O sidecar só é gerado para DAGs que passam na conferência de esquema: as
+seções 'dag'/'tasks', tipos representáveis em JSON (datas sem aspas, por
+exemplo, não são) e, com um Validador, as mesmas regras do editor.
+
+Ler e gravar msgpack requer o pacote msgpack (opcional).
+"""
+import hashlib
+import json
+import os
+from collections import Counter
+
+from editor_dag.serializacao import carregar_yaml
+
+FORMATO = 'editor_dag/sidecar'
+VERSAO_SIDECAR = 1
+EXTENSOES = {'msgpack': '.msgpack', 'json': '.json'}
+FORMATOS = tuple(EXTENSOES)
+
+_TIPOS_JSON = (str, int, float, bool, type(None))
+
+
+class ErroSidecar(ValueError):
+    """DAG que não pode ser convertida em sidecar (ou formato indisponível)"""
+
+
+def caminho_sidecar(caminho_yaml, formato='json'):
+    return caminho_yaml + EXTENSOES[formato]
+
+
+def _hash(conteudo):
+    return hashlib.sha256(conteudo).hexdigest()
+
+
+def _msgpack():
+    try:
+        import msgpack
+    except ImportError as e:
+        raise ErroSidecar(f"Para usar o formato msgpack instale o pacote msgpack ({e})")
+    return msgpack
+
+
+def _ler_sidecar(caminho, formato, hash_origem):
+    """dag_data do sidecar se ele é desta versão e do mesmo conteúdo de YAML, senão None"""
+    try:
+        with open(caminho, 'rb') as f:
+            bruto = f.read()
+    except OSError:
+        return None
+    try:
+        if formato == 'msgpack':
+            envelope = _msgpack().unpackb(bruto, raw=False)
+        else:
+            envelope = json.loads(bruto)
+    except (ErroSidecar, ValueError):
+        # msgpack indisponível ou arquivo corrompido/truncado: vale o YAML
+        return None
+    if (not isinstance(envelope, dict) or envelope.get('formato') != FORMATO
+            or envelope.get('versao') != VERSAO_SIDECAR or envelope.get('hash_origem') != hash_origem):
+        return None
+    return envelope.get('dag_data')
+
+
+def carregar_dag_rapido(caminho_yaml):
+    """
+    Dados da DAG do arquivo YAML, lidos do sidecar em dia com ele (msgpack, depois
+    JSON) ou, na falta dele, do próprio YAML
+    """
+    with open(caminho_yaml, 'rb') as f:
+        conteudo = f.read()
+    hash_origem = _hash(conteudo)
+    for formato in FORMATOS:
+        dag_data = _ler_sidecar(caminho_sidecar(caminho_yaml, formato), formato, hash_origem)
+        if dag_data is not None:
+            return dag_data
+    return carregar_yaml(conteudo)
+
+
+def estado_sidecar(caminho_yaml, formato='json'):
+    """'atualizado', 'desatualizado' (YAML mudou ou outra versão) ou 'ausente'"""
+    caminho = caminho_sidecar(caminho_yaml, formato)
+    if not os.path.exists(caminho):
+        return 'ausente'
+    with open(caminho_yaml, 'rb') as f:
+        hash_origem = _hash(f.read())
+    return 'atualizado' if _ler_sidecar(caminho, formato, hash_origem) is not None else 'desatualizado'
+
+
+def _erros_de_tipo(dados, caminho=''):
+    """Caminhos (ex.: dag.data_inicial) dos valores que o JSON não representa"""
+    erros = []
+    pendentes = [(caminho, dados)]
+    while pendentes:
+        onde, valor = pendentes.pop()
+        if isinstance(valor, dict):
+            for chave, item in valor.items():
+                if not isinstance(chave, str):
+                    erros.append(f"{onde}: chave {chave!r} não é texto")
+                pendentes.append((f"{onde}.{chave}" if onde else str(chave), item))
+        elif isinstance(valor, list):
+            pendentes.extend((f"{onde}[{i}]", item) for i, item in enumerate(valor))
+        elif not isinstance(valor, _TIPOS_JSON):
+            erros.append(f"{onde}: {type(valor).__name__} não é suportado (use texto, ex.: '{valor}')")
+    return erros
+
+
+def conferir_esquema(dag_data, validador=None):
+    """Mensagens de erro que impedem gerar o sidecar (vazia se a DAG está ok)"""
+    if not isinstance(dag_data, dict) or not isinstance(dag_data.get('dag'), dict) \
+            or not isinstance(dag_data.get('tasks'), list):
+        return ["a DAG deve ter a seção 'dag' (dicionário) e 'tasks' (lista)"]
+    tasks = dag_data['tasks']
+    if not all(isinstance(task, dict) for task in tasks):
+        return ["cada task deve ser um dicionário"]
+
+    erros = sorted(_erros_de_tipo(dag_data))
+    if validador is not None:
+        erros.extend(validador.validar_cabecalho(dag_data['dag']))
+        for i, mensagens in sorted(validador.validar_tasks(tasks).items()):
+            erros.extend(f"task {i}: {mensagem}" for mensagem in mensagens)
+        for campo in validador.campos_unicos:
+            contagem = Counter(task.get(campo) for task in tasks)
+            erros.extend(f"{campo}: '{valor}' repetido" for valor, quantidade in contagem.items()
+                         if quantidade > 1 and valor not in (None, ''))
+    return erros
+
+
+def gerar_sidecar(conteudo_yaml, formato='json', validador=None):
+    """Bytes do sidecar do conteúdo YAML (lança ErroSidecar se a DAG não passar no esquema)"""
+    if formato not in EXTENSOES:
+        raise ErroSidecar(f"Formato de sidecar desconhecido '{formato}' (use {' ou '.join(FORMATOS)})")
+    if isinstance(conteudo_yaml, str):
+        conteudo_yaml = conteudo_yaml.encode('utf-8')
+    dag_data = carregar_yaml(conteudo_yaml)
+    erros = conferir_esquema(dag_data, validador)
+    if erros:
+        raise ErroSidecar(f"{len(erros)} erro(s) de esquema: " + '; '.join(erros[:5])
+                          + (" ..." if len(erros) > 5 else ""))
+
+    envelope = {
+        'formato': FORMATO,
+        'versao': VERSAO_SIDECAR,
+        'hash_origem': _hash(conteudo_yaml),
+        'dag_data': dag_data,
+    }
+    if formato == 'msgpack':
+        return _msgpack().packb(envelope, use_bin_type=True)
+    # Mesma ordem de chaves do YAML, sem espaços: o mesmo YAML gera sempre os mesmos bytes
+    return json.dumps(envelope, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def escrever_sidecar(caminho_yaml, formato='json', validador=None, conteudo_yaml=None):
+    """
+    Grava o sidecar ao lado do YAML (lido do disco se o conteúdo não for informado), com as
+    permissões do YAML: quem lê o YAML (o processador de DAGs do Airflow) precisa ler o sidecar
+    """
+    from editor_dag.lote import escrever_atomico
+
+    if conteudo_yaml is None:
+        with open(caminho_yaml, 'rb') as f:
+            conteudo_yaml = f.read()
+    caminho = caminho_sidecar(caminho_yaml, formato)
+    conteudo = gerar_sidecar(conteudo_yaml, formato, validador)
+    try:
+        modo = os.stat(caminho_yaml).st_mode & 0o7777
+    except OSError:
+        modo = None
+    escrever_atomico(caminho, conteudo, modo)
+    if modo is not None and os.stat(caminho).st_mode & 0o7777 != modo:
+        os.chmod(caminho, modo)
+    return caminho
@@ -0,0 +1,112 @@
+"""
+Representação compacta das tasks guardadas na ListaTasks
+
+Um dicionário por task repete em cada uma a tabela de hash com os nomes dos
+campos. A TaskCompacta guarda só uma tupla com os valores e uma referência ao
+esquema (a tupla de campos, na ordem do arquivo), compartilhado por todas as
+tasks com os mesmos campos. Os valores de campos que se repetem muito entre
+tasks (conexão, mini operador) são internados, então cada texto distinto existe
+uma vez por processo.
+
+A TaskCompacta é um Mapping somente leitura: o restante do editor continua
+lendo as tasks com task['campo'], get(), items() e {**task}, e uma alteração
+continua sendo feita montando um novo dicionário (ver ListaTasks.substituir).
+Os dicionários comuns só voltam a existir na serialização (para_dict).
+"""
+import sys
+from collections.abc import Mapping
+
+# Campos com poucos valores distintos, internados ao compactar
+CAMPOS_INTERNADOS = ('conexao_id', 'mini_operador')
+
+# Limite de esquemas compartilhados (cada ordem distinta de campos é um esquema)
+LIMITE_ESQUEMAS = 1024
+
+_ESQUEMAS = {}
+
+
+class _Esquema:
+    """Campos de uma task, na ordem, com a posição de cada um na tupla de valores"""
+    __slots__ = ('campos', 'indice', 'internar')
+
+    def __init__(self, campos):
+        self.campos = campos
+        self.indice = {campo: i for i, campo in enumerate(campos)}
+        self.internar = tuple(self.indice[campo] for campo in CAMPOS_INTERNADOS if campo in self.indice)
+
+
+def _esquema(campos):
+    esquema = _ESQUEMAS.get(campos)
+    if esquema is None:
+        campos = tuple(sys.intern(campo) if type(campo) is str else campo for campo in campos)
+        esquema = _Esquema(campos)
+        if len(_ESQUEMAS) < LIMITE_ESQUEMAS:
+            _ESQUEMAS[campos] = esquema
+    return esquema
+
+
+class TaskCompacta(Mapping):
+    """Task somente leitura: esquema compartilhado e tupla de valores"""
+    __slots__ = ('_esquema', '_valores')
+
+    def __init__(self, task):
+        esquema = _esquema(tuple(task))
+        valores = list(task.values())
+        for i in esquema.internar:
+            if type(valores[i]) is str:
+                valores[i] = sys.intern(valores[i])
+        self._esquema = esquema
+        self._valores = tuple(valores)
+
+    def __getitem__(self, campo):
+        return self._valores[self._esquema.indice[campo]]
+
+    def get(self, campo, padrao=None):
+        i = self._esquema.indice.get(campo)
+        return padrao if i is None else self._valores[i]
+
+    def __contains__(self, campo):
+        return campo in self._esquema.indice
+
+    def __iter__(self):
+        return iter(self._esquema.campos)
+
+    def __len__(self):
+        return len(self._valores)
+
+    def __eq__(self, outra):
+        if isinstance(outra, TaskCompacta) and outra._esquema is self._esquema:
+            return outra._valores == self._valores
+        return Mapping.__eq__(self, outra)
+
+    __hash__ = None
+
+    def items(self):
+        return zip(self._esquema.campos, self._valores)
+
+    def values(self):
+        return self._valores
+
+    def para_dict(self):
+        """Dicionário comum com os mesmos campos, na mesma ordem"""
+        return dict(zip(self._esquema.campos, self._valores))
+
+    copy = para_dict
+
+    def __reduce__(self):
+        # O esquema é reconstruído (e volta a ser compartilhado) ao ler o pickle
+        return _de_pares, (self._esquema.campos, self._valores)
+
+    def __repr__(self):
+        return f"TaskCompacta({self.para_dict()!r})"
+
+
+def _de_pares(campos, valores):
+    return TaskCompacta(dict(zip(campos, valores)))
+
+
+def compactar(task):
+    """TaskCompacta equivalente à task (dicionários); outros valores voltam sem mudança"""
+    if isinstance(task, dict):
+        return TaskCompacta(task)
+    return task
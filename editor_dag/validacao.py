@@ -0,0 +1,296 @@
+"""
+Validação das DAGs por esquema declarativo
+
+As regras de cada campo (ESQUEMA_DAG e ESQUEMA_TASK) são compiladas uma única
+vez por configuração: expressões regulares pré-compiladas e conjuntos montados
+a partir do config.json. A ValidacaoIncremental revalida apenas as tasks cujo
+valor mudou desde a última passada (as tasks da ListaTasks são substituídas,
+nunca alteradas no lugar, então basta comparar identidade) e mantém os
+identificadores repetidos atualizados pela contagem de cada valor.
+
+Com um catálogo do Qlik (ver catalogo_qlik), os IDs de mini operador com
+formato válido também precisam existir no catálogo com o tipo esperado pelo
+mini operador da task.
+"""
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from editor_dag.cron import validar_cron
+
+
+@dataclass(frozen=True)
+class Regra:
+    obrigatorio: bool = False
+    # Expressão regular que o valor inteiro deve satisfazer
+    padrao: Optional[str] = None
+    descricao_padrao: str = ''
+    # Valor com vários itens separados por vírgula; o padrão vale para cada item
+    lista: bool = False
+    # Nome de uma lista do config.json (ex.: 'mini_operadores') à qual o valor deve pertencer
+    opcoes_config: Optional[str] = None
+    # Conjunto fixo de valores aceitos
+    opcoes: Optional[Tuple] = None
+    inteiro_minimo: Optional[int] = None
+    # Valor não pode se repetir entre as tasks
+    unico: bool = False
+    # Valor deve ser texto (conferido antes do validador, que só aceita texto)
+    texto: bool = False
+    # Função extra: recebe o valor e devolve a mensagem de erro ou None
+    validador: Optional[Callable] = None
+
+
+PADRAO_EMAIL = r"[^@\s,]+@[^@\s,]+\.[^@\s,]+"
+PADRAO_UUID = r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
+
+ESQUEMA_DAG = {
+    'descricao': Regra(obrigatorio=True),
+    'dono': Regra(obrigatorio=True),
+    'email_em_falha': Regra(obrigatorio=True, padrao=PADRAO_EMAIL, lista=True, descricao_padrao="email inválido"),
+    'data_inicial': Regra(obrigatorio=True, padrao=r"\d{4}-\d{2}-\d{2}", descricao_padrao="use o formato AAAA-MM-DD"),
+    'agendamento_cron': Regra(obrigatorio=True, texto=True, validador=validar_cron),
+    'quantidade_tentativas': Regra(obrigatorio=True, inteiro_minimo=0),
+    'tempo_para_tentativa': Regra(obrigatorio=True, inteiro_minimo=0),
+}
+
+ESQUEMA_TASK = {
+    'identificador_task': Regra(obrigatorio=True, padrao=r"[A-Za-z0-9_.\-]+", unico=True,
+                                descricao_padrao="use apenas letras, números, '_', '-' e '.'"),
+    'ativo': Regra(obrigatorio=True, opcoes=(0, 1)),
+    'conexao_id': Regra(obrigatorio=True),
+    'mini_operador': Regra(obrigatorio=True, opcoes_config='mini_operadores'),
+    'id_mini_operador': Regra(obrigatorio=True, padrao=PADRAO_UUID, descricao_padrao="deve ser um UUID"),
+}
+
+
+def _vazio(valor):
+    return valor is None or (type(valor) is str and not valor.strip())
+
+
+def _compilar_regra(regra, config):
+    """
+    Transforma a regra em uma função que valida uma coluna inteira de valores
+    e devolve {índice: mensagem de erro} apenas para os valores inválidos
+    """
+    # Cada verificação é (aceita(valor) -> bool, mensagem(valor) -> str), aplicada em sequência
+    verificacoes = []
+    if regra.texto:
+        verificacoes.append((
+            lambda valor: isinstance(valor, str),
+            lambda valor: f"deve ser um texto entre aspas (recebido {valor!r})",
+        ))
+    if regra.padrao is not None:
+        casar = re.compile(regra.padrao).fullmatch
+        descricao = regra.descricao_padrao or "formato inválido"
+        if regra.lista:
+            def itens_invalidos(valor):
+                return [item.strip() for item in str(valor).split(',') if not casar(item.strip())]
+            verificacoes.append((
+                lambda valor: not itens_invalidos(valor),
+                lambda valor: f"{descricao}: {', '.join(itens_invalidos(valor))}",
+            ))
+        else:
+            verificacoes.append((
+                lambda valor: casar(valor if type(valor) is str else str(valor)) is not None,
+                lambda valor: descricao,
+            ))
+    if regra.opcoes_config is not None:
+        opcoes = frozenset(config[regra.opcoes_config])
+        origem = regra.opcoes_config
+        verificacoes.append((
+            lambda valor: isinstance(valor, str) and valor in opcoes,
+            lambda valor: f"'{valor}' não está em {origem} do config.json",
+        ))
+    if regra.opcoes is not None:
+        opcoes_fixas = regra.opcoes
+        aceitos = ', '.join(map(str, regra.opcoes))
+        verificacoes.append((lambda valor: valor in opcoes_fixas, lambda valor: f"deve ser {aceitos}"))
+    if regra.inteiro_minimo is not None:
+        minimo = regra.inteiro_minimo
+        verificacoes.append((
+            lambda valor: type(valor) is int and valor >= minimo,
+            lambda valor: f"deve ser um número inteiro maior ou igual a {minimo}",
+        ))
+    if regra.validador is not None:
+        validador = regra.validador
+        verificacoes.append((lambda valor: not validador(valor), validador))
+
+    obrigatorio = regra.obrigatorio
+
+    def validar_coluna(valores):
+        restantes = [i for i, valor in enumerate(valores)
+                     if valor is not None and (type(valor) is not str or valor.strip())]
+        erros = {}
+        if obrigatorio and len(restantes) < len(valores):
+            preenchidos = set(restantes)
+            erros = {i: "campo obrigatório" for i in range(len(valores)) if i not in preenchidos}
+        for aceita, mensagem in verificacoes:
+            invalidos = [i for i in restantes if not aceita(valores[i])]
+            if invalidos:
+                for i in invalidos:
+                    erros[i] = mensagem(valores[i])
+                invalidos = set(invalidos)
+                restantes = [i for i in restantes if i not in invalidos]
+        return erros
+    return validar_coluna
+
+
+class Validador:
+    """
+    Esquemas da DAG e das tasks compilados para uma configuração e, opcionalmente,
+    um CatalogoQlik com o qual os IDs de mini operador válidos são conferidos
+    """
+
+    def __init__(self, config, esquema_dag=None, esquema_task=None, catalogo=None):
+        esquema_dag = ESQUEMA_DAG if esquema_dag is None else esquema_dag
+        esquema_task = ESQUEMA_TASK if esquema_task is None else esquema_task
+        self._regras_dag = [(campo, _compilar_regra(r, config)) for campo, r in esquema_dag.items()]
+        self._regras_task = [(campo, _compilar_regra(r, config)) for campo, r in esquema_task.items()]
+        self.campos_unicos = tuple(campo for campo, regra in esquema_task.items() if regra.unico)
+        self.catalogo = catalogo
+
+    def validar_cabecalho(self, cabecalho):
+        """Lista de mensagens de erro do cabeçalho da DAG"""
+        erros = []
+        for campo, validar_coluna in self._regras_dag:
+            erro = validar_coluna([cabecalho.get(campo)]).get(0)
+            if erro:
+                erros.append(f"{campo}: {erro}")
+        return erros
+
+    def validar_tasks(self, tasks):
+        """
+        Valida uma lista de tasks em uma passada por campo (sem as regras entre tasks)
+        e devolve {índice na lista: tupla de mensagens} apenas para as tasks com erro
+        """
+        erros = {}
+        ids_invalidos = ()
+        for campo, validar_coluna in self._regras_task:
+            erros_campo = validar_coluna([task.get(campo) for task in tasks])
+            for i, erro in erros_campo.items():
+                erros[i] = erros.get(i, ()) + (f"{campo}: {erro}",)
+            if campo == 'id_mini_operador':
+                ids_invalidos = erros_campo
+        if self.catalogo is not None and self.catalogo.tipos:
+            # Só os IDs com formato válido são procurados no catálogo
+            for i, task in enumerate(tasks):
+                if i not in ids_invalidos:
+                    erro = self.catalogo.verificar(task.get('mini_operador'), task.get('id_mini_operador'))
+                    if erro:
+                        erros[i] = erros.get(i, ()) + (f"id_mini_operador: {erro}",)
+        return erros
+
+
+_validadores = {}
+
+
+def obter_validador(config, catalogo=None):
+    """
+    Validador compilado para a configuração e o catálogo (reaproveitado enquanto o
+    config.json e a exportação do Qlik não mudam; cada CatalogoQlik é imutável)
+    """
+    chave = (config.hash_conteudo, id(catalogo))
+    validador = _validadores.get(chave)
+    if validador is None or validador.catalogo is not catalogo:
+        _validadores.clear()
+        validador = _validadores[chave] = Validador(config, catalogo=catalogo)
+    return validador
+
+
+@dataclass
+class RelatorioValidacao:
+    erros_dag: List[str]
+    erros_tasks: Dict[int, Tuple[str, ...]] = field(default_factory=dict)
+
+    @property
+    def ok(self):
+        return not self.erros_dag and not self.erros_tasks
+
+    @property
+    def quantidade(self):
+        return len(self.erros_dag) + sum(len(erros) for erros in self.erros_tasks.values())
+
+
+class ValidacaoIncremental:
+    """Estado da validação das tasks de uma DAG entre uma passada e outra"""
+
+    def __init__(self, validador):
+        self.validador = validador
+        self._vistas = {}      # task_id -> task validada (comparada por identidade)
+        self._proprios = {}    # task_id -> erros da própria task (só as com erro)
+        self._por_valor = {campo: defaultdict(set) for campo in validador.campos_unicos}
+        self._repetidos = {campo: set() for campo in validador.campos_unicos}
+        self._valores = {campo: {} for campo in validador.campos_unicos}  # task_id -> valor
+        self._versao = None
+        self._erros_tasks = {}
+
+    def _esquecer(self, task_id):
+        del self._vistas[task_id]
+        self._proprios.pop(task_id, None)
+        for campo, valores in self._valores.items():
+            valor = valores.pop(task_id, None)
+            if valor is None:
+                continue
+            ids = self._por_valor[campo][valor]
+            ids.discard(task_id)
+            if len(ids) < 2:
+                self._repetidos[campo].discard(valor)
+            if not ids:
+                del self._por_valor[campo][valor]
+
+    def _registrar(self, alteradas, erros):
+        """Guarda as tasks validadas, os seus erros e os valores dos campos únicos"""
+        self._vistas.update(alteradas)
+        for i, erro in erros.items():
+            self._proprios[alteradas[i][0]] = erro
+        for campo, valores in self._valores.items():
+            por_valor = self._por_valor[campo]
+            repetidos = self._repetidos[campo]
+            for task_id, task in alteradas:
+                valor = task.get(campo)
+                if _vazio(valor):
+                    continue
+                if type(valor) is not str:
+                    valor = str(valor)
+                valores[task_id] = valor
+                ids = por_valor[valor]
+                ids.add(task_id)
+                if len(ids) > 1:
+                    repetidos.add(valor)
+
+    def atualizar(self, tasks):
+        """Revalida só as tasks novas ou substituídas e devolve os erros por task_id"""
+        versao = (id(tasks), tasks.versao)
+        if versao == self._versao:
+            return self._erros_tasks
+
+        itens = tasks.itens()
+        vistas = self._vistas
+        alteradas = [(task_id, task) for task_id, task in itens if vistas.get(task_id) is not task]
+        if len(vistas) - (len(itens) - len(alteradas)) > sum(1 for task_id, _ in alteradas if task_id in vistas):
+            # Há tasks removidas desde a última passada
+            presentes = {task_id for task_id, _ in itens}
+            for task_id in [tid for tid in vistas if tid not in presentes]:
+                self._esquecer(task_id)
+        for task_id, _ in alteradas:
+            if task_id in vistas:
+                self._esquecer(task_id)
+
+        # Uma única passada em lote sobre as tasks novas ou substituídas
+        self._registrar(alteradas, self.validador.validar_tasks([task for _, task in alteradas]))
+
+        erros_tasks = dict(self._proprios)
+        for campo, repetidos in self._repetidos.items():
+            for valor in repetidos:
+                for task_id in self._por_valor[campo][valor]:
+                    erros_tasks[task_id] = erros_tasks.get(task_id, ()) + (f"{campo}: '{valor}' repetido",)
+        self._erros_tasks = erros_tasks
+        self._versao = versao
+        return erros_tasks
+
+    def relatorio(self, dag_data):
+        return RelatorioValidacao(
+            erros_dag=self.validador.validar_cabecalho(dag_data['dag']),
+            erros_tasks=self.atualizar(dag_data['tasks']),
+        )
@@ -0,0 +1,248 @@
+"""
+Índice SQLite de um diretório de DAGs (modo Workspace)
+
+O índice guarda o cabeçalho de cada DAG e as suas tasks, e é atualizado de
+forma incremental: só os arquivos com mtime/tamanho diferentes do que está
+no banco são lidos novamente.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+import yaml
+
+from editor_dag.dag import ErroEstruturaDag, carregar_dag_arquivo
+from editor_dag.lote import listar_arquivos_dag
+
+VERSAO_ESQUEMA = 1
+
+# Acima desta quantidade de arquivos alterados a leitura é feita em paralelo
+MINIMO_PARA_PARALELO = 32
+
+CAMPOS_BUSCA = ('identificador_task', 'conexao_id', 'mini_operador', 'id_mini_operador')
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS arquivos (
+    id INTEGER PRIMARY KEY,
+    caminho TEXT NOT NULL UNIQUE,
+    mtime_ns INTEGER NOT NULL,
+    tamanho INTEGER NOT NULL,
+    descricao TEXT,
+    dono TEXT,
+    agendamento_cron TEXT,
+    tags TEXT,
+    quantidade_tasks INTEGER NOT NULL DEFAULT 0,
+    cabecalho TEXT,
+    erro TEXT
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    arquivo_id INTEGER NOT NULL REFERENCES arquivos(id) ON DELETE CASCADE,
+    posicao INTEGER NOT NULL,
+    identificador_task TEXT,
+    ativo INTEGER,
+    conexao_id TEXT,
+    mini_operador TEXT,
+    id_mini_operador TEXT,
+    extra_info TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_arquivo ON tasks(arquivo_id);
+CREATE INDEX IF NOT EXISTS idx_tasks_identificador ON tasks(identificador_task);
+CREATE INDEX IF NOT EXISTS idx_tasks_conexao ON tasks(conexao_id);
+CREATE INDEX IF NOT EXISTS idx_tasks_operador ON tasks(mini_operador);
+CREATE INDEX IF NOT EXISTS idx_tasks_id_operador ON tasks(id_mini_operador);
+"""
+
+
+def caminho_banco_padrao(diretorio):
+    """Banco no cache do usuário, para não criar arquivos dentro do repositório de DAGs"""
+    chave = hashlib.sha1(os.path.abspath(diretorio).encode('utf-8')).hexdigest()[:16]
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'editor_dag', f'workspace_{chave}.sqlite')
+
+
+def _texto(valor):
+    return None if valor is None else str(valor)
+
+
+def _ler_arquivo(caminho_absoluto):
+    """Lê uma DAG e devolve (cabeçalho, tasks, erro) prontos para o banco"""
+    try:
+        dag_data = carregar_dag_arquivo(caminho_absoluto)
+    except (yaml.YAMLError, ErroEstruturaDag, OSError, UnicodeDecodeError) as e:
+        return None, [], str(e)
+
+    cabecalho = dag_data.get('dag') or {}
+    tasks = []
+    for posicao, task in enumerate(dag_data.get('tasks') or []):
+        if not isinstance(task, dict):
+            continue
+        tasks.append((
+            posicao,
+            _texto(task.get('identificador_task')),
+            task.get('ativo'),
+            _texto(task.get('conexao_id')),
+            _texto(task.get('mini_operador')),
+            _texto(task.get('id_mini_operador')),
+            _texto(task.get('extra_info')),
+        ))
+    return cabecalho, tasks, None
+
+
+@dataclass
+class ResultadoReindexacao:
+    total: int
+    lidos: int
+    removidos: int
+    com_erro: int
+
+
+class IndiceWorkspace:
+    """Índice persistente das DAGs de um diretório"""
+
+    def __init__(self, diretorio, caminho_banco=None):
+        self.diretorio = os.path.abspath(diretorio)
+        self.caminho_banco = caminho_banco or caminho_banco_padrao(self.diretorio)
+        os.makedirs(os.path.dirname(self.caminho_banco), exist_ok=True)
+        with self._conectar() as conexao:
+            versao = conexao.execute('PRAGMA user_version').fetchone()[0]
+            if versao != VERSAO_ESQUEMA:
+                conexao.executescript('DROP TABLE IF EXISTS tasks; DROP TABLE IF EXISTS arquivos;')
+                conexao.execute(f'PRAGMA user_version = {VERSAO_ESQUEMA}')
+            conexao.executescript(_ESQUEMA)
+
+    @contextmanager
+    def _conectar(self):
+        """Abre uma conexão, confirma a transação ao final e fecha a conexão"""
+        conexao = sqlite3.connect(self.caminho_banco)
+        conexao.row_factory = sqlite3.Row
+        conexao.execute('PRAGMA foreign_keys = ON')
+        conexao.execute('PRAGMA journal_mode = WAL')
+        try:
+            with conexao:
+                yield conexao
+        finally:
+            conexao.close()
+
+    def caminho_absoluto(self, caminho_relativo):
+        return os.path.join(self.diretorio, caminho_relativo)
+
+    def reindexar(self, processos=None):
+        """Atualiza o índice lendo apenas os arquivos novos ou alterados"""
+        atuais = {}
+        for caminho in listar_arquivos_dag(self.diretorio):
+            try:
+                stat = os.stat(caminho)
+            except OSError:
+                continue
+            atuais[os.path.relpath(caminho, self.diretorio)] = (stat.st_mtime_ns, stat.st_size)
+
+        with self._conectar() as conexao:
+            indexados = {
+                linha['caminho']: (linha['mtime_ns'], linha['tamanho'])
+                for linha in conexao.execute('SELECT caminho, mtime_ns, tamanho FROM arquivos')
+            }
+            alterados = [c for c, assinatura in atuais.items() if indexados.get(c) != assinatura]
+            removidos = [c for c in indexados if c not in atuais]
+
+            absolutos = [self.caminho_absoluto(c) for c in alterados]
+            if len(absolutos) >= MINIMO_PARA_PARALELO and processos != 1:
+                with ProcessPoolExecutor(max_workers=processos) as executor:
+                    leituras = list(executor.map(_ler_arquivo, absolutos, chunksize=16))
+            else:
+                leituras = [_ler_arquivo(c) for c in absolutos]
+
+            conexao.executemany('DELETE FROM arquivos WHERE caminho = ?', [(c,) for c in removidos])
+            com_erro = 0
+            for caminho, (cabecalho, tasks, erro) in zip(alterados, leituras):
+                com_erro += erro is not None
+                self._gravar_arquivo(conexao, caminho, atuais[caminho], cabecalho, tasks, erro)
+
+        return ResultadoReindexacao(len(atuais), len(alterados), len(removidos), com_erro)
+
+    def _gravar_arquivo(self, conexao, caminho, assinatura, cabecalho, tasks, erro):
+        cabecalho = cabecalho or {}
+        conexao.execute('DELETE FROM arquivos WHERE caminho = ?', (caminho,))
+        cursor = conexao.execute(
+            'INSERT INTO arquivos (caminho, mtime_ns, tamanho, descricao, dono, agendamento_cron, tags,'
+            ' quantidade_tasks, cabecalho, erro) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (
+                caminho, assinatura[0], assinatura[1],
+                _texto(cabecalho.get('descricao')), _texto(cabecalho.get('dono')),
+                _texto(cabecalho.get('agendamento_cron')), _texto(cabecalho.get('tags')),
+                len(tasks), json.dumps(cabecalho, default=str, ensure_ascii=False), erro,
+            )
+        )
+        conexao.executemany(
+            'INSERT INTO tasks (arquivo_id, posicao, identificador_task, ativo, conexao_id, mini_operador,'
+            ' id_mini_operador, extra_info) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            [(cursor.lastrowid, *task) for task in tasks]
+        )
+
+    def reindexar_arquivo(self, caminho_relativo):
+        """Atualiza um único arquivo no índice (por exemplo, depois de salvar pelo editor)"""
+        caminho = self.caminho_absoluto(caminho_relativo)
+        stat = os.stat(caminho)
+        cabecalho, tasks, erro = _ler_arquivo(caminho)
+        with self._conectar() as conexao:
+            self._gravar_arquivo(conexao, caminho_relativo, (stat.st_mtime_ns, stat.st_size), cabecalho, tasks, erro)
+
+    def buscar_tasks(self, termo, campo=None, exato=True, limite=500):
+        """
+        Busca tasks em todas as DAGs pelo valor de um dos CAMPOS_BUSCA
+        (ou de qualquer um deles quando campo é None)
+        """
+        campos = CAMPOS_BUSCA if campo is None else (campo,)
+        if any(c not in CAMPOS_BUSCA for c in campos):
+            raise ValueError(f"Campo de busca inválido: {campo}")
+        if exato:
+            condicao = ' OR '.join(f't.{c} = ?' for c in campos)
+            parametros = [termo] * len(campos)
+        else:
+            condicao = ' OR '.join(f"t.{c} LIKE ? ESCAPE '\\'" for c in campos)
+            padrao = '%' + termo.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+            parametros = [padrao] * len(campos)
+
+        with self._conectar() as conexao:
+            return [dict(linha) for linha in conexao.execute(
+                'SELECT a.caminho, a.descricao, t.posicao, t.identificador_task, t.ativo, t.conexao_id,'
+                ' t.mini_operador, t.id_mini_operador FROM tasks t JOIN arquivos a ON a.id = t.arquivo_id'
+                f' WHERE {condicao} ORDER BY a.caminho, t.posicao LIMIT ?',
+                (*parametros, limite)
+            )]
+
+    def listar_dags(self):
+        """Cabeçalhos de todas as DAGs indexadas"""
+        with self._conectar() as conexao:
+            return [dict(linha) for linha in conexao.execute(
+                'SELECT caminho, descricao, dono, agendamento_cron, tags, quantidade_tasks, erro'
+                ' FROM arquivos ORDER BY caminho'
+            )]
+
+    def valores_distintos(self, campo):
+        """Valores distintos de um campo de task, com a quantidade de ocorrências"""
+        if campo not in CAMPOS_BUSCA:
+            raise ValueError(f"Campo inválido: {campo}")
+        with self._conectar() as conexao:
+            return [tuple(linha) for linha in conexao.execute(
+                f'SELECT {campo}, COUNT(*) FROM tasks GROUP BY {campo} ORDER BY COUNT(*) DESC'
+            )]
+
+    def agendamentos(self, conexao_id=None):
+        """
+        (caminho, agendamento_cron, tasks ativas) de cada DAG indexada, para a análise de
+        colisões; com conexao_id, conta apenas as tasks ativas daquela conexão
+        """
+        filtro, parametros = '', ()
+        if conexao_id is not None:
+            filtro, parametros = ' AND t.conexao_id = ?', (conexao_id,)
+        with self._conectar() as conexao:
+            return [tuple(linha) for linha in conexao.execute(
+                'SELECT a.caminho, a.agendamento_cron, COUNT(t.arquivo_id) FROM arquivos a'
+                f' LEFT JOIN tasks t ON t.arquivo_id = a.id AND t.ativo = 1{filtro}'
+                ' WHERE a.erro IS NULL GROUP BY a.id ORDER BY a.caminho',
+                parametros
+            )]